@@ -0,0 +1,376 @@
+"""Latency and throughput of every API route, with a cold and a warm cache.
+
+Generates a seeded dataset with tools.generate into a temporary SQLite file,
+boots ``main.app`` in-process behind httpx's ASGI transport with fakeredis (or
+a real Redis given by ``--redis-url``) and drives each ENDPOINTS entry at every
+concurrency level, reporting requests/s and p50/p95/p99 latency.
+
+Read routes run twice. ``cold`` empties the cache before every request (the
+leaderboard is kept, it is not a cache), ``warm`` primes it with one request
+first. Above concurrency 1 a cold request can still hit an entry that another
+client filled a moment before. Write routes run once, after all reads, as
+``write``. Routes of the app missing from ENDPOINTS are reported as uncovered.
+
+    python -m benchmarks.api
+    python -m benchmarks.api --concurrency 1 10 50 --requests 300 --output results.json
+    python -m benchmarks.api --baseline results.json --threshold 0.2
+    python -m benchmarks.api --route /api/analytics --mode async
+
+``--baseline`` compares against an earlier ``--output`` file and exits non-zero
+when p50 or p95 latency grew, or requests/s fell, by more than the threshold.
+``--redis-url`` must point at a scratch database: it is emptied between requests.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from tests.fakes import use_fakeredis
+
+# Dataset written by tools.generate; the same arguments give the same rows
+DATASET = {"accounts": 100, "posts": "50k", "days": 365, "seed": 42}
+
+# Posts kept aside for the DELETE benchmark, one per request
+DELETE_POOL_ROUTE = "DELETE /api/posts/{post_id}"
+
+# (method, path, kind, body). ``{post_id}`` and ``{account_id}`` rotate through
+# the seeded ids; ``body(i)`` builds the JSON (or raw) body of the i-th request.
+# Writes run in this order, after every read.
+ENDPOINTS = [
+    ("GET", "/", "read", None),
+    ("GET", "/health", "read", None),
+    ("GET", "/metrics", "read", None),
+    ("GET", "/api/accounts/", "read", None),
+    ("GET", "/api/accounts/?cursor=&limit=20", "read", None),
+    ("GET", "/api/accounts/{account_id}", "read", None),
+    ("GET", "/api/accounts/{account_id}/analytics?days=30", "read", None),
+    ("GET", "/api/posts/?limit=20", "read", None),
+    ("GET", "/api/posts/?cursor=&limit=20", "read", None),
+    ("GET", "/api/posts/?limit=100&fields=id,content,status", "read", None),
+    ("GET", "/api/posts/?account_id={account_id}&status=published&limit=20", "read", None),
+    ("GET", "/api/posts/scheduled", "read", None),
+    ("GET", "/api/posts/scheduled/dispatcher", "read", None),
+    ("GET", "/api/posts/{post_id}", "read", None),
+    ("GET", "/api/analytics/dashboard", "read", None),
+    ("GET", "/api/analytics/trends?days=30", "read", None),
+    ("GET", "/api/analytics/platforms", "read", None),
+    ("GET", "/api/analytics/top-posts?limit=10", "read", None),
+    ("GET", "/api/analytics/top-posts?limit=10&account_id={account_id}", "read", None),
+    ("GET", "/api/analytics/timeseries?days=90", "read", None),
+    ("GET", "/api/analytics/timeseries?days=365&interval=week&per_account=true", "read", None),
+    ("GET", "/api/analytics/demographics", "read", None),
+    ("GET", "/api/export/analytics?account_id={account_id}", "read", None),
+    ("GET", "/api/export/posts?account_id={account_id}&format=ndjson", "read", None),
+    ("POST", "/api/accounts/", "write", lambda i: {
+        "platform": "twitter", "account_name": f"bench_{i}", "account_id": f"bench_{time.time_ns()}_{i}"
+    }),
+    ("POST", "/api/accounts/{account_id}/analytics", "write", None),
+    ("POST", "/api/accounts/analytics/import", "write", None),
+    ("POST", "/api/posts/", "write", None),
+    ("PUT", "/api/posts/{post_id}", "write", lambda i: {"content": f"Edited by benchmark run {i}"}),
+    ("PUT", "/api/posts/{post_id}/engagement?likes=10&comments=2&shares=1&views=500&clicks=7", "write", None),
+    ("POST", "/api/posts/engagement/bulk", "write", None),
+    ("POST", "/api/posts/{post_id}/publish", "write", None),
+    ("DELETE", "/api/posts/{post_id}", "write", None),
+    ("DELETE", "/api/accounts/{account_id}", "write", None),
+]
+
+# Routes deliberately left out, with the reason
+SKIPPED_ROUTES = {
+    "POST /api/seed": "demo data loader, not a serving path",
+    "GET /debug/requests": "diagnostics, only mounted with DIAGNOSTICS_ENABLED",
+    "GET /debug/requests/{request_id}": "diagnostics, only mounted with DIAGNOSTICS_ENABLED",
+}
+
+
+def _route(method: str, path: str) -> str:
+    return f"{method} {path.split('?')[0]}"
+
+
+def _bodies(ids: dict) -> dict:
+    """Request bodies of the write routes that depend on the seeded ids"""
+    accounts, posts = ids["account_id"], ids["post_id"]
+
+    def snapshot(i):
+        account = accounts[i % len(accounts)]
+        return {"account_id": account, "date": (datetime.utcnow() + timedelta(minutes=i)).isoformat(),
+                "followers": 1000 + i, "reach": 5000}
+
+    def ndjson(i):
+        return "\n".join(json.dumps(snapshot(i * 10 + j)) for j in range(10)).encode()
+
+    def bulk(i):
+        return [{"post_id": posts[(i * 50 + j) % len(posts)], "likes": i + j, "views": 100 * (i + j)} for j in range(50)]
+
+    return {
+        "POST /api/accounts/{account_id}/analytics": snapshot,
+        "POST /api/accounts/analytics/import": ndjson,
+        "POST /api/posts/": lambda i: {
+            "account_id": accounts[i % len(accounts)], "content": f"Benchmark post {i}",
+            "scheduled_time": (datetime.utcnow() + timedelta(days=1)).isoformat()
+        },
+        "POST /api/posts/engagement/bulk": bulk,
+    }
+
+
+def _use_fakeredis() -> None:
+    """Point redis_client at one in-memory fakeredis server, before anything imports it"""
+    try:
+        use_fakeredis()
+    except ImportError:
+        raise SystemExit("fakeredis is not installed: pip install fakeredis, or pass --redis-url")
+
+
+def _generate(database_url: str) -> None:
+    args = [f"--{name}={value}" for name, value in DATASET.items()]
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "tools.generate", *args, f"--database-url={database_url}"],
+        check=True, capture_output=True, text=True
+    )
+    print(f"Generated dataset {DATASET} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+def _seeded_ids(delete_pool: int) -> dict:
+    """Ids the path templates rotate through, and the posts reserved for deletion"""
+    from sqlalchemy import select
+    from database import SessionLocal
+    from models import SocialAccount, Post
+    from leaderboard import leaderboard
+
+    db = SessionLocal()
+    try:
+        leaderboard.rebuild(db)
+        accounts = db.execute(select(SocialAccount.id).order_by(SocialAccount.id)).scalars().all()
+        newest = db.execute(select(Post.id).order_by(Post.id.desc()).limit(delete_pool)).scalars().all()
+        posts = db.execute(
+            select(Post.id).where(Post.id.notin_(newest)).order_by(Post.id).limit(1000)
+        ).scalars().all()
+    finally:
+        db.close()
+    return {"account_id": accounts, "post_id": posts, "delete_post_id": newest}
+
+
+def _clear_cache() -> None:
+    from redis_client import redis_client
+    from leaderboard import leaderboard
+
+    keys = [key for key in redis_client.get_keys("*") if not key.startswith(leaderboard.PREFIX)]
+    if keys:
+        redis_client.delete_many(keys)
+    if redis_client.local is not None:
+        redis_client.local.clear()
+
+
+def _percentile(ordered: list, q: float) -> float:
+    position = q / 100 * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+async def _drive(client, endpoint: tuple, body, ids: dict, scenario: str, concurrency: int, total: int,
+                 counter: dict) -> dict:
+    method, path, _, _ = endpoint
+    route = _route(method, path)
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    def request_args():
+        i = counter[route] = counter.get(route, -1) + 1
+        post_ids = ids["delete_post_id"] if route == DELETE_POOL_ROUTE else ids["post_id"]
+        url = path.format(
+            post_id=post_ids[i % len(post_ids)],
+            account_id=ids["account_id"][i % len(ids["account_id"])]
+        )
+        if body is None:
+            return url, {}
+        content = body(i)
+        if isinstance(content, bytes):
+            return url, {"content": content, "headers": {"content-type": "application/x-ndjson"}}
+        return url, {"json": content}
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            url, kwargs = request_args()
+            if scenario == "cold":
+                _clear_cache()
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    if scenario == "warm":
+        url, kwargs = request_args()
+        await client.request(method, url, **kwargs)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latency * 1000 for latency in latencies)
+    return {
+        "route": route,
+        "path": path,
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(_percentile(ordered, 50), 3),
+        "p95_ms": round(_percentile(ordered, 95), 3),
+        "p99_ms": round(_percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+async def _run(endpoints: list, levels: list, total: int, ids: dict) -> list:
+    import httpx
+    from main import app
+
+    bodies = _bodies(ids)
+    counter = {}
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        runs = [(endpoint, scenario) for endpoint in endpoints if endpoint[2] == "read" for scenario in ("cold", "warm")]
+        runs += [(endpoint, "write") for endpoint in endpoints if endpoint[2] == "write"]
+        for endpoint, scenario in runs:
+            method, path, _, body = endpoint
+            body = body or bodies.get(_route(method, path))
+            for concurrency in levels:
+                row = await _drive(client, endpoint, body, ids, scenario, concurrency, max(total, concurrency), counter)
+                results.append(row)
+                print(f"{scenario:<6} {concurrency:>5} {row['rps']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+                      f"{row['p99_ms']:>9} {row['errors']:>6}  {method} {path}")
+    return results
+
+
+def _uncovered() -> list:
+    from fastapi.routing import APIRoute
+    from main import app
+
+    covered = {_route(method, path) for method, path, _, _ in ENDPOINTS}
+    return sorted(
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+        if f"{method} {route.path}" not in covered and f"{method} {route.path}" not in SKIPPED_ROUTES
+    )
+
+
+def _key(row: dict) -> tuple:
+    return row["path"], row["scenario"], row["concurrency"]
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float) -> list:
+    """Rows of current that regressed from the matching baseline row by more than threshold"""
+    previous = {_key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        before = previous.get(_key(row))
+        if before is None:
+            continue
+        reasons = []
+        for metric in ("p50_ms", "p95_ms"):
+            grown = row[metric] - before[metric]
+            if grown > min_delta_ms and grown > before[metric] * threshold:
+                reasons.append(f"{metric} {before[metric]} -> {row[metric]}")
+        if row["rps"] < before["rps"] * (1 - threshold):
+            reasons.append(f"rps {before['rps']} -> {row['rps']}")
+        if reasons:
+            regressions.append({"path": row["path"], "scenario": row["scenario"],
+                                "concurrency": row["concurrency"], "reasons": reasons})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--requests", type=int, default=200, help="requests per route, scenario and concurrency level")
+    parser.add_argument("--route", action="append", help="only paths containing this (repeatable)")
+    parser.add_argument("--mode", choices=["sync", "async"], help="database sessions, defaults to DATABASE_ASYNC")
+    parser.add_argument("--redis-url", help="real Redis instead of fakeredis, e.g. redis://localhost:6379/15")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change flagged as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore latency changes smaller than this")
+    args = parser.parse_args()
+
+    endpoints = [e for e in ENDPOINTS if not args.route or any(part in e[1] for part in args.route)]
+    deletes = sum(1 for method, path, _, _ in endpoints if _route(method, path) == DELETE_POOL_ROUTE)
+    delete_pool = deletes * sum(max(args.requests, c) for c in args.concurrency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.environ["SCHEDULER_ENABLED"] = "false"
+        if args.mode:
+            os.environ["DATABASE_ASYNC"] = "true" if args.mode == "async" else "false"
+        if args.redis_url:
+            url = urlparse(args.redis_url)
+            os.environ["REDIS_HOST"] = url.hostname or "localhost"
+            os.environ["REDIS_PORT"] = str(url.port or 6379)
+            os.environ["REDIS_DB"] = url.path.lstrip("/") or "0"
+        else:
+            _use_fakeredis()
+
+        _generate(database_url)
+        from database import DATABASE_ASYNC
+
+        ids = _seeded_ids(delete_pool)
+        print(f"{'scenario':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>6}  route")
+        results = asyncio.run(_run(endpoints, args.concurrency, args.requests, ids))
+        uncovered = _uncovered()
+
+    report = {
+        "meta": {
+            "at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "mode": "async" if DATABASE_ASYNC else "sync",
+            "redis": args.redis_url or "fakeredis",
+            "dataset": DATASET,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+        "uncovered": uncovered,
+    }
+    if uncovered:
+        print(f"Routes without a benchmark: {', '.join(uncovered)}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.threshold, args.min_delta_ms)
+        report["baseline"] = {"file": args.baseline, "threshold": args.threshold, "regressions": regressions}
+        for regression in regressions:
+            print(f"REGRESSION {regression['scenario']} c={regression['concurrency']} {regression['path']}: "
+                  f"{'; '.join(regression['reasons'])}")
+        print(f"{len(regressions)} regressions over {args.threshold:.0%} against {args.baseline}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
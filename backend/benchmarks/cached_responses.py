@@ -0,0 +1,148 @@
+"""CPU per cache hit of the analytics routes, before and after bodies were cached rendered.
+
+Generates the benchmarks.api dataset and serves ``main.app`` in-process with
+fakeredis. Next to every analytics route it mounts the same route as it worked
+before, under ``/legacy``: the cache held the value, which every hit decoded
+and FastAPI then validated against the response model and encoded with
+json.dumps. Both are warmed, checked to return the same JSON, then requested
+sequentially while measuring process CPU time.
+
+    python -m benchmarks.cached_responses
+    python -m benchmarks.cached_responses --requests 5000 --mode async
+
+The in-process client's own CPU is part of both columns, so the difference
+between them is what the passthrough saves per request.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.api import _generate, _use_fakeredis
+
+# (label, route, legacy route)
+ROUTES = [
+    ("dashboard", "/api/analytics/dashboard", "/legacy/dashboard"),
+    ("trends 30d", "/api/analytics/trends?days=30", "/legacy/trends?days=30"),
+    ("trends 365d", "/api/analytics/trends?days=365", "/legacy/trends?days=365"),
+    ("platforms", "/api/analytics/platforms", "/legacy/platforms"),
+    ("top posts", "/api/analytics/top-posts?limit=10", "/legacy/top-posts?limit=10"),
+    ("top posts 100", "/api/analytics/top-posts?limit=100", "/legacy/top-posts?limit=100"),
+    ("timeseries 90d", "/api/analytics/timeseries?days=90", "/legacy/timeseries?days=90"),
+    (
+        "timeseries per account",
+        "/api/analytics/timeseries?days=365&interval=week&per_account=true",
+        "/legacy/timeseries?days=365&interval=week&per_account=true",
+    ),
+]
+
+
+def _add_legacy_routes(app) -> None:
+    """The analytics routes as they were, caching values rather than bodies"""
+    from typing import List
+    from fastapi import Depends
+    from fastapi.responses import JSONResponse
+    from cache import cache
+    from database import get_session, run_in_session
+    from leaderboard import leaderboard
+    from schemas import DashboardStats, EngagementTrend, PlatformStats, TimeSeries
+    from services.analytics_service import (
+        AnalyticsService, CACHE_TTL, DASHBOARD_TAGS, TRENDS_TAGS, PLATFORM_TAGS, TIMESERIES_TAGS, _timeseries_key
+    )
+
+    @app.get("/legacy/dashboard", response_model=DashboardStats, response_class=JSONResponse)
+    async def dashboard(db=Depends(get_session)):
+        return await cache.acached(
+            "legacy:dashboard", DASHBOARD_TAGS,
+            lambda: run_in_session(db, AnalyticsService._dashboard_stats), expire=CACHE_TTL
+        )
+
+    @app.get("/legacy/trends", response_model=List[EngagementTrend], response_class=JSONResponse)
+    async def trends(days: int = 30, db=Depends(get_session)):
+        return await cache.acached(
+            f"legacy:trends:{days}", TRENDS_TAGS,
+            lambda: run_in_session(db, AnalyticsService._engagement_trends, days), expire=CACHE_TTL
+        )
+
+    @app.get("/legacy/platforms", response_model=List[PlatformStats], response_class=JSONResponse)
+    async def platforms(db=Depends(get_session)):
+        return await cache.acached(
+            "legacy:platforms", PLATFORM_TAGS,
+            lambda: run_in_session(db, AnalyticsService._platform_stats), expire=CACHE_TTL
+        )
+
+    # Leaderboard ids were hydrated from the database on every request
+    @app.get("/legacy/top-posts", response_class=JSONResponse)
+    async def top_posts(limit: int = 10, db=Depends(get_session)):
+        post_ids = await leaderboard.atop_ids(limit, None, None)
+        return await run_in_session(db, AnalyticsService._hydrate_top_posts, post_ids, None, None)
+
+    @app.get("/legacy/timeseries", response_model=TimeSeries, response_class=JSONResponse)
+    async def series(days: int = 90, interval: str = "day", per_account: bool = False, db=Depends(get_session)):
+        key = _timeseries_key("followers", days, interval, 7, None, (10, 50, 90), per_account)
+        return await cache.acached(
+            f"legacy:{key}", TIMESERIES_TAGS,
+            lambda: run_in_session(
+                db, AnalyticsService._timeseries, "followers", days, interval, 7, None, (10, 50, 90), per_account
+            ),
+            expire=CACHE_TTL
+        )
+
+
+async def _cpu_per_request(client, path: str, requests: int) -> float:
+    """Process CPU microseconds per sequential request"""
+    start = time.process_time()
+    for _ in range(requests):
+        response = await client.get(path)
+        response.raise_for_status()
+    return (time.process_time() - start) / requests * 1e6
+
+
+async def _run(requests: int) -> None:
+    import httpx
+    from main import app
+
+    _add_legacy_routes(app)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'route':<24} {'bytes':>8} {'before us':>10} {'after us':>10} {'saved us':>10} {'speedup':>8}")
+        for label, path, legacy in ROUTES:
+            after, before = await client.get(path), await client.get(legacy)
+            if after.json() != before.json():
+                raise SystemExit(f"{label}: {path} and {legacy} return different JSON")
+            before_us = await _cpu_per_request(client, legacy, requests)
+            after_us = await _cpu_per_request(client, path, requests)
+            print(f"{label:<24} {len(after.content):>8} {before_us:>10.0f} {after_us:>10.0f} "
+                  f"{before_us - after_us:>10.0f} {before_us / after_us:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per route and variant")
+    parser.add_argument("--mode", choices=["sync", "async"], help="database sessions, defaults to DATABASE_ASYNC")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.environ["SCHEDULER_ENABLED"] = "false"
+        if args.mode:
+            os.environ["DATABASE_ASYNC"] = "true" if args.mode == "async" else "false"
+        _use_fakeredis()
+        _generate(database_url)
+
+        from database import SessionLocal
+        from leaderboard import leaderboard
+
+        db = SessionLocal()
+        try:
+            leaderboard.rebuild(db)
+        finally:
+            db.close()
+        asyncio.run(_run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Throughput of the API under concurrent clients, sync vs async database sessions.
+
+Each mode runs in its own interpreter because DATABASE_ASYNC is read at import
+time. The app is driven in-process through httpx's ASGI transport against a
+freshly seeded SQLite file, hitting uncached read routes so every request goes
+to the database.
+
+    python -m benchmarks.concurrency
+    python -m benchmarks.concurrency --clients 50 200 1000 --requests 4000 --mode async
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUTES = ["/api/posts/?limit=20", "/api/accounts/", "/api/posts/scheduled"]
+
+
+async def _drive(app, clients: int, total: int) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    errors = 0
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            for i in remaining:
+                response = await client.get(ROUTES[i % len(ROUTES)])
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "clients": clients,
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+    }
+
+
+def _run_child(clients: list, total: int) -> list:
+    """Benchmark body, executed inside the per-mode subprocess"""
+    from main import app, seed_data
+
+    seed_data()
+    return [asyncio.run(_drive(app, c, max(total, c))) for c in clients]
+
+
+def _spawn(mode: str, clients: list, total: int) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env["DATABASE_ASYNC"] = "true" if mode == "async" else "false"
+        env.pop("ASYNC_DATABASE_URL", None)
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.concurrency", "--child",
+             "--requests", str(total), "--clients", *map(str, clients)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_child(args.clients, args.requests)))
+        return
+
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+    print(f"{'mode':<6} {'clients':>8} {'requests':>9} {'errors':>7} {'seconds':>8} {'req/s':>9}")
+    for mode in modes:
+        for row in _spawn(mode, args.clients, args.requests):
+            print(f"{mode:<6} {row['clients']:>8} {row['requests']:>9} {row['errors']:>7} "
+                  f"{row['seconds']:>8} {row['rps']:>9}")
+
+
+if __name__ == "__main__":
+    main()
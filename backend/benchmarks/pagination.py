@@ -0,0 +1,105 @@
+"""Latency of deep pages, offset vs keyset (cursor) pagination.
+
+Seeds a SQLite file with synthetic posts, then times fetching the same page of
+the posts listing both ways, unfiltered and filtered by account and status.
+
+    python -m benchmarks.pagination
+    python -m benchmarks.pagination --posts 5000000 --page 1000 --limit 50
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def _seed(posts: int, accounts: int) -> None:
+    from sqlalchemy import insert
+    from database import engine, Base, SessionLocal
+    from models import SocialAccount, Post
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.execute(insert(SocialAccount), [
+        {"platform": "twitter", "account_name": f"bench{i}", "account_id": f"bench{i}"}
+        for i in range(accounts)
+    ])
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for i in range(posts):
+        batch.append({
+            "account_id": random.randint(1, accounts),
+            "content": "benchmark post",
+            "status": random.choice(["draft", "scheduled", "published", "published"]),
+            "created_at": start + timedelta(seconds=i * 5),
+        })
+        if len(batch) == 10000:
+            db.execute(insert(Post), batch)
+            batch.clear()
+    if batch:
+        db.execute(insert(Post), batch)
+    db.commit()
+    db.close()
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _bench(page: int, limit: int, repeat: int, account_id=None, status=None) -> dict:
+    from database import SessionLocal
+    from pagination import encode_cursor
+    from services.post_service import PostService
+
+    db = SessionLocal()
+    skip = (page - 1) * limit
+    # The cursor a client would hold after walking to this page: the key of the row before it
+    previous = PostService.get_posts(db, account_id, status, skip - 1, 1)
+    if not previous:
+        raise SystemExit(f"Page {page} is past the end of the listing; seed more posts")
+    cursor = encode_cursor(previous[0].created_at, previous[0].id)
+
+    offset_rows = PostService.get_posts(db, account_id, status, skip, limit)
+    cursor_rows, _ = PostService.get_posts_page(db, account_id, status, cursor, limit)
+    assert [p.id for p in offset_rows] == [p.id for p in cursor_rows]
+
+    result = {
+        "offset_ms": _time(lambda: PostService.get_posts(db, account_id, status, skip, limit), repeat),
+        "cursor_ms": _time(lambda: PostService.get_posts_page(db, account_id, status, cursor, limit), repeat),
+    }
+    db.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1000000)
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_ASYNC"] = "false"
+        start = time.perf_counter()
+        _seed(args.posts, args.accounts)
+        print(f"Seeded {args.posts} posts in {time.perf_counter() - start:.1f}s; page {args.page}, limit {args.limit}")
+
+        print(f"{'listing':<26} {'offset ms':>10} {'cursor ms':>10} {'speedup':>8}")
+        for label, filters in [("all posts", {}), ("account 1, published", {"account_id": 1, "status": "published"})]:
+            row = _bench(args.page, args.limit, args.repeat, **filters)
+            print(f"{label:<26} {row['offset_ms']:>10.2f} {row['cursor_ms']:>10.2f} "
+                  f"{row['offset_ms'] / row['cursor_ms']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
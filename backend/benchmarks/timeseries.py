@@ -0,0 +1,243 @@
+"""Time-series analytics, NumPy vs an equivalent pure-Python loop.
+
+Seeds a SQLite file with daily analytics snapshots, loads one metric's rows
+once, then times computing the resampled series, totals, deltas, growth,
+rolling averages and percentiles across accounts both ways, after checking they
+agree. Also times the whole endpoint computation (query included).
+
+    python -m benchmarks.timeseries
+    python -m benchmarks.timeseries --accounts 5000 --days 730 --interval week
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+
+def _seed(accounts: int, days: int) -> None:
+    from sqlalchemy import insert
+    from database import engine, Base, SessionLocal
+    from models import SocialAccount, Analytics
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.execute(insert(SocialAccount), [
+        {"platform": "twitter", "account_name": f"bench{i}", "account_id": f"bench{i}"}
+        for i in range(accounts)
+    ])
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    batch = []
+    for account_id in range(1, accounts + 1):
+        followers = random.randint(1000, 100000)
+        for day in range(days):
+            # A few missing days per account, like real snapshot gaps
+            if random.random() < 0.02:
+                continue
+            followers += random.randint(-50, 200)
+            batch.append({
+                "account_id": account_id,
+                "date": today - timedelta(days=days - 1 - day),
+                "followers": followers,
+                "reach": random.randint(1000, 100000),
+            })
+            if len(batch) == 50000:
+                db.execute(insert(Analytics), batch)
+                batch.clear()
+    if batch:
+        db.execute(insert(Analytics), batch)
+    db.commit()
+    db.close()
+
+
+def _rows(metric: str, start: date, end: date) -> list:
+    from sqlalchemy import func, select
+    from database import SessionLocal
+    from models import Analytics
+
+    db = SessionLocal()
+    column = getattr(Analytics, metric)
+    rows = db.execute(
+        select(Analytics.account_id, func.date(Analytics.date), column).where(
+            Analytics.date >= start, Analytics.date < end, column.isnot(None)
+        ).order_by(Analytics.account_id, Analytics.date, Analytics.id)
+    ).all()
+    db.close()
+    return rows
+
+
+def _arrays(rows: list) -> tuple:
+    import numpy as np
+
+    return (
+        np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+        np.array([str(row[1]) for row in rows], dtype="datetime64[D]"),
+        np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)),
+    )
+
+
+def _vectorized(arrays: tuple, start: date, days: int, how: str, interval: str, window: int, q: list) -> dict:
+    import numpy as np
+    import timeseries
+
+    accounts, dates, values = arrays
+    first_day = np.datetime64(start, "D")
+    _, matrix = timeseries.daily_matrix(accounts, dates, values, first_day, days)
+    _, boundaries = timeseries.periods(first_day, days, interval)
+    series = timeseries.resample(matrix, boundaries, how)
+    return {
+        "total": timeseries.derive(timeseries.total(series), window),
+        "accounts": timeseries.derive(series, window),
+        "percentiles": timeseries.percentiles(series, q),
+    }
+
+
+def _derive_python(series: list, window: int) -> dict:
+    delta, growth, rolling = [], [], []
+    for i, value in enumerate(series):
+        previous = series[i - 1] if i else None
+        delta.append(value - previous if value is not None and previous is not None else None)
+        growth.append((value - previous) / previous * 100 if value is not None and previous else None)
+        known = [v for v in series[max(0, i - window + 1):i + 1] if v is not None]
+        rolling.append(sum(known) / len(known) if known else None)
+    return {"values": series, "delta": delta, "growth_pct": growth, "rolling_avg": rolling}
+
+
+def _percentile_python(values: list, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    position = q / 100 * (len(values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _pure_python(rows: list, start: date, days: int, how: str, interval: str, window: int, q: list) -> dict:
+    by_account = {}
+    for account_id, day, value in rows:
+        column = (date.fromisoformat(str(day)) - start).days
+        by_account.setdefault(account_id, [None] * days)[column] = value
+
+    keys = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        if interval == "week":
+            day -= timedelta(days=day.weekday())
+        elif interval == "month":
+            day = day.replace(day=1)
+        keys.append(day)
+    groups = []
+    for i, key in enumerate(keys):
+        if i == 0 or key != keys[i - 1]:
+            groups.append([])
+        groups[-1].append(i)
+
+    accounts = []
+    for account_id in sorted(by_account):
+        daily = by_account[account_id]
+        series = []
+        last = None
+        for group in groups:
+            if how == "last":
+                for i in group:
+                    if daily[i] is not None:
+                        last = daily[i]
+                series.append(last)
+            else:
+                known = [daily[i] for i in group if daily[i] is not None]
+                series.append(sum(known) if known else None)
+        accounts.append(series)
+
+    columns = [[series[p] for series in accounts if series[p] is not None] for p in range(len(groups))]
+    total = [sum(column) if column else None for column in columns]
+    return {
+        "total": _derive_python(total, window),
+        "accounts": [_derive_python(series, window) for series in accounts],
+        "percentiles": [[_percentile_python(column, p) for column in columns] for p in q],
+    }
+
+
+def _agree(vectorized: dict, python: dict) -> bool:
+    import numpy as np
+
+    def close(array, values):
+        expected = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        return np.allclose(array, expected, equal_nan=True)
+
+    if not all(close(vectorized["total"][name], values) for name, values in python["total"].items()):
+        return False
+    for i, derived in enumerate(python["accounts"]):
+        if not all(close(vectorized["accounts"][name][i], values) for name, values in derived.items()):
+            return False
+    return all(close(row, values) for row, values in zip(vectorized["percentiles"], python["percentiles"]))
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--metric", default="followers", choices=["followers", "reach"])
+    parser.add_argument("--interval", default="day", choices=["day", "week", "month"])
+    parser.add_argument("--window", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    q = [10, 50, 90]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_ASYNC"] = "false"
+        start_time = time.perf_counter()
+        _seed(args.accounts, args.days)
+        print(f"Seeded {args.accounts} accounts x {args.days} days in {time.perf_counter() - start_time:.1f}s")
+
+        import timeseries
+        from database import SessionLocal
+        from services.analytics_service import AnalyticsService
+
+        end = datetime.utcnow().date() + timedelta(days=1)
+        start = end - timedelta(days=args.days)
+        how = timeseries.METRICS[args.metric]
+        rows = _rows(args.metric, start, end)
+
+        arrays = _arrays(rows)
+        vectorized = _vectorized(arrays, start, args.days, how, args.interval, args.window, q)
+        python = _pure_python(rows, start, args.days, how, args.interval, args.window, q)
+        if not _agree(vectorized, python):
+            raise SystemExit("NumPy and pure-Python results differ")
+
+        compute = [
+            ("numpy, rows to arrays", lambda: _arrays(rows)),
+            ("numpy, math", lambda: _vectorized(arrays, start, args.days, how, args.interval, args.window, q)),
+            ("pure python", lambda: _pure_python(rows, start, args.days, how, args.interval, args.window, q)),
+        ]
+        print(f"{len(rows)} rows of {args.metric}, interval {args.interval}, window {args.window}")
+        timings = {label: _time(fn, args.repeat) for label, fn in compute}
+        for label, ms in timings.items():
+            print(f"  {label:<24} {ms:>9.2f} ms")
+        numpy_ms = timings["numpy, rows to arrays"] + timings["numpy, math"]
+        print(f"  speedup {timings['pure python'] / numpy_ms:.1f}x ({timings['pure python'] / timings['numpy, math']:.0f}x on the math alone)")
+
+        db = SessionLocal()
+        for per_account in (False, True):
+            ms = _time(lambda: AnalyticsService._timeseries(
+                db, args.metric, args.days, args.interval, args.window, None, q, per_account
+            ), args.repeat)
+            print(f"  endpoint, per_account={per_account!s:<5}   {ms:>9.2f} ms  (query, numpy and JSON lists)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
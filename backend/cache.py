@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import random
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, NamedTuple, Optional, Tuple
+from metrics import observe_cache
+from redis_client import RedisClient, AsyncRedisClient, redis_client, async_redis_client
+
+
+class Rendered(NamedTuple):
+    """A rendered body and the digest of its content, computed once when rendered"""
+    body: bytes
+    digest: str
+
+
+class TaggedCache:
+    """Cache entries that are invalidated by the entities they depend on
+
+    Every entry declares tags such as ``"posts"``, ``"engagement"`` or
+    ``"account:3"``. Each tag has a generation counter in Redis and entries
+    record the generations of their tags when they were computed. Invalidating a
+    tag increments its counter, so every dependent entry goes stale at once,
+    without KEYS scans.
+
+    Reads go through ``cached``/``acached``, which recompute stale entries
+    single-flight: one worker takes a short Redis lease and refreshes while
+    everyone else keeps being served the previous value. Only a cold miss waits,
+    and then for the lease holder rather than running the query itself.
+
+    With ``render``, the computed value is rendered to bytes (a JSON response
+    body) once, when it is stored, and hits return those bytes as they were
+    stored, as a ``Rendered`` with their content digest: nothing is decoded,
+    validated, re-encoded or hashed on the hot path.
+
+    With ``replica``, the computation reads a replica that may lag the primary.
+    Its entry is marked as such and only served to other replica readers: a
+    reader on the primary (a client that has just written) recomputes instead,
+    so it never gets a result that misses its own write under the new tag
+    generations.
+    """
+
+    TAG_PREFIX = "cache:tag:"
+    LOCK_PREFIX = "cache:lock:"
+
+    # Lease on the recompute lock; a crashed worker blocks refreshes at most this long
+    LOCK_LEASE_MS = 10000
+    # How often a cold miss checks whether the lease holder stored the value or gave up
+    WAIT_INTERVAL = 0.05
+    # Spread expiries by +/- this fraction so keys cached together do not expire together
+    TTL_JITTER = 0.1
+
+    def __init__(self, client: RedisClient, async_client: AsyncRedisClient):
+        self.client = client
+        self.async_client = async_client
+
+    def version(self, tags: Iterable[str]) -> Optional[str]:
+        """Current combined generation of the given tags, None if Redis is unavailable"""
+        generations = self.client.get_counters(self._tag_keys(tags))
+        if generations is None:
+            return None
+        return ".".join(str(generation) for generation in generations)
+
+    def invalidate(self, *tags: str) -> bool:
+        """Invalidate every entry depending on any of the given tags"""
+        return self.client.increment_many([self.TAG_PREFIX + tag for tag in tags])
+
+    async def ainvalidate(self, *tags: str) -> bool:
+        """Same as ``invalidate`` through the async client"""
+        return await self.async_client.increment_many([self.TAG_PREFIX + tag for tag in tags])
+
+    def cached(
+        self,
+        key: str,
+        tags: Iterable[str],
+        compute: Callable[[], Any],
+        expire: int = 3600,
+        render: Optional[Callable[[Any], bytes]] = None,
+        replica: bool = False
+    ) -> Any:
+        """Return the cached value for key, recomputing it single-flight when stale
+
+        A cold miss that finds the lease taken polls until the holder stores the
+        value. If the holder gives up instead (its computation raised, or it died
+        and the lease expired), the next poll takes the lease over, so exactly
+        one waiter computes in its place.
+        """
+        tags = list(tags)
+        body = render is not None
+        version, entry = self._lookup(key, tags, body, replica)
+        if version is None:
+            observe_cache(key, "unavailable")
+            return _rendered(compute(), render)
+
+        if self._is_fresh(entry, version):
+            observe_cache(key, "hit")
+            return entry["value"]
+
+        deadline = time.monotonic() + self.LOCK_LEASE_MS / 1000
+        waited = False
+        while True:
+            token = self.client.acquire_lock(self.LOCK_PREFIX + key, self.LOCK_LEASE_MS)
+            if token is not None:
+                break
+            if entry is not None:
+                observe_cache(key, "stale")
+                return entry["value"]
+            if not waited:
+                observe_cache(key, "miss")
+                waited = True
+            if time.monotonic() >= deadline:
+                # Not stored within a whole lease; stop waiting and compute it here
+                return _rendered(compute(), render)
+            time.sleep(self.WAIT_INTERVAL)
+            version, entry = self._lookup(key, tags, body, replica)
+            if version is None:
+                return _rendered(compute(), render)
+            if self._is_fresh(entry, version):
+                return entry["value"]
+
+        try:
+            # The previous holder may have stored the value since it was looked up
+            latest, entry = self._lookup(key, tags, body, replica)
+            if self._is_fresh(entry, latest):
+                if not waited:
+                    observe_cache(key, "hit")
+                return entry["value"]
+            if not waited:
+                observe_cache(key, "miss")
+            value = _rendered(compute(), render)
+            self._store(key, latest or version, value, expire, replica)
+            return value
+        finally:
+            self.client.release_lock(self.LOCK_PREFIX + key, token)
+
+    async def acached(
+        self,
+        key: str,
+        tags: Iterable[str],
+        compute: Callable[[], Awaitable[Any]],
+        expire: int = 3600,
+        render: Optional[Callable[[Any], bytes]] = None,
+        replica: bool = False
+    ) -> Any:
+        """Same as ``cached`` for an awaitable computation, without blocking the loop"""
+        tags = list(tags)
+        body = render is not None
+        version, entry = await self._alookup(key, tags, body, replica)
+        if version is None:
+            observe_cache(key, "unavailable")
+            return _rendered(await compute(), render)
+
+        if self._is_fresh(entry, version):
+            observe_cache(key, "hit")
+            return entry["value"]
+
+        deadline = time.monotonic() + self.LOCK_LEASE_MS / 1000
+        waited = False
+        while True:
+            token = await self.async_client.acquire_lock(self.LOCK_PREFIX + key, self.LOCK_LEASE_MS)
+            if token is not None:
+                break
+            if entry is not None:
+                observe_cache(key, "stale")
+                return entry["value"]
+            if not waited:
+                observe_cache(key, "miss")
+                waited = True
+            if time.monotonic() >= deadline:
+                return _rendered(await compute(), render)
+            await asyncio.sleep(self.WAIT_INTERVAL)
+            version, entry = await self._alookup(key, tags, body, replica)
+            if version is None:
+                return _rendered(await compute(), render)
+            if self._is_fresh(entry, version):
+                return entry["value"]
+
+        try:
+            latest, entry = await self._alookup(key, tags, body, replica)
+            if self._is_fresh(entry, latest):
+                if not waited:
+                    observe_cache(key, "hit")
+                return entry["value"]
+            if not waited:
+                observe_cache(key, "miss")
+            value = _rendered(await compute(), render)
+            await self.async_client.set(
+                key, self._entry(latest or version, value, expire, replica), expire=self._hard_ttl(expire)
+            )
+            return value
+        finally:
+            await self.async_client.release_lock(self.LOCK_PREFIX + key, token)
+
+    def _tag_keys(self, tags: Iterable[str]) -> List[str]:
+        return [self.TAG_PREFIX + tag for tag in sorted(set(tags))]
+
+    def _lookup(
+        self, key: str, tags: Iterable[str], body: bool = False, replica: bool = False
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        """Read the tag generations and the entry in a single MGET"""
+        return self._parse(self.client.get_many(self._tag_keys(tags) + [key]), body, replica)
+
+    async def _alookup(
+        self, key: str, tags: Iterable[str], body: bool = False, replica: bool = False
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        return self._parse(await self.async_client.get_many(self._tag_keys(tags) + [key]), body, replica)
+
+    @staticmethod
+    def _parse(
+        values: Optional[List[Any]], body: bool = False, replica: bool = False
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        if values is None:
+            return None, None
+        version = ".".join(str(int(generation or 0)) for generation in values[:-1])
+        entry = values[-1]
+        if isinstance(entry, bytes):
+            # Rendered entries are "<version> <fresh until> <digest>[ replica]\n<body>"
+            header, _, value = entry.partition(b"\n")
+            fields = header.decode().split(" ")
+            if len(fields) in (3, 4):
+                entry = {
+                    "version": fields[0],
+                    "fresh_until": float(fields[1]),
+                    "value": Rendered(value, fields[2]),
+                    "replica": fields[3:] == ["replica"]
+                }
+            else:
+                entry = None
+        # Values written under the same key before entries were versioned
+        elif not isinstance(entry, dict) or "version" not in entry:
+            entry = None
+        # or, when a body is expected, by a release that cached the plain value
+        if body and entry is not None and not isinstance(entry["value"], Rendered):
+            entry = None
+        # A replica's result may miss writes that a primary reader has just made
+        if not replica and entry is not None and entry.get("replica", False):
+            entry = None
+        return version, entry
+
+    @staticmethod
+    def _is_fresh(entry: Optional[dict], version: str) -> bool:
+        return (
+            entry is not None
+            and entry["version"] == version
+            and entry["fresh_until"] > time.time()
+        )
+
+    def _store(self, key: str, version: str, value: Any, expire: int, replica: bool = False) -> None:
+        self.client.set(key, self._entry(version, value, expire, replica), expire=self._hard_ttl(expire))
+
+    def _entry(self, version: str, value: Any, expire: int, replica: bool = False) -> Any:
+        ttl = max(1, int(expire * random.uniform(1 - self.TTL_JITTER, 1 + self.TTL_JITTER)))
+        if isinstance(value, Rendered):
+            source = " replica" if replica else ""
+            return f"{version} {time.time() + ttl!r} {value.digest}{source}\n".encode() + value.body
+        return {"version": version, "fresh_until": time.time() + ttl, "value": value, "replica": replica}
+
+    def _hard_ttl(self, expire: int) -> int:
+        # Keep the entry past its freshness so it can be served while being refreshed
+        return int(expire * (1 + self.TTL_JITTER) * 2)
+
+
+def _rendered(value: Any, render: Optional[Callable[[Any], bytes]]) -> Any:
+    if render is None:
+        return value
+    body = render(value)
+    return Rendered(body, hashlib.blake2b(body, digest_size=12).hexdigest())
+
+
+cache = TaggedCache(redis_client, async_redis_client)
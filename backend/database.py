@@ -1,21 +1,124 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from typing import Union
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from metrics import METRICS_ENABLED, instrument_engine  # noqa: E402
+from diagnostics import DIAGNOSTICS_ENABLED, trace_engine  # noqa: E402
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./social_media.db")
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# When enabled, request handlers use an AsyncSession (aiosqlite / asyncpg) instead
+# of borrowing a worker thread per request
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+
+def _async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgres:"):
+        return url.replace("postgres:", "postgresql+asyncpg:", 1)
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# Read-only analytics, listings and exports go to the replica when one is set,
+# everything else (and everything, when unset) to the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+ASYNC_DATABASE_REPLICA_URL = os.getenv("ASYNC_DATABASE_REPLICA_URL", _async_url(DATABASE_REPLICA_URL))
+
+# After a write, the same client reads from the primary for this long, so it sees
+# its own write while the replica catches up (0 disables)
+DATABASE_READ_YOUR_WRITES_SECONDS = int(os.getenv("DATABASE_READ_YOUR_WRITES_SECONDS", 5))
+READ_YOUR_WRITES_ENABLED = bool(DATABASE_REPLICA_URL) and DATABASE_READ_YOUR_WRITES_SECONDS > 0
+READ_YOUR_WRITES_COOKIE = "read_primary"
+
+# Longest a result computed on the replica is cached as fresh: it may predate a
+# write the replica had not applied yet, whatever the cache tags say
+DATABASE_REPLICA_CACHE_TTL = int(os.getenv("DATABASE_REPLICA_CACHE_TTL", 60))
+
+
+def _pool_options(url: str, prefix: str) -> dict:
+    """Pool settings from <prefix>_POOL_SIZE, _MAX_OVERFLOW and _POOL_TIMEOUT, SQLAlchemy's defaults if unset"""
+    parsed = make_url(url)
+    in_memory = parsed.drivername.startswith("sqlite") and parsed.database in (None, "", ":memory:")
+    # aiosqlite and in-memory SQLite do not use a QueuePool, which is what these configure
+    if parsed.drivername == "sqlite+aiosqlite" or in_memory:
+        return {}
+    options = {}
+    for name, option, cast in (
+        ("POOL_SIZE", "pool_size", int), ("MAX_OVERFLOW", "max_overflow", int), ("POOL_TIMEOUT", "pool_timeout", float)
+    ):
+        value = os.getenv(f"{prefix}_{name}")
+        if value:
+            options[option] = cast(value)
+    return options
+
+
+def _create_engine(url: str, prefix: str):
+    created = create_engine(
+        url, connect_args={"check_same_thread": False} if "sqlite" in url else {}, **_pool_options(url, prefix)
+    )
+    _instrument(created)
+    return created
+
+
+def _create_async_engine(url: str, prefix: str):
+    created = create_async_engine(url, **_pool_options(url, prefix))
+    _instrument(created.sync_engine)
+    return created
+
+
+def _instrument(sync_engine) -> None:
+    if METRICS_ENABLED:
+        instrument_engine(sync_engine)
+    if DIAGNOSTICS_ENABLED:
+        trace_engine(sync_engine)
+
+
+engine = _create_engine(DATABASE_URL, "DATABASE")
+replica_engine = _create_engine(DATABASE_REPLICA_URL, "DATABASE_REPLICA") if DATABASE_REPLICA_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions on the replica are marked, see ``reads_replica``
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=replica_engine, info={"replica": True}
+) if DATABASE_REPLICA_URL else SessionLocal
 
 Base = declarative_base()
 
+async_engine = None
+async_replica_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+
+if DATABASE_ASYNC:
+    async_engine = _create_async_engine(ASYNC_DATABASE_URL, "DATABASE")
+    # Objects are serialized after the handler returns, outside the greenlet, so
+    # they must not expire on commit and trigger a lazy refresh
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    async_replica_engine = async_engine
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if DATABASE_REPLICA_URL:
+        async_replica_engine = _create_async_engine(ASYNC_DATABASE_REPLICA_URL, "DATABASE_REPLICA")
+        AsyncReadSessionLocal = async_sessionmaker(
+            bind=async_replica_engine, autoflush=False, expire_on_commit=False, info={"replica": True}
+        )
+
 
 def get_db():
     db = SessionLocal()
@@ -23,3 +126,109 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _reads_primary(request: Request) -> bool:
+    # Set by ReadYourWritesMiddleware on the client's recent writes
+    return READ_YOUR_WRITES_COOKIE in request.cookies
+
+
+def read_session_factory(request: Request) -> sessionmaker:
+    """Sync sessions for the request's reads: the replica, or the primary for a client that has just written"""
+    return SessionLocal if _reads_primary(request) else ReadSessionLocal
+
+
+def get_read_db(request: Request):
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    async with (AsyncSessionLocal if _reads_primary(request) else AsyncReadSessionLocal)() as db:
+        yield db
+
+
+# Session dependency used by the routers, selected by DATABASE_ASYNC
+get_session = get_async_db if DATABASE_ASYNC else get_db
+# Same for read-only routes that tolerate replica lag: the replica, or the primary
+# for a client that has just written
+get_read_session = get_async_read_db if DATABASE_ASYNC else get_read_db
+
+DBSession = Union[Session, AsyncSession]
+
+
+def reads_replica(db: DBSession) -> bool:
+    """Whether the session reads from the replica, whose data may lag the primary"""
+    return db.info.get("replica", False)
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware keeping clients that just wrote on the primary
+
+    A successful POST, PUT, PATCH or DELETE sets a cookie expiring after
+    DATABASE_READ_YOUR_WRITES_SECONDS; while the client sends it back,
+    ``get_read_session`` (and ``read_session_factory``) give it the primary. The
+    frontend sends it cross-origin with ``withCredentials``, which CORS allows.
+    Cached results computed on the replica are not served to it either (see
+    ``reads_replica``), since they may predate its write.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={DATABASE_READ_YOUR_WRITES_SECONDS}; "
+            f"Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", self.cookie)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def upsert(db: Session, model):
+    """INSERT for model supporting ON CONFLICT on the session's dialect (Postgres or SQLite)"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def lock_for_write(db: Session) -> None:
+    """Make the SELECT ... FOR UPDATE that follows serialize writers on SQLite too
+
+    Postgres locks the selected rows. SQLite ignores FOR UPDATE, and its driver
+    reads outside any transaction until the first write, so take SQLite's write
+    lock up front (BEGIN IMMEDIATE): a concurrent writer waits here, then reads
+    what this one committed.
+    """
+    connection = db.connection()
+    if connection.dialect.name == "sqlite" and not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+async def run_in_session(db, fn, *args, **kwargs):
+    """Run a sync service function against either kind of session without blocking the loop
+
+    An AsyncSession runs it through ``run_sync`` so statements are awaited on the
+    async driver; a plain Session runs it in the threadpool, as a sync route would.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -0,0 +1,264 @@
+"""Opt-in per-request SQL diagnostics for development and canary pods.
+
+With DIAGNOSTICS_ENABLED, every statement a request executes is recorded with
+its normalized SQL, duration and the application frames that issued it. The
+same normalized statement run DIAGNOSTICS_N_PLUS_ONE times or more in one
+request is reported as a suspected N+1 (a query per row of an earlier one), and
+statements slower than DIAGNOSTICS_SLOW_QUERY_MS are printed as they finish.
+
+The last DIAGNOSTICS_MAX_REQUESTS traces are kept in memory and served at
+``/debug/requests/{id}``; every response carries its id in ``X-Request-Id``.
+Walking the stack for each statement is too slow to leave on everywhere, which
+is why this is separate from the always-on counters in metrics.py.
+"""
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DIAGNOSTICS_ENABLED = os.getenv("DIAGNOSTICS_ENABLED", "false").lower() in ("1", "true", "yes")
+# Repetitions of one normalized statement within a request reported as a suspected N+1
+DIAGNOSTICS_N_PLUS_ONE = int(os.getenv("DIAGNOSTICS_N_PLUS_ONE", 5))
+# Statements at least this slow are printed, inside a request or not
+DIAGNOSTICS_SLOW_QUERY_MS = float(os.getenv("DIAGNOSTICS_SLOW_QUERY_MS", 100))
+# Request traces kept for /debug/requests
+DIAGNOSTICS_MAX_REQUESTS = int(os.getenv("DIAGNOSTICS_MAX_REQUESTS", 200))
+# Application frames recorded per statement, innermost first
+DIAGNOSTICS_STACK_DEPTH = int(os.getenv("DIAGNOSTICS_STACK_DEPTH", 4))
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_SKIPPED_FILES = (os.path.abspath(__file__), os.path.join(APP_ROOT, "metrics.py"))
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize(statement: str) -> str:
+    """Statement text with whitespace collapsed and literals and IN lists elided
+
+    Two executions differing only in their parameters normalize to the same text.
+    """
+    statement = " ".join(statement.split())
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _LITERAL.sub("?", statement)
+
+
+def call_site(depth: int = DIAGNOSTICS_STACK_DEPTH) -> List[str]:
+    """The innermost application frames of the calling thread, as ``file:line in function``"""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < depth:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and filename not in _SKIPPED_FILES and "site-packages" not in filename:
+            frames.append(f"{filename[len(APP_ROOT):]}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return frames
+
+
+def repeated(statements: Iterable[Dict], threshold: int) -> List[Dict]:
+    """Normalized statements executed at least threshold times, most frequent first"""
+    groups: Dict[str, Dict] = {}
+    for statement in statements:
+        group = groups.get(statement["sql"])
+        if group is None:
+            groups[statement["sql"]] = {
+                "sql": statement["sql"], "count": 1, "total_ms": statement["ms"], "stack": statement["stack"]
+            }
+        else:
+            group["count"] += 1
+            group["total_ms"] += statement["ms"]
+    found = [group for group in groups.values() if group["count"] >= threshold]
+    for group in found:
+        group["total_ms"] = round(group["total_ms"], 3)
+    return sorted(found, key=lambda group: group["count"], reverse=True)
+
+
+class RequestTrace:
+    """Statements executed while serving one request"""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = datetime.utcnow()
+        self.duration_ms: Optional[float] = None
+        self.statements: List[Dict] = []
+
+    def n_plus_one(self) -> List[Dict]:
+        return repeated(self.statements, DIAGNOSTICS_N_PLUS_ONE)
+
+    def slow(self) -> List[Dict]:
+        return [statement for statement in self.statements if statement["ms"] >= DIAGNOSTICS_SLOW_QUERY_MS]
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "queries": len(self.statements),
+            "db_ms": round(sum(statement["ms"] for statement in self.statements), 3),
+            "n_plus_one": len(self.n_plus_one()),
+            "slow": len(self.slow()),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.summary(),
+            "n_plus_one": self.n_plus_one(),
+            "slow": self.slow(),
+            "statements": self.statements,
+        }
+
+
+class TraceStore:
+    """The most recent request traces, oldest evicted first"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._traces: "OrderedDict[str, RequestTrace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, trace: RequestTrace) -> None:
+        with self._lock:
+            self._traces[trace.id] = trace
+            while len(self._traces) > self.max_entries:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[RequestTrace]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def recent(self, limit: int) -> List[RequestTrace]:
+        with self._lock:
+            return list(reversed(self._traces.values()))[:limit]
+
+
+traces = TraceStore(DIAGNOSTICS_MAX_REQUESTS)
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def _record(statements: List[Dict], statement: str, elapsed: float, stack: List[str], executemany: bool) -> None:
+    statements.append({
+        "sql": normalize(statement),
+        "ms": round(elapsed * 1000, 3),
+        "executemany": executemany,
+        "stack": stack,
+    })
+
+
+def trace_engine(engine) -> None:
+    """Record the statements run through engine (a sync Engine) into the current request's trace"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._diagnostics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._diagnostics_start
+        trace = _current.get()
+        slow = elapsed * 1000 >= DIAGNOSTICS_SLOW_QUERY_MS
+        if trace is None and not slow:
+            return
+        stack = call_site()
+        if trace is not None:
+            _record(trace.statements, statement, elapsed, stack, executemany)
+        if slow:
+            where = f"{trace.method} {trace.path}" if trace is not None else "background"
+            print(f"Slow query ({elapsed * 1000:.1f} ms) in {where}: {normalize(statement)}"
+                  f" at {stack[0] if stack else 'unknown'}")
+
+
+class QueryRecorder:
+    """Records every statement run on the given engines while active, from any thread
+
+    Used where statements are not tied to one request, e.g. by the pytest plugin.
+    """
+
+    def __init__(self, engines: Iterable):
+        self.engines = list(engines)
+        self.statements: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._recorder_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._recorder_start
+        stack = call_site()
+        with self._lock:
+            _record(self.statements, statement, elapsed, stack, executemany)
+
+    def __enter__(self) -> "QueryRecorder":
+        from sqlalchemy import event
+
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        from sqlalchemy import event
+
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+
+    def report(self) -> str:
+        """Statements grouped by normalized SQL, most frequent first, with where each came from"""
+        lines = []
+        for group in repeated(self.statements, 1):
+            lines.append(f"  {group['count']}x {group['sql']}")
+            lines.extend(f"      {frame}" for frame in group["stack"])
+        return "\n".join(lines)
+
+
+class DiagnosticsMiddleware:
+    """ASGI middleware tracing the statements of every request except /debug itself"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/debug"):
+            await self.app(scope, receive, send)
+            return
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        trace = RequestTrace(scope["method"], scope["path"] + (f"?{query}" if query else ""))
+        token = _current.set(trace)
+        start = time.perf_counter()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", trace.id.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+            trace.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            trace.route = getattr(scope.get("route"), "path", None)
+            traces.add(trace)
+            for group in trace.n_plus_one():
+                print(f"Suspected N+1 in {trace.method} {trace.path} (request {trace.id}): "
+                      f"{group['count']}x {group['sql']} at {group['stack'][0] if group['stack'] else 'unknown'}")
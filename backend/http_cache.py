@@ -0,0 +1,55 @@
+"""Conditional GET for polled endpoints.
+
+Responses carry a strong ``ETag`` and ``Cache-Control: private, no-cache``, so
+browsers keep them but revalidate every time. A request whose ``If-None-Match``
+lists the current ETag gets an empty 304 instead of the body.
+"""
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from cache import Rendered
+
+# Stored by the browser, revalidated on every use, never kept by shared caches
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag(*parts: object) -> str:
+    """Strong ETag from the values a representation is derived from"""
+    digest = hashlib.blake2b("/".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def matches(if_none_match: Optional[str], current: str) -> bool:
+    """Whether an If-None-Match header lists the current ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = current.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+
+def headers(request: Request, current: str) -> Dict[str, str]:
+    """Validator and caching headers of a 200 or 304 response"""
+    result = {"ETag": current, "Cache-Control": CACHE_CONTROL}
+    # The CORS middleware adds Vary: Origin to cross-origin requests; same-origin
+    # responses need it too, or a browser could reuse one without CORS headers
+    if "origin" not in request.headers:
+        result["Vary"] = "Origin"
+    return result
+
+
+def not_modified(request: Request, current: str) -> Optional[Response]:
+    """An empty 304 if the client already has the current representation, else None"""
+    if matches(request.headers.get("if-none-match"), current):
+        return Response(status_code=304, headers=headers(request, current))
+    return None
+
+
+def rendered_response(request: Request, rendered: Rendered) -> Response:
+    """A cached JSON body, or a 304 if the client already has it"""
+    current = f'"{rendered.digest}"'
+    return not_modified(request, current) or Response(
+        rendered.body, media_type="application/json", headers=headers(request, current)
+    )
@@ -0,0 +1,74 @@
+"""Incremental parsing of NDJSON and CSV uploads.
+
+Bodies are consumed line by line so an import of any size is validated as it
+arrives, with memory bounded by the longest line rather than the whole upload.
+"""
+import csv
+from typing import AsyncIterator, List, Optional, Type, Union
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+
+
+async def iter_lines(request: Request) -> AsyncIterator[bytes]:
+    """Split a streamed request body into non-empty lines"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+def validation_message(error: ValidationError) -> str:
+    """First error of a ValidationError, prefixed with the offending field"""
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+class RowParser:
+    """Turns single NDJSON or CSV lines into validated models
+
+    For CSV the first line is the header; empty cells fall back to the model's
+    defaults. Quoted fields spanning several lines are not supported.
+    """
+
+    FORMATS = ("ndjson", "csv")
+
+    def __init__(self, model: Type[BaseModel], format: str = "ndjson"):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        self.model = model
+        self.format = format
+        self.header: Optional[List[str]] = None
+
+    @classmethod
+    def for_content_type(cls, model: Type[BaseModel], content_type: str) -> "RowParser":
+        return cls(model, "csv" if "csv" in content_type else "ndjson")
+
+    def parse(self, line: Union[bytes, str]) -> Union[BaseModel, str, None]:
+        """Model for the line, an error message if invalid, None for the CSV header"""
+        if self.format == "ndjson":
+            try:
+                return self.model.model_validate_json(line)
+            except ValidationError as e:
+                return validation_message(e)
+
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig" if self.header is None else "utf-8", errors="replace")
+        cells = next(csv.reader([line.rstrip("\r\n")]), [])
+        if self.header is None:
+            self.header = [cell.strip() for cell in cells]
+            return None
+        if len(cells) != len(self.header):
+            return f"Expected {len(self.header)} columns, got {len(cells)}"
+        try:
+            return self.model.model_validate(
+                {name: value for name, value in zip(self.header, cells) if value != ""}
+            )
+        except ValidationError as e:
+            return validation_message(e)
+
@@ -0,0 +1,122 @@
+import time
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models import Post, Engagement, SocialAccount
+from redis_client import RedisClient, AsyncRedisClient, redis_client, async_redis_client
+
+# (post id, account id, platform, total engagement) of a published post
+Entry = Tuple[int, int, str, float]
+
+
+class PostLeaderboard:
+    """Published posts ranked by likes + comments + shares in Redis sorted sets
+
+    Every post is a member of the global set, its account's set and its
+    platform's set, so the top N of any of them is a single ZREVRANGE.
+    PostService keeps the sets current after each committed write; ``rebuild``
+    recomputes them from the database, e.g. after Redis lost data.
+
+    Readers only trust the sets once a rebuild has completed (``BUILT_KEY``
+    exists); until then ``top_ids`` returns None and callers query the database.
+    """
+
+    PREFIX = "leaderboard:posts"
+    BUILT_KEY = "leaderboard:posts:built"
+    REBUILD_PREFIX = "leaderboard:rebuild:"
+    REBUILD_BATCH = 10000
+
+    def __init__(self, client: RedisClient, async_client: AsyncRedisClient):
+        self.client = client
+        self.async_client = async_client
+
+    def keys(self, account_id: int, platform: str) -> List[str]:
+        return [self.PREFIX, f"{self.PREFIX}:account:{account_id}", f"{self.PREFIX}:platform:{platform}"]
+
+    def key(self, account_id: Optional[int] = None, platform: Optional[str] = None) -> str:
+        """The narrowest set covering the filters; callers still check the other filter"""
+        if account_id:
+            return f"{self.PREFIX}:account:{account_id}"
+        if platform:
+            return f"{self.PREFIX}:platform:{platform}"
+        return self.PREFIX
+
+    def update(self, entries: Iterable[Entry]) -> bool:
+        """Set the scores of published posts"""
+        return self.client.update_sorted_sets(self._adds(entries))
+
+    async def aupdate(self, entries: Iterable[Entry]) -> bool:
+        return await self.async_client.update_sorted_sets(self._adds(entries))
+
+    def remove(self, post_id: int, account_id: int, platform: str) -> bool:
+        """Drop a post that was deleted or is no longer published"""
+        return self.client.update_sorted_sets({}, {key: [str(post_id)] for key in self.keys(account_id, platform)})
+
+    async def aremove(self, post_id: int, account_id: int, platform: str) -> bool:
+        return await self.async_client.update_sorted_sets({}, {key: [str(post_id)] for key in self.keys(account_id, platform)})
+
+    def top_ids(self, limit: int, account_id: Optional[int] = None, platform: Optional[str] = None) -> Optional[List[int]]:
+        """Ids of the best posts, best first; None if the leaderboard is unavailable"""
+        members = self.client.top_members(self.key(account_id, platform), limit, require=self.BUILT_KEY)
+        return [int(member) for member in members] if members is not None else None
+
+    async def atop_ids(self, limit: int, account_id: Optional[int] = None, platform: Optional[str] = None) -> Optional[List[int]]:
+        members = await self.async_client.top_members(self.key(account_id, platform), limit, require=self.BUILT_KEY)
+        return [int(member) for member in members] if members is not None else None
+
+    def rebuild(self, db: Session) -> int:
+        """Recompute every set from the database and swap them in atomically
+
+        Returns the number of posts ranked. Updates committed while the rebuild
+        runs can be overwritten by the swap; run it again if writes were heavy.
+        """
+        # Leftovers of a rebuild that failed half way
+        self.client.delete_many(self.client.get_keys(self.REBUILD_PREFIX + "*"))
+
+        rows = db.query(
+            Post.id,
+            Post.account_id,
+            SocialAccount.platform,
+            Engagement.likes + Engagement.comments + Engagement.shares
+        ).join(
+            Engagement, Engagement.post_id == Post.id
+        ).join(
+            SocialAccount, SocialAccount.id == Post.account_id
+        ).filter(
+            Post.status == "published"
+        ).execution_options(yield_per=self.REBUILD_BATCH)
+
+        built = set()
+        batch = []
+        count = 0
+        for row in rows:
+            batch.append((row[0], row[1], row[2], row[3] or 0))
+            if len(batch) >= self.REBUILD_BATCH:
+                built.update(self._stage(batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            built.update(self._stage(batch))
+            count += len(batch)
+
+        self.client.update_sorted_sets({self.REBUILD_PREFIX + self.BUILT_KEY: {"at": time.time()}})
+        built.add(self.BUILT_KEY)
+
+        stale = [key for key in self.client.get_keys(f"{self.PREFIX}*") if key not in built]
+        self.client.rename_many({self.REBUILD_PREFIX + key: key for key in built}, delete=stale)
+        return count
+
+    def _stage(self, entries: List[Entry]) -> set:
+        adds = self._adds(entries)
+        if not self.client.update_sorted_sets({self.REBUILD_PREFIX + key: scores for key, scores in adds.items()}):
+            raise RuntimeError("Redis is unavailable, leaderboard not rebuilt")
+        return set(adds)
+
+    def _adds(self, entries: Iterable[Entry]) -> dict:
+        adds = {}
+        for post_id, account_id, platform, score in entries:
+            for key in self.keys(account_id, platform):
+                adds.setdefault(key, {})[str(post_id)] = score
+        return adds
+
+
+leaderboard = PostLeaderboard(redis_client, async_redis_client)
@@ -1,7 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
-from routers import analytics, posts, accounts
+from database import engine, Base, ReadYourWritesMiddleware, READ_YOUR_WRITES_ENABLED
+from routers import analytics, posts, accounts, export, debug
+from redis_client import async_redis_client
+from scheduler import dispatcher, SCHEDULER_ENABLED
+from metrics import MetricsMiddleware, METRICS_ENABLED, render as render_metrics
+from diagnostics import DiagnosticsMiddleware, DIAGNOSTICS_ENABLED
 import models
 
 # Create database tables
@@ -10,7 +15,9 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="Social Media Dashboard API",
     description="API for social media analytics and management",
-    version="1.0.0"
+    version="1.0.0",
+    # Responses that are not pre-rendered are encoded with orjson rather than json.dumps
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -22,10 +29,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Clients that just wrote read from the primary until the replica has caught up
+if READ_YOUR_WRITES_ENABLED:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Statement tracing for development and canary pods, see diagnostics.py
+if DIAGNOSTICS_ENABLED:
+    app.add_middleware(DiagnosticsMiddleware)
+
+# Outermost, so the latency covers every other middleware
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(analytics.router)
 app.include_router(posts.router)
 app.include_router(accounts.router)
+app.include_router(export.router)
+if DIAGNOSTICS_ENABLED:
+    app.include_router(debug.router)
+
+
+@app.on_event("startup")
+async def start_scheduler():
+    if SCHEDULER_ENABLED:
+        dispatcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    await dispatcher.stop()
+
+
+@app.on_event("shutdown")
+async def close_redis():
+    await async_redis_client.close()
 
 
 @app.get("/")
@@ -42,12 +80,22 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Request, database, Redis and cache metrics in the Prometheus text format"""
+    body, content_type = render_metrics()
+    return Response(body, headers={"Content-Type": content_type})
+
+
 # Seed data endpoint for demo purposes
 @app.post("/api/seed")
 def seed_data():
     """Seed the database with sample data for demo purposes"""
     from sqlalchemy.orm import Session
     from database import SessionLocal
+    from services.rollup_service import RollupService
+    from services.latest_metrics_service import LatestMetricsService
+    from leaderboard import leaderboard
     from datetime import datetime, timedelta
     import random
     
@@ -160,6 +208,17 @@ def seed_data():
         
         db.commit()
         
+        # Posts and snapshots were inserted directly, so derive the rollups from them
+        RollupService.rebuild(db)
+        LatestMetricsService.rebuild(db)
+        db.commit()
+        
+        # Without Redis, top posts keep being read from the database
+        try:
+            leaderboard.rebuild(db)
+        except RuntimeError as e:
+            print(e)
+        
         return {
             "message": "Database seeded successfully",
             "accounts": len(accounts),
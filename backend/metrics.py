@@ -0,0 +1,201 @@
+"""Per-request performance metrics, exposed at /metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every request and labels it with its route template
+(``/api/posts/{post_id}``, not the raw path). SQLAlchemy cursor events and the
+Redis clients add their work to the request being served, found through a
+context variable, and the totals are flushed to the labelled metrics once per
+request, so a query or a Redis call costs a few attribute updates. Work outside
+a request (the scheduler, tools) is labelled ``background``.
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers so /metrics reports all of them.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# prometheus_client chooses per-process value files or in-memory values from
+# PROMETHEUS_MULTIPROC_DIR when it is imported, so .env is loaded first; an
+# empty value, as in the example .env, means a single process
+load_dotenv()
+if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess  # noqa: E402
+
+# Instrument requests, queries and Redis calls and serve /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Upper bounds in seconds of the request latency histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Upper bounds of the queries-per-request histogram
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Upper bounds in seconds of the scheduler's dispatch lag histogram
+DISPATCH_LAG_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 3600)
+
+BACKGROUND = "background"
+UNMATCHED = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency until the last body chunk is sent",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries issued per request",
+    ["route"], buckets=QUERY_BUCKETS
+)
+DB_QUERIES = Counter("db_queries", "Database statements executed", ["route"])
+DB_SECONDS = Counter("db_query_seconds", "Time spent executing database statements", ["route"])
+REDIS_CALLS = Counter("redis_calls", "Redis client operations", ["route", "command"])
+REDIS_SECONDS = Counter("redis_call_seconds", "Time spent in Redis client operations", ["route", "command"])
+REDIS_ERRORS = Counter("redis_errors", "Redis client operations that failed", ["command"])
+DISPATCH_LAG = Histogram(
+    "scheduler_dispatch_lag_seconds", "How long after its scheduled time a post was published",
+    buckets=DISPATCH_LAG_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests", "Cache lookups by key prefix: hit, stale (served while refreshing), miss or unavailable",
+    ["prefix", "result"]
+)
+
+
+class RequestStats:
+    """Database and Redis work of one request, flushed to the metrics when it ends"""
+
+    __slots__ = ("db_queries", "db_seconds", "redis")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # command -> [calls, seconds]
+        self.redis: Dict[str, List] = {}
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being served, None outside a request"""
+    return _current.get()
+
+
+def key_prefix(key: str) -> str:
+    """Low-cardinality prefix of a cache key, e.g. ``top:posts:`` for ``top:posts:10:all:all``"""
+    segments = key.split(":")[:-1]
+    prefix = []
+    for segment in segments[:2]:
+        if not segment.isidentifier() or segment in ("all", "None"):
+            break
+        prefix.append(segment)
+    return ":".join(prefix) + ":" if prefix else key.split(":")[0]
+
+
+def observe_redis(command: str, seconds: float) -> None:
+    stats = _current.get()
+    if stats is None:
+        REDIS_CALLS.labels(BACKGROUND, command).inc()
+        REDIS_SECONDS.labels(BACKGROUND, command).inc(seconds)
+        return
+    totals = stats.redis.get(command)
+    if totals is None:
+        stats.redis[command] = [1, seconds]
+    else:
+        totals[0] += 1
+        totals[1] += seconds
+
+
+def observe_redis_error(command: str) -> None:
+    REDIS_ERRORS.labels(command).inc()
+
+
+def observe_dispatch_lag(seconds: float) -> None:
+    DISPATCH_LAG.observe(seconds)
+
+
+def observe_cache(key: str, result: str) -> None:
+    CACHE_REQUESTS.labels(key_prefix(key), result).inc()
+
+
+def instrument_engine(engine) -> None:
+    """Count and time every statement run through engine (a sync Engine)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        stats = _current.get()
+        if stats is None:
+            DB_QUERIES.labels(BACKGROUND).inc()
+            DB_SECONDS.labels(BACKGROUND).inc(elapsed)
+        else:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+
+def _route(scope) -> str:
+    # FastAPI stores the matched route in the scope while routing
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, queries and Redis calls per route template
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streaming responses pass
+    through untouched and are timed until their last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            _flush(scope["method"], _route(scope), status, elapsed, stats)
+
+
+def _flush(method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+    REQUEST_QUERIES.labels(route).observe(stats.db_queries)
+    if stats.db_queries:
+        DB_QUERIES.labels(route).inc(stats.db_queries)
+        DB_SECONDS.labels(route).inc(stats.db_seconds)
+    for command, (calls, seconds) in stats.redis.items():
+        REDIS_CALLS.labels(route, command).inc(calls)
+        REDIS_SECONDS.labels(route, command).inc(seconds)
+
+
+def render() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with their content type"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
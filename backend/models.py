@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Float, Text, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -6,6 +6,8 @@ from database import Base
 
 class SocialAccount(Base):
     __tablename__ = "social_accounts"
+    # Keyset pagination of the active accounts listing
+    __table_args__ = (Index("ix_social_accounts_active_created_id", "is_active", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     platform = Column(String, index=True)  # twitter, facebook, instagram, linkedin
@@ -21,6 +23,16 @@ class SocialAccount(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset pagination of the posts listing, filtered and unfiltered
+        Index("ix_posts_account_status_created_id", "account_id", "status", "created_at", "id"),
+        Index("ix_posts_account_created_id", "account_id", "created_at", "id"),
+        Index("ix_posts_created_id", "created_at", "id"),
+        # Status listings and counts, and the due scheduled posts in order
+        Index("ix_posts_status_created_id", "status", "created_at", "id"),
+        Index("ix_posts_status_scheduled", "status", "scheduled_time"),
+        Index("ix_posts_status_published", "status", "published_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(Integer, ForeignKey("social_accounts.id"))
@@ -53,8 +65,14 @@ class Engagement(Base):
     post = relationship("Post", back_populates="engagement")
 
 
+# Top posts order by total engagement; the expression must match AnalyticsService._top_posts
+Index("ix_engagement_total", (Engagement.likes + Engagement.comments + Engagement.shares).desc())
+
+
 class Analytics(Base):
     __tablename__ = "analytics"
+    # Snapshot history per account, and the latest snapshot per account
+    __table_args__ = (Index("ix_analytics_account_date", "account_id", "date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(Integer, ForeignKey("social_accounts.id"))
@@ -70,6 +88,46 @@ class Analytics(Base):
     account = relationship("SocialAccount", back_populates="analytics")
 
 
+class AccountLatestMetrics(Base):
+    """Newest analytics snapshot of every account, and its followers a week before it
+
+    Maintained by LatestMetricsService alongside the writes in AccountService.
+    """
+    __tablename__ = "account_latest_metrics"
+
+    account_id = Column(Integer, ForeignKey("social_accounts.id"), primary_key=True)
+    date = Column(DateTime, nullable=False)
+    followers = Column(Integer, default=0)
+    following = Column(Integer, default=0)
+    total_posts = Column(Integer, default=0)
+    total_engagement = Column(Integer, default=0)
+    reach = Column(Integer, default=0)
+    impressions = Column(Integer, default=0)
+    profile_views = Column(Integer, default=0)
+    # Latest snapshot at least 7 days older than ``date``, for growth
+    week_ago_date = Column(DateTime, nullable=True)
+    week_ago_followers = Column(Integer, nullable=True)
+
+
+class EngagementDaily(Base):
+    """Per account, per day totals of published posts' engagement
+
+    Maintained by RollupService alongside the writes in PostService.
+    """
+    __tablename__ = "engagement_daily"
+    __table_args__ = (UniqueConstraint("account_id", "date", name="uq_engagement_daily_account_date"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("social_accounts.id"), nullable=False)
+    date = Column(Date, nullable=False, index=True)
+    likes = Column(Integer, default=0, nullable=False)
+    comments = Column(Integer, default=0, nullable=False)
+    shares = Column(Integer, default=0, nullable=False)
+    views = Column(Integer, default=0, nullable=False)
+    clicks = Column(Integer, default=0, nullable=False)
+    post_count = Column(Integer, default=0, nullable=False)
+
+
 class Comment(Base):
     __tablename__ = "comments"
 
@@ -0,0 +1,44 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row of a page, ``(created_at, id)``, as
+URL-safe base64 of a small JSON array. The next page is everything strictly
+after that key in the listing's order, so it is an index range scan however
+deep the page and does not shift when new rows arrive.
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+import orjson
+from sqlalchemy import Column, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    payload = orjson.dumps([created_at.isoformat(), id])
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Sort key of a cursor, raises ValueError if it is malformed"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = orjson.loads(payload)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError, orjson.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def after_cursor(created_at: Column, id: Column, cursor: str, descending: bool = False) -> ColumnElement:
+    """Filter for rows strictly after the cursor in (created_at, id) order"""
+    key = tuple_(created_at, id)
+    # A row-value comparison, unlike the equivalent OR, is planned as an index range
+    after = decode_cursor(cursor)
+    return key < after if descending else key > after
+
+
+def next_cursor(rows: list, limit: int) -> Optional[str]:
+    """Cursor for the page after ``rows``, fetched with ``limit + 1``; trims rows to limit"""
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    return encode_cursor(rows[-1].created_at, rows[-1].id)
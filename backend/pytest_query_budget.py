@@ -0,0 +1,77 @@
+"""pytest plugin failing tests that issue more database statements than they declare.
+
+Enable it with ``pytest -p pytest_query_budget`` (or ``pytest_plugins`` in a
+conftest), then declare a budget for a whole test:
+
+    @pytest.mark.query_budget(3)
+    def test_dashboard(client):
+        client.get("/api/analytics/dashboard")
+
+or for one block, through the fixture:
+
+    def test_posts(client, query_budget):
+        with query_budget(2):
+            client.get("/api/posts/?limit=100")
+
+Statements are counted on the application's engines from any thread, so
+requests served by TestClient count too. A failing test reports the statements
+grouped by normalized SQL with where they were issued, which makes an N+1 stand
+out as one statement repeated once per row.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from diagnostics import QueryRecorder
+
+
+def _engines():
+    # Imported late so tests can set DATABASE_URL first
+    import database
+
+    engines = [database.engine]
+    if database.replica_engine is not database.engine:
+        engines.append(database.replica_engine)
+    if database.async_engine is not None:
+        engines.append(database.async_engine.sync_engine)
+    if database.async_replica_engine is not database.async_engine:
+        engines.append(database.async_replica_engine.sync_engine)
+    return engines
+
+
+def _check(recorder: QueryRecorder, budget: int, what: str) -> None:
+    if len(recorder.statements) > budget:
+        pytest.fail(
+            f"{what} executed {len(recorder.statements)} statements, budget {budget}:\n{recorder.report()}",
+            pytrace=False
+        )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(n): fail the test if it executes more than n database statements"
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    # A test that already failed raises out of the yield and reports its own error
+    with QueryRecorder(_engines()) as recorder:
+        result = yield
+    _check(recorder, marker.args[0], item.name)
+    return result
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager factory: ``with query_budget(n):`` fails if the block runs more than n statements"""
+    @contextmanager
+    def budget(n: int):
+        with QueryRecorder(_engines()) as recorder:
+            yield recorder
+        _check(recorder, n, "Block")
+
+    return budget
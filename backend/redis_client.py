@@ -1,8 +1,21 @@
 import redis
+import redis.asyncio as aioredis
+import asyncio
+import functools
+import inspect
 import json
 import os
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
 from dotenv import load_dotenv
-from typing import Any, Optional
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from metrics import observe_redis, observe_redis_error
+from serialization import Serializer
 
 load_dotenv()
 
@@ -10,68 +23,692 @@ REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 
+# Connection pool of the async client
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 2))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 1))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 1))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", 3))
+REDIS_BACKOFF_BASE = float(os.getenv("REDIS_BACKOFF_BASE", 0.05))
+REDIS_BACKOFF_CAP = float(os.getenv("REDIS_BACKOFF_CAP", 1))
+# Failures of one command are printed at most this often; redis_errors counts every one
+REDIS_ERROR_LOG_SECONDS = float(os.getenv("REDIS_ERROR_LOG_SECONDS", 60))
+
+# Optional in-process tier in front of Redis, kept coherent across replicas by
+# invalidation messages on LOCAL_CACHE_CHANNEL
+LOCAL_CACHE_ENABLED = os.getenv("REDIS_LOCAL_CACHE", "false").lower() in ("1", "true", "yes")
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("REDIS_LOCAL_CACHE_MAX_ENTRIES", 1024))
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("REDIS_LOCAL_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+LOCAL_CACHE_TTL = float(os.getenv("REDIS_LOCAL_CACHE_TTL", 30))
+LOCAL_CACHE_CHANNEL = "cache:invalidate"
+
+# Deletes a lock only if it still holds the caller's token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _instrumented(command: str) -> Callable:
+    """Count and time a client operation for /metrics under command"""
+    def decorate(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    observe_redis(command, time.perf_counter() - start)
+        else:
+            @functools.wraps(method)
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    observe_redis(command, time.perf_counter() - start)
+        return timed
+    return decorate
+
+
+# command -> (when its last failure was printed, failures not printed since)
+_error_log: Dict[str, Tuple[float, int]] = {}
+
+
+def _error(command: str, e: Exception) -> None:
+    observe_redis_error(command)
+    now = time.monotonic()
+    logged, suppressed = _error_log.get(command, (None, 0))
+    if logged is not None and now - logged < REDIS_ERROR_LOG_SECONDS:
+        _error_log[command] = (logged, suppressed + 1)
+        return
+    _error_log[command] = (now, 0)
+    more = f" ({suppressed} more since the last report)" if suppressed else ""
+    print(f"Redis {command} error: {e}{more}")
+
+
+class LocalCache:
+    """Bounded LRU of decoded values with a per-entry TTL
+
+    Capped both by entry count and by the approximate encoded size of the values.
+    Values are shared between callers and must be treated as read-only.
+
+    ``epoch`` advances on every invalidation; fills pass the epoch observed before
+    their Redis read and are dropped if an invalidation raced with that read.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.epoch = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for key"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None, epoch: Optional[int] = None) -> None:
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def discard(self, keys: List[str]) -> None:
+        with self._lock:
+            self.epoch += 1
+            for key in keys:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
 
 class RedisClient:
-    def __init__(self):
+    def __init__(self, local_cache: bool = LOCAL_CACHE_ENABLED, serializer: Optional[Serializer] = None):
+        # Values are framed binary (see serialization.py), so responses stay bytes
         self.client = redis.Redis(
             host=REDIS_HOST,
             port=REDIS_PORT,
             db=REDIS_DB,
-            decode_responses=True
+            decode_responses=False
         )
+        self.serializer = serializer or Serializer()
+        self.local = None
+        self._origin = uuid.uuid4().hex
+        self._subscribed = threading.Event()
+
+        if local_cache:
+            self.local = LocalCache(LOCAL_CACHE_MAX_ENTRIES, LOCAL_CACHE_MAX_BYTES, LOCAL_CACHE_TTL)
+            threading.Thread(target=self._listen_invalidations, name="redis-l1-invalidation", daemon=True).start()
+
+    def _local_enabled(self) -> bool:
+        # Without a live subscription other replicas' writes would go unnoticed
+        return self.local is not None and self._subscribed.is_set()
+
+    def _listen_invalidations(self) -> None:
+        """Evict local entries written or deleted by any replica"""
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(LOCAL_CACHE_CHANNEL)
+                # Messages published before the subscription was live were missed
+                self.local.clear()
+                self._subscribed.set()
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    if payload["origin"] != self._origin:
+                        self.local.discard(payload["keys"])
+            except Exception as e:
+                _error("SUBSCRIBE", e)
+            self._subscribed.clear()
+            self.local.clear()
+            time.sleep(1)
+
+    def _publish_invalidation(self, pipe, keys: List[str]) -> None:
+        if self.local is not None:
+            pipe.publish(LOCAL_CACHE_CHANNEL, json.dumps({"origin": self._origin, "keys": keys}))
+
+    def local_stats(self) -> Optional[Dict[str, int]]:
+        """Hit/miss counters of the in-process tier, None when it is disabled"""
+        return self.local.stats() if self.local is not None else None
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from Redis"""
+        values = self.get_many([key])
+        return values[0] if values is not None else None
+
+    @_instrumented("MGET")
+    def get_many(self, keys: List[str]) -> Optional[List[Optional[Any]]]:
+        """Get several values in one MGET, None for missing keys
+
+        Returns None instead of a list if Redis is unavailable.
+        """
+        values: Dict[str, Any] = {}
+        missing = keys
+        epoch = None
+        if self._local_enabled():
+            epoch = self.local.epoch
+            missing = []
+            for key in keys:
+                found, value = self.local.get(key)
+                if found:
+                    values[key] = value
+                else:
+                    missing.append(key)
         try:
-            value = self.client.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            if missing:
+                for key, raw in zip(missing, self.client.mget(missing)):
+                    if raw is None:
+                        values[key] = None
+                        continue
+                    values[key] = self.serializer.loads(raw)
+                    if epoch is not None:
+                        self.local.set(key, values[key], len(raw), epoch=epoch)
+            return [values[key] for key in keys]
         except Exception as e:
-            print(f"Redis GET error: {e}")
+            _error("MGET", e)
             return None
 
     def set(self, key: str, value: Any, expire: int = 3600) -> bool:
         """Set value in Redis with expiration"""
+        return self.set_many({key: value}, expire=expire)
+
+    @_instrumented("SET")
+    def set_many(self, values: Dict[str, Any], expire: int = 3600) -> bool:
+        """Set several values with the same expiration in one round trip"""
         try:
-            self.client.setex(key, expire, json.dumps(value))
+            encoded = {key: self.serializer.dumps(value) for key, value in values.items()}
+            pipe = self.client.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                pipe.setex(key, expire, raw)
+            self._publish_invalidation(pipe, list(values))
+            pipe.execute()
+            if self._local_enabled():
+                for key, value in values.items():
+                    self.local.set(key, value, len(encoded[key]), ttl=expire)
             return True
         except Exception as e:
-            print(f"Redis SET error: {e}")
+            _error("SET", e)
             return False
 
     def delete(self, key: str) -> bool:
         """Delete key from Redis"""
+        return self.delete_many([key])
+
+    @_instrumented("DEL")
+    def delete_many(self, keys: List[str]) -> bool:
+        """Delete several keys in one round trip"""
+        if not keys:
+            return True
         try:
-            self.client.delete(key)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(*keys)
+            self._publish_invalidation(pipe, keys)
+            pipe.execute()
+            if self.local is not None:
+                self.local.discard(keys)
             return True
         except Exception as e:
-            print(f"Redis DELETE error: {e}")
+            _error("DEL", e)
             return False
 
+    @_instrumented("EXISTS")
     def exists(self, key: str) -> bool:
         """Check if key exists"""
         try:
             return self.client.exists(key) > 0
         except Exception as e:
-            print(f"Redis EXISTS error: {e}")
+            _error("EXISTS", e)
             return False
 
+    @_instrumented("INCRBY")
     def increment(self, key: str, amount: int = 1) -> int:
         """Increment a counter"""
         try:
-            return self.client.incrby(key, amount)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.incrby(key, amount)
+            self._publish_invalidation(pipe, [key])
+            value = pipe.execute()[0]
+            if self.local is not None:
+                self.local.discard([key])
+            return value
         except Exception as e:
-            print(f"Redis INCREMENT error: {e}")
+            _error("INCRBY", e)
             return 0
 
+    def get_counters(self, keys: List[str]) -> Optional[List[int]]:
+        """Get several integer counters in one round trip, missing keys read as 0"""
+        values = self.get_many(keys)
+        if values is None:
+            return None
+        return [int(value or 0) for value in values]
+
+    @_instrumented("INCR")
+    def increment_many(self, keys: List[str]) -> bool:
+        """Increment several counters atomically in one round trip"""
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            for key in keys:
+                pipe.incr(key)
+            self._publish_invalidation(pipe, keys)
+            pipe.execute()
+            if self.local is not None:
+                self.local.discard(keys)
+            return True
+        except Exception as e:
+            _error("INCR", e)
+            return False
+
+    @_instrumented("LOCK")
+    def acquire_lock(self, key: str, lease_ms: int) -> Optional[str]:
+        """Try to take a lock expiring after lease_ms, returns its token or None if held"""
+        token = uuid.uuid4().hex
+        try:
+            if self.client.set(key, token, nx=True, px=lease_ms):
+                return token
+            return None
+        except Exception as e:
+            _error("LOCK", e)
+            return None
+
+    @_instrumented("UNLOCK")
+    def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock taken with acquire_lock, unless its lease already passed to someone else"""
+        try:
+            return bool(self.client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            _error("UNLOCK", e)
+            return False
+
+    @_instrumented("ZADD")
+    def update_sorted_sets(
+        self,
+        adds: Dict[str, Dict[str, float]],
+        removes: Optional[Dict[str, List[str]]] = None
+    ) -> bool:
+        """Set member scores and remove members across several sorted sets in one round trip"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, scores in adds.items():
+                if scores:
+                    pipe.zadd(key, scores)
+            for key, members in (removes or {}).items():
+                if members:
+                    pipe.zrem(key, *members)
+            pipe.execute()
+            return True
+        except Exception as e:
+            _error("ZADD", e)
+            return False
+
+    @_instrumented("ZRANGE")
+    def top_members(self, key: str, count: int, require: Optional[str] = None) -> Optional[List[str]]:
+        """Highest scored members of a sorted set, best first
+
+        Returns None if Redis is unavailable or the ``require`` key does not exist.
+        """
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            if require is not None:
+                pipe.exists(require)
+            pipe.zrevrange(key, 0, count - 1)
+            results = pipe.execute()
+            if require is not None and not results[0]:
+                return None
+            return [member.decode() for member in results[-1]]
+        except Exception as e:
+            _error("ZRANGE", e)
+            return None
+
+    @_instrumented("RENAME")
+    def rename_many(self, renames: Dict[str, str], delete: Optional[List[str]] = None) -> bool:
+        """Atomically move keys to new names and delete others, e.g. to swap in rebuilt keys"""
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            for source, target in renames.items():
+                pipe.rename(source, target)
+            if delete:
+                pipe.delete(*delete)
+            pipe.execute()
+            return True
+        except Exception as e:
+            _error("RENAME", e)
+            return False
+
+    @_instrumented("SCAN")
     def get_keys(self, pattern: str) -> list:
         """Get all keys matching pattern"""
         try:
-            return self.client.keys(pattern)
+            # SCAN in batches rather than KEYS, which blocks the server for the whole keyspace
+            return [key.decode() for key in self.client.scan_iter(match=pattern, count=1000)]
         except Exception as e:
-            print(f"Redis KEYS error: {e}")
+            _error("SCAN", e)
             return []
 
 
+class AsyncRedisClient:
+    """asyncio counterpart of RedisClient
+
+    Uses an explicitly sized, health-checked connection pool with timeouts and
+    retries with exponential backoff. Encoding, the in-process tier and its
+    invalidation messages are shared with the given sync client, so both clients
+    stay coherent with each other and with other replicas.
+    """
+
+    def __init__(self, sync_client: RedisClient):
+        self.sync = sync_client
+        self.serializer = sync_client.serializer
+        # redis.asyncio connections are bound to the loop that opened them
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> aioredis.Redis:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            pool = aioredis.BlockingConnectionPool(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                timeout=REDIS_POOL_TIMEOUT,
+                socket_timeout=REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+                health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                retry=Retry(ExponentialBackoff(cap=REDIS_BACKOFF_CAP, base=REDIS_BACKOFF_BASE), REDIS_RETRIES),
+                retry_on_timeout=True
+            )
+            client = self._clients[loop] = aioredis.Redis(connection_pool=pool)
+        return client
+
+    async def close(self) -> None:
+        """Close the pool of the running loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose(close_connection_pool=True)
+
+    def _publish_invalidation(self, pipe, keys: List[str]) -> None:
+        self.sync._publish_invalidation(pipe, keys)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from Redis"""
+        values = await self.get_many([key])
+        return values[0] if values is not None else None
+
+    @_instrumented("MGET")
+    async def get_many(self, keys: List[str]) -> Optional[List[Optional[Any]]]:
+        """Get several values in one MGET, None for missing keys
+
+        Returns None instead of a list if Redis is unavailable.
+        """
+        local = self.sync.local if self.sync._local_enabled() else None
+        values: Dict[str, Any] = {}
+        missing = keys
+        epoch = None
+        if local is not None:
+            epoch = local.epoch
+            missing = []
+            for key in keys:
+                found, value = local.get(key)
+                if found:
+                    values[key] = value
+                else:
+                    missing.append(key)
+        try:
+            if missing:
+                for key, raw in zip(missing, await self.client.mget(missing)):
+                    if raw is None:
+                        values[key] = None
+                        continue
+                    values[key] = self.serializer.loads(raw)
+                    if epoch is not None:
+                        local.set(key, values[key], len(raw), epoch=epoch)
+            return [values[key] for key in keys]
+        except Exception as e:
+            _error("MGET", e)
+            return None
+
+    async def set(self, key: str, value: Any, expire: int = 3600) -> bool:
+        """Set value in Redis with expiration"""
+        return await self.set_many({key: value}, expire=expire)
+
+    @_instrumented("SET")
+    async def set_many(self, values: Dict[str, Any], expire: int = 3600) -> bool:
+        """Set several values with the same expiration in one round trip"""
+        try:
+            encoded = {key: self.serializer.dumps(value) for key, value in values.items()}
+            pipe = self.client.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                pipe.setex(key, expire, raw)
+            self._publish_invalidation(pipe, list(values))
+            await pipe.execute()
+            if self.sync._local_enabled():
+                for key, value in values.items():
+                    self.sync.local.set(key, value, len(encoded[key]), ttl=expire)
+            return True
+        except Exception as e:
+            _error("SET", e)
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """Delete key from Redis"""
+        return await self.delete_many([key])
+
+    @_instrumented("DEL")
+    async def delete_many(self, keys: List[str]) -> bool:
+        """Delete several keys in one round trip"""
+        if not keys:
+            return True
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(*keys)
+            self._publish_invalidation(pipe, keys)
+            await pipe.execute()
+            if self.sync.local is not None:
+                self.sync.local.discard(keys)
+            return True
+        except Exception as e:
+            _error("DEL", e)
+            return False
+
+    @_instrumented("EXISTS")
+    async def exists(self, key: str) -> bool:
+        """Check if key exists"""
+        try:
+            return await self.client.exists(key) > 0
+        except Exception as e:
+            _error("EXISTS", e)
+            return False
+
+    @_instrumented("INCRBY")
+    async def increment(self, key: str, amount: int = 1) -> int:
+        """Increment a counter"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.incrby(key, amount)
+            self._publish_invalidation(pipe, [key])
+            value = (await pipe.execute())[0]
+            if self.sync.local is not None:
+                self.sync.local.discard([key])
+            return value
+        except Exception as e:
+            _error("INCRBY", e)
+            return 0
+
+    async def get_counters(self, keys: List[str]) -> Optional[List[int]]:
+        """Get several integer counters in one round trip, missing keys read as 0"""
+        values = await self.get_many(keys)
+        if values is None:
+            return None
+        return [int(value or 0) for value in values]
+
+    @_instrumented("INCR")
+    async def increment_many(self, keys: List[str]) -> bool:
+        """Increment several counters atomically in one round trip"""
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            for key in keys:
+                pipe.incr(key)
+            self._publish_invalidation(pipe, keys)
+            await pipe.execute()
+            if self.sync.local is not None:
+                self.sync.local.discard(keys)
+            return True
+        except Exception as e:
+            _error("INCR", e)
+            return False
+
+    @_instrumented("LOCK")
+    async def acquire_lock(self, key: str, lease_ms: int) -> Optional[str]:
+        """Try to take a lock expiring after lease_ms, returns its token or None if held"""
+        token = uuid.uuid4().hex
+        try:
+            if await self.client.set(key, token, nx=True, px=lease_ms):
+                return token
+            return None
+        except Exception as e:
+            _error("LOCK", e)
+            return None
+
+    @_instrumented("UNLOCK")
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock taken with acquire_lock, unless its lease already passed to someone else"""
+        try:
+            return bool(await self.client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            _error("UNLOCK", e)
+            return False
+
+    @_instrumented("LOCK")
+    async def acquire_locks(self, keys: List[str], lease_ms: int) -> Optional[Dict[str, str]]:
+        """Try to take several locks in one round trip
+
+        Returns the token of every lock acquired, keyed by lock, or None if Redis is
+        unavailable and nothing could be claimed.
+        """
+        tokens = {key: uuid.uuid4().hex for key in keys}
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, token in tokens.items():
+                pipe.set(key, token, nx=True, px=lease_ms)
+            results = await pipe.execute()
+            return {key: token for (key, token), acquired in zip(tokens.items(), results) if acquired}
+        except Exception as e:
+            _error("LOCK", e)
+            return None
+
+    @_instrumented("UNLOCK")
+    async def release_locks(self, tokens: Dict[str, str]) -> bool:
+        """Release locks taken with acquire_locks, skipping those whose lease passed on"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, token in tokens.items():
+                pipe.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            _error("UNLOCK", e)
+            return False
+
+    @_instrumented("ZADD")
+    async def update_sorted_sets(
+        self,
+        adds: Dict[str, Dict[str, float]],
+        removes: Optional[Dict[str, List[str]]] = None
+    ) -> bool:
+        """Set member scores and remove members across several sorted sets in one round trip"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, scores in adds.items():
+                if scores:
+                    pipe.zadd(key, scores)
+            for key, members in (removes or {}).items():
+                if members:
+                    pipe.zrem(key, *members)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            _error("ZADD", e)
+            return False
+
+    @_instrumented("ZRANGE")
+    async def top_members(self, key: str, count: int, require: Optional[str] = None) -> Optional[List[str]]:
+        """Highest scored members of a sorted set, best first
+
+        Returns None if Redis is unavailable or the ``require`` key does not exist.
+        """
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            if require is not None:
+                pipe.exists(require)
+            pipe.zrevrange(key, 0, count - 1)
+            results = await pipe.execute()
+            if require is not None and not results[0]:
+                return None
+            return [member.decode() for member in results[-1]]
+        except Exception as e:
+            _error("ZRANGE", e)
+            return None
+
+    async def scan_keys(self, pattern: str, count: int = 1000) -> AsyncIterator[str]:
+        """Iterate keys matching pattern with SCAN, a batch of about count keys per call"""
+        try:
+            async for key in self.client.scan_iter(match=pattern, count=count):
+                yield key.decode()
+        except Exception as e:
+            _error("SCAN", e)
+
+    @_instrumented("SCAN")
+    async def get_keys(self, pattern: str) -> list:
+        """Get all keys matching pattern"""
+        return [key async for key in self.scan_keys(pattern)]
+
+
 redis_client = RedisClient()
+async_redis_client = AsyncRedisClient(redis_client)
@@ -1,90 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
-from models import SocialAccount, Analytics
-from schemas import SocialAccount as SocialAccountSchema, SocialAccountCreate, Analytics as AnalyticsSchema, AnalyticsCreate
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Optional, Union
+from database import get_session, get_read_session, DBSession
+from ingest import RowParser, iter_lines
+from services.account_service import AsyncAccountService
+from schemas import SocialAccount as SocialAccountSchema, SocialAccountCreate, SocialAccountPage, Analytics as AnalyticsSchema, AnalyticsCreate, AnalyticsImportResult
 
 router = APIRouter(prefix="/api/accounts", tags=["accounts"])
 
 
 @router.post("/", response_model=SocialAccountSchema)
-def create_account(account: SocialAccountCreate, db: Session = Depends(get_db)):
+async def create_account(account: SocialAccountCreate, db: DBSession = Depends(get_session)):
     """Create a new social media account"""
-    # Check if account already exists
-    existing = db.query(SocialAccount).filter(
-        SocialAccount.account_id == account.account_id
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Account already exists")
-    
-    db_account = SocialAccount(**account.model_dump())
-    db.add(db_account)
-    db.commit()
-    db.refresh(db_account)
-    return db_account
-
-
-@router.get("/", response_model=List[SocialAccountSchema])
-def get_accounts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all social media accounts"""
-    accounts = db.query(SocialAccount).filter(
-        SocialAccount.is_active == True
-    ).offset(skip).limit(limit).all()
-    return accounts
+    try:
+        return await AsyncAccountService.create_account(db, account)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/", response_model=Union[List[SocialAccountSchema], SocialAccountPage])
+async def get_accounts(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: DBSession = Depends(get_read_session)
+):
+    """Get all social media accounts
+
+    Passing ``cursor`` (empty for the first page) switches to keyset pagination and
+    returns a page with ``next_cursor`` instead of a list; ``skip`` is ignored then.
+    """
+    if cursor is None:
+        return await AsyncAccountService.get_accounts(db, skip, limit)
+    try:
+        accounts, next_cursor = await AsyncAccountService.get_accounts_page(db, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": accounts, "next_cursor": next_cursor}
+
+
+@router.post("/analytics/import", response_model=AnalyticsImportResult)
+async def import_analytics(request: Request, db: DBSession = Depends(get_session)):
+    """Import analytics snapshots for any accounts from an NDJSON or CSV stream"""
+    parser = RowParser.for_content_type(AnalyticsCreate, request.headers.get("content-type", ""))
+    return await AsyncAccountService.import_analytics(db, iter_lines(request), parser)
 
 
 @router.get("/{account_id}", response_model=SocialAccountSchema)
-def get_account(account_id: int, db: Session = Depends(get_db)):
+async def get_account(account_id: int, db: DBSession = Depends(get_session)):
     """Get a specific account"""
-    account = db.query(SocialAccount).filter(SocialAccount.id == account_id).first()
+    account = await AsyncAccountService.get_account(db, account_id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return account
 
 
 @router.delete("/{account_id}")
-def delete_account(account_id: int, db: Session = Depends(get_db)):
+async def delete_account(account_id: int, db: DBSession = Depends(get_session)):
     """Deactivate an account"""
-    account = db.query(SocialAccount).filter(SocialAccount.id == account_id).first()
-    if not account:
+    success = await AsyncAccountService.deactivate_account(db, account_id)
+    if not success:
         raise HTTPException(status_code=404, detail="Account not found")
-    
-    account.is_active = False
-    db.commit()
     return {"message": "Account deactivated successfully"}
 
 
 @router.post("/{account_id}/analytics", response_model=AnalyticsSchema)
-def add_analytics(account_id: int, analytics: AnalyticsCreate, db: Session = Depends(get_db)):
+async def add_analytics(account_id: int, analytics: AnalyticsCreate, db: DBSession = Depends(get_session)):
     """Add analytics data for an account"""
-    account = db.query(SocialAccount).filter(SocialAccount.id == account_id).first()
-    if not account:
+    db_analytics = await AsyncAccountService.add_analytics(db, account_id, analytics)
+    if not db_analytics:
         raise HTTPException(status_code=404, detail="Account not found")
-    
-    db_analytics = Analytics(**analytics.model_dump())
-    db.add(db_analytics)
-    db.commit()
-    db.refresh(db_analytics)
     return db_analytics
 
 
 @router.get("/{account_id}/analytics", response_model=List[AnalyticsSchema])
-def get_account_analytics(
+async def get_account_analytics(
     account_id: int,
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_read_session)
 ):
     """Get analytics history for an account"""
-    from datetime import timedelta
-    
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    analytics = db.query(Analytics).filter(
-        Analytics.account_id == account_id,
-        Analytics.date >= start_date
-    ).order_by(Analytics.date.desc()).all()
-    
-    return analytics
+    return await AsyncAccountService.get_account_analytics(db, account_id, days)
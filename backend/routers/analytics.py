@@ -1,42 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
-from services.analytics_service import AnalyticsService
-from schemas import DashboardStats, EngagementTrend, PlatformStats
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+import math
+from typing import List, Optional
+from database import get_read_session, DBSession
+from services.analytics_service import AsyncAnalyticsService
+from schemas import DashboardStats, EngagementTrend, Platform, PlatformStats, TimeSeries
+from http_cache import rendered_response
+import timeseries
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
+# The service renders bodies against the response models when it caches them;
+# returning a Response skips FastAPI validating and serializing them again, and
+# their digest is the ETag, so a poll for an unchanged result gets an empty 304
+
 
 @router.get("/dashboard", response_model=DashboardStats)
-def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(request: Request, db: DBSession = Depends(get_read_session)):
     """Get overall dashboard statistics"""
-    return AnalyticsService.get_dashboard_stats(db)
+    return rendered_response(request, await AsyncAnalyticsService.get_dashboard_stats(db))
 
 
 @router.get("/trends", response_model=List[EngagementTrend])
-def get_engagement_trends(days: int = 30, db: Session = Depends(get_db)):
+async def get_engagement_trends(request: Request, days: int = 30, db: DBSession = Depends(get_read_session)):
     """Get engagement trends over specified days"""
     if days < 1 or days > 365:
         raise HTTPException(status_code=400, detail="Days must be between 1 and 365")
-    return AnalyticsService.get_engagement_trends(db, days)
+    return rendered_response(request, await AsyncAnalyticsService.get_engagement_trends(db, days))
 
 
 @router.get("/platforms", response_model=List[PlatformStats])
-def get_platform_stats(db: Session = Depends(get_db)):
+async def get_platform_stats(request: Request, db: DBSession = Depends(get_read_session)):
     """Get statistics by platform"""
-    return AnalyticsService.get_platform_stats(db)
+    return rendered_response(request, await AsyncAnalyticsService.get_platform_stats(db))
 
 
 @router.get("/top-posts")
-def get_top_posts(limit: int = 10, db: Session = Depends(get_db)):
-    """Get top performing posts"""
+async def get_top_posts(
+    request: Request,
+    limit: int = 10,
+    account_id: Optional[int] = None,
+    platform: Optional[Platform] = None,
+    db: DBSession = Depends(get_read_session)
+):
+    """Get top performing posts, optionally of one account or platform
+
+    ``platform`` is part of the cache key and of the leaderboard key read, so
+    only the known platforms are accepted (422 otherwise).
+    """
     if limit < 1 or limit > 100:
         raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
-    return AnalyticsService.get_top_posts(db, limit)
+    return rendered_response(request, await AsyncAnalyticsService.get_top_posts(db, limit, account_id, platform))
+
+
+@router.get("/timeseries", response_model=TimeSeries)
+async def get_timeseries(
+    request: Request,
+    metric: str = "followers",
+    days: int = 90,
+    interval: str = "day",
+    window: int = 7,
+    account_id: Optional[List[int]] = Query(None),
+    percentiles: str = "10,50,90",
+    per_account: bool = False,
+    db: DBSession = Depends(get_read_session)
+):
+    """Get a metric's series resampled by day, week or month with derived metrics
+
+    Returns the total across accounts with its period-over-period delta, growth
+    and ``window``-period rolling average, and the given percentiles across
+    accounts; ``per_account`` adds the same series for every account.
+    """
+    if metric not in timeseries.METRICS:
+        raise HTTPException(status_code=400, detail=f"Metric must be one of: {', '.join(timeseries.METRICS)}")
+    if interval not in timeseries.INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Interval must be one of: {', '.join(timeseries.INTERVALS)}")
+    if days < 1 or days > 730:
+        raise HTTPException(status_code=400, detail="Days must be between 1 and 730")
+    if window < 1 or window > 365:
+        raise HTTPException(status_code=400, detail="Window must be between 1 and 365")
+    try:
+        selected = [float(q) for q in percentiles.split(",") if q.strip()]
+    except ValueError:
+        selected = None
+    # float() accepts "nan" and "inf", which no range comparison rejects
+    if selected is None or any(not math.isfinite(q) or q < 0 or q > 100 for q in selected):
+        raise HTTPException(status_code=422, detail="Percentiles must be comma separated numbers between 0 and 100")
+    return rendered_response(request, await AsyncAnalyticsService.get_timeseries(
+        db, metric, days, interval, window, account_id, selected, per_account
+    ))
 
 
 @router.get("/demographics")
-def get_audience_demographics(account_id: int = None, db: Session = Depends(get_db)):
+async def get_audience_demographics(
+    request: Request,
+    account_id: int = None,
+    db: DBSession = Depends(get_read_session)
+):
     """Get audience demographics"""
-    return AnalyticsService.get_audience_demographics(db, account_id)
+    return rendered_response(request, await AsyncAnalyticsService.get_audience_demographics(db, account_id))
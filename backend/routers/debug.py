@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException
+from diagnostics import traces
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/requests")
+async def get_recent_requests(limit: int = 50, n_plus_one: bool = False):
+    """Summaries of the most recent traced requests, newest first
+
+    ``n_plus_one`` keeps only requests with a suspected N+1.
+    """
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000")
+    summaries = [trace.summary() for trace in traces.recent(traces.max_entries)]
+    if n_plus_one:
+        summaries = [summary for summary in summaries if summary["n_plus_one"]]
+    return summaries[:limit]
+
+
+@router.get("/requests/{request_id}")
+async def get_request_trace(request_id: str):
+    """Every statement of one request with its timing and call site, plus suspected N+1s and slow queries"""
+    trace = traces.get(request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Request not found (not traced, or evicted)")
+    return trace.to_dict()
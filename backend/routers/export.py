@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Literal, Optional
+from database import read_session_factory
+from services.export_service import ExportService, ANALYTICS_COLUMNS, POST_COLUMNS
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+
+
+def _stream(request: Request, query, columns, format: str, name: str) -> StreamingResponse:
+    try:
+        writer = ExportService.writer(format, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        ExportService.stream(query, writer, read_session_factory(request)),
+        media_type=writer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'}
+    )
+
+
+@router.get("/analytics")
+async def export_analytics(
+    request: Request,
+    format: ExportFormat = "csv",
+    account_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """Stream analytics snapshots, optionally of one account between start and end"""
+    query = ExportService.analytics_query(account_id, start, end)
+    return _stream(request, query, ANALYTICS_COLUMNS, format, "analytics")
+
+
+@router.get("/posts")
+async def export_posts(
+    request: Request,
+    format: ExportFormat = "csv",
+    account_id: Optional[int] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """Stream posts with their engagement, optionally filtered, created between start and end"""
+    query = ExportService.posts_query(account_id, status, start, end)
+    return _stream(request, query, POST_COLUMNS, format, "posts")
@@ -1,88 +1,196 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from database import get_db
-from services.post_service import PostService
-from schemas import Post, PostCreate, PostUpdate
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from typing import AsyncIterator, List, Optional, Tuple, Union
+import orjson
+from database import get_session, get_read_session, DBSession
+from ingest import iter_lines, validation_message
+from scheduler import dispatcher
+from services.post_service import AsyncPostService, POST_FIELDS, post_version
+import http_cache
+from schemas import Post, PostPage, EngagementData, PostCreate, PostUpdate, EngagementRecord, BulkEngagementResult
 
 router = APIRouter(prefix="/api/posts", tags=["posts"])
 
 
 @router.post("/", response_model=Post)
-def create_post(post: PostCreate, db: Session = Depends(get_db)):
+async def create_post(post: PostCreate, db: DBSession = Depends(get_session)):
     """Create a new post"""
     try:
-        return PostService.create_post(db, post)
+        created = await AsyncPostService.create_post(db, post)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-
-
-@router.get("/", response_model=List[Post])
-def get_posts(
+    dispatcher.notify(created.id, created.status, created.scheduled_time)
+    return created
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a ``fields=id,content,...`` projection, None for all fields"""
+    if fields is None:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in POST_FIELDS]
+    if not selected or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields selected"
+        )
+    return selected
+
+
+def _project(posts: list, fields: List[str]) -> List[dict]:
+    """Only the selected fields of each post, which are the only ones loaded
+
+    Plain values for ORJSONResponse, which encodes datetimes the same way as the
+    full listing's response model.
+    """
+    projected = []
+    for post in posts:
+        item = {field: getattr(post, field) for field in fields if field != "engagement"}
+        if "engagement" in fields:
+            item["engagement"] = (
+                EngagementData.model_validate(post.engagement, from_attributes=True).model_dump() if post.engagement else None
+            )
+        projected.append(item)
+    return projected
+
+
+@router.get("/", response_model=Union[List[Post], PostPage])
+async def get_posts(
     account_id: Optional[int] = None,
     status: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: DBSession = Depends(get_read_session)
 ):
-    """Get posts with optional filters"""
-    return PostService.get_posts(db, account_id, status, skip, limit)
+    """Get posts with optional filters
+
+    Passing ``cursor`` (empty for the first page) switches to keyset pagination and
+    returns a page with ``next_cursor`` instead of a list; ``skip`` is ignored then.
+    ``fields`` (e.g. ``id,content,status``) limits the columns fetched and returned.
+    """
+    selected = _parse_fields(fields)
+    if cursor is None:
+        posts = await AsyncPostService.get_posts(db, account_id, status, skip, limit, selected)
+        return posts if selected is None else ORJSONResponse(_project(posts, selected))
+    try:
+        posts, next_cursor = await AsyncPostService.get_posts_page(db, account_id, status, cursor, limit, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if selected is None:
+        return {"items": posts, "next_cursor": next_cursor}
+    return ORJSONResponse({"items": _project(posts, selected), "next_cursor": next_cursor})
+
+
+async def _engagement_records(request: Request) -> AsyncIterator[Tuple[int, Union[EngagementRecord, str]]]:
+    """Parse a JSON array or an NDJSON stream into (index, record or error) pairs"""
+    if "ndjson" in request.headers.get("content-type", ""):
+        index = 0
+        async for line in iter_lines(request):
+            try:
+                yield index, EngagementRecord.model_validate_json(line)
+            except ValidationError as e:
+                yield index, validation_message(e)
+            index += 1
+        return
+
+    try:
+        items = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+
+    for index, item in enumerate(items):
+        try:
+            yield index, EngagementRecord.model_validate(item)
+        except ValidationError as e:
+            yield index, validation_message(e)
+
+
+@router.post("/engagement/bulk", response_model=BulkEngagementResult)
+async def bulk_update_engagement(request: Request, db: DBSession = Depends(get_session)):
+    """Update engagement metrics for many posts from a JSON array or NDJSON stream"""
+    return await AsyncPostService.bulk_update_engagement(db, _engagement_records(request))
 
 
 @router.get("/scheduled", response_model=List[Post])
-def get_scheduled_posts(db: Session = Depends(get_db)):
-    """Get all scheduled posts"""
-    return PostService.get_scheduled_posts(db)
+async def get_scheduled_posts(fields: Optional[str] = None, db: DBSession = Depends(get_read_session)):
+    """Get all scheduled posts, optionally projected to ``fields``"""
+    selected = _parse_fields(fields)
+    posts = await AsyncPostService.get_scheduled_posts(db, selected)
+    return posts if selected is None else ORJSONResponse(_project(posts, selected))
+
+
+@router.get("/scheduled/dispatcher")
+async def get_dispatcher_stats():
+    """Pending posts, publish counts and dispatch lag of this replica's scheduler"""
+    return dispatcher.stats()
 
 
 @router.get("/{post_id}", response_model=Post)
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    """Get a single post by ID"""
-    post = PostService.get_post(db, post_id)
+async def get_post(post_id: int, request: Request, response: Response, db: DBSession = Depends(get_session)):
+    """Get a single post by ID
+
+    The ETag follows the post's and its engagement's ``updated_at``; a poll with
+    a current ``If-None-Match`` costs one indexed lookup of those and gets a 304.
+    """
+    if request.headers.get("if-none-match"):
+        version = await AsyncPostService.get_post_version(db, post_id)
+        if version is not None:
+            unchanged = http_cache.not_modified(request, http_cache.etag(version))
+            if unchanged:
+                return unchanged
+    post = await AsyncPostService.get_post(db, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
+    version = post_version(post.updated_at, post.engagement.updated_at if post.engagement else None)
+    response.headers.update(http_cache.headers(request, http_cache.etag(version)))
     return post
 
 
 @router.put("/{post_id}", response_model=Post)
-def update_post(post_id: int, post_data: PostUpdate, db: Session = Depends(get_db)):
+async def update_post(post_id: int, post_data: PostUpdate, db: DBSession = Depends(get_session)):
     """Update a post"""
-    post = PostService.update_post(db, post_id, post_data)
+    post = await AsyncPostService.update_post(db, post_id, post_data)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
+    dispatcher.notify(post.id, post.status, post.scheduled_time)
     return post
 
 
 @router.delete("/{post_id}")
-def delete_post(post_id: int, db: Session = Depends(get_db)):
+async def delete_post(post_id: int, db: DBSession = Depends(get_session)):
     """Delete a post"""
-    success = PostService.delete_post(db, post_id)
+    success = await AsyncPostService.delete_post(db, post_id)
     if not success:
         raise HTTPException(status_code=404, detail="Post not found")
     return {"message": "Post deleted successfully"}
 
 
 @router.post("/{post_id}/publish", response_model=Post)
-def publish_post(post_id: int, db: Session = Depends(get_db)):
+async def publish_post(post_id: int, db: DBSession = Depends(get_session)):
     """Publish a post"""
-    post = PostService.publish_post(db, post_id)
+    post = await AsyncPostService.publish_post(db, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     return post
 
 
 @router.put("/{post_id}/engagement")
-def update_engagement(
+async def update_engagement(
     post_id: int,
     likes: int = 0,
     comments: int = 0,
     shares: int = 0,
     views: int = 0,
     clicks: int = 0,
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session)
 ):
     """Update engagement metrics for a post"""
-    engagement = PostService.update_engagement(
+    engagement = await AsyncPostService.update_engagement(
         db, post_id, likes, comments, shares, views, clicks
     )
     if not engagement:
@@ -0,0 +1,244 @@
+import asyncio
+import heapq
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from database import SessionLocal, engine
+from metrics import DISPATCH_LAG_BUCKETS, observe_dispatch_lag
+from redis_client import AsyncRedisClient, async_redis_client
+from services.post_service import PostService
+
+load_dotenv()
+
+# Run the dispatcher inside the API process; disable where an external job publishes
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+# Due posts claimed and published per transaction
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", 100))
+# How often upcoming posts are reloaded, picking up posts scheduled through other replicas
+SCHEDULER_REFRESH_SECONDS = float(os.getenv("SCHEDULER_REFRESH_SECONDS", 30))
+# Redis lease on each claimed post where the database has no SKIP LOCKED
+SCHEDULER_LEASE_MS = int(os.getenv("SCHEDULER_LEASE_MS", 30000))
+
+# Upper bounds in seconds of the dispatch lag histogram, the same as at /metrics
+LAG_BUCKETS = DISPATCH_LAG_BUCKETS
+
+
+class DispatchMetrics:
+    """Counters and a dispatch lag histogram of one dispatcher
+
+    Lag is how long after its ``scheduled_time`` a post was actually published.
+    Every observation also goes to ``scheduler_dispatch_lag_seconds`` at /metrics.
+    """
+
+    def __init__(self):
+        self.published = 0
+        self.skipped = 0
+        self.batches = 0
+        self.errors = 0
+        self.lag_count = 0
+        self.lag_sum = 0.0
+        self.lag_max = 0.0
+        self.lag_last: Optional[float] = None
+        self.lag_buckets = [0] * len(LAG_BUCKETS)
+
+    def observe(self, lag: float) -> None:
+        lag = max(0.0, lag)
+        self.lag_count += 1
+        self.lag_sum += lag
+        self.lag_max = max(self.lag_max, lag)
+        self.lag_last = lag
+        observe_dispatch_lag(lag)
+        for i, bound in enumerate(LAG_BUCKETS):
+            if lag <= bound:
+                self.lag_buckets[i] += 1
+
+    def snapshot(self) -> Dict:
+        return {
+            "published": self.published,
+            "skipped": self.skipped,
+            "batches": self.batches,
+            "errors": self.errors,
+            "lag_seconds": {
+                "count": self.lag_count,
+                "sum": round(self.lag_sum, 3),
+                "mean": round(self.lag_sum / self.lag_count, 3) if self.lag_count else None,
+                "max": round(self.lag_max, 3),
+                "last": round(self.lag_last, 3) if self.lag_last is not None else None,
+                "buckets": {str(bound): count for bound, count in zip(LAG_BUCKETS, self.lag_buckets)}
+            }
+        }
+
+
+class ScheduledPostDispatcher:
+    """Publishes scheduled posts when their ``scheduled_time`` arrives
+
+    Upcoming posts sit in a min-heap of (scheduled_time, post id), reloaded from
+    the database every refresh interval and fed by ``notify`` for posts scheduled
+    through this replica, so the loop sleeps exactly until the next one is due.
+
+    Due posts are claimed and published in batches. On Postgres the claim is
+    ``SELECT ... FOR UPDATE SKIP LOCKED``; elsewhere each post is leased in Redis
+    first. Either way a post another replica is publishing is skipped, and once
+    published it is no longer ``scheduled``, so it is never published twice. If
+    Redis is unavailable nothing is claimed until the next refresh.
+    """
+
+    LEASE_PREFIX = "scheduler:claim:"
+    # Pause after an unexpected error before reloading and trying again
+    ERROR_BACKOFF = 5
+
+    def __init__(
+        self,
+        redis: AsyncRedisClient,
+        batch_size: int = SCHEDULER_BATCH_SIZE,
+        refresh_seconds: float = SCHEDULER_REFRESH_SECONDS,
+        lease_ms: int = SCHEDULER_LEASE_MS
+    ):
+        self.redis = redis
+        self.batch_size = batch_size
+        self.refresh_seconds = refresh_seconds
+        self.lease_ms = lease_ms
+        self.metrics = DispatchMetrics()
+        self.heap: List[Tuple[datetime, int]] = []
+        # Current scheduled time of each post in the heap; older heap entries are stale
+        self.due_at: Dict[int, datetime] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.next_refresh = 0.0
+
+    def start(self) -> None:
+        if self.task is None:
+            self.wakeup = asyncio.Event()
+            self.next_refresh = 0.0
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def notify(self, post_id: int, status: str, scheduled_time: Optional[datetime]) -> None:
+        """Track a post created or updated through this replica, waking the loop if it is due sooner"""
+        if self.task is None:
+            return
+        if status != "scheduled" or scheduled_time is None:
+            self.due_at.pop(post_id, None)
+            return
+        if scheduled_time.tzinfo is not None:
+            scheduled_time = scheduled_time.astimezone(timezone.utc).replace(tzinfo=None)
+        self.due_at[post_id] = scheduled_time
+        heapq.heappush(self.heap, (scheduled_time, post_id))
+        self.wakeup.set()
+
+    def stats(self) -> Dict:
+        next_due = self._next_due()
+        return {
+            "running": self.task is not None,
+            "pending": len(self.due_at),
+            "next_due_in": round((next_due - datetime.utcnow()).total_seconds(), 3) if next_due else None,
+            **self.metrics.snapshot()
+        }
+
+    async def run(self) -> None:
+        while True:
+            try:
+                self.wakeup.clear()
+                if time.monotonic() >= self.next_refresh:
+                    await self.refresh()
+
+                due = self._pop_due(datetime.utcnow())
+                if due:
+                    await self.dispatch(due)
+                    continue
+
+                timeout = self.next_refresh - time.monotonic()
+                next_due = self._next_due()
+                if next_due is not None:
+                    timeout = min(timeout, (next_due - datetime.utcnow()).total_seconds())
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), max(0.0, timeout))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Scheduler error: {e}")
+                self.metrics.errors += 1
+                # Posts popped before the error are still scheduled; reload them
+                self.next_refresh = 0.0
+                await asyncio.sleep(self.ERROR_BACKOFF)
+
+    async def refresh(self) -> None:
+        """Reload every post due before the refresh after next"""
+        until = datetime.utcnow() + timedelta(seconds=2 * self.refresh_seconds)
+        upcoming = await run_in_threadpool(_upcoming, until)
+        self.due_at = dict(upcoming)
+        self.heap = [(scheduled_time, post_id) for post_id, scheduled_time in upcoming]
+        heapq.heapify(self.heap)
+        self.next_refresh = time.monotonic() + self.refresh_seconds
+
+    async def dispatch(self, due: List[Tuple[int, datetime]]) -> None:
+        """Claim and publish a batch of due posts"""
+        post_ids = [post_id for post_id, _ in due]
+        leases = None
+
+        if engine.dialect.name != "postgresql":
+            leases = await self.redis.acquire_locks([self.LEASE_PREFIX + str(post_id) for post_id in post_ids], self.lease_ms)
+            if leases is None:
+                # Without a lease another replica could publish the same posts
+                self.metrics.errors += 1
+                return
+            post_ids = [post_id for post_id in post_ids if self.LEASE_PREFIX + str(post_id) in leases]
+
+        try:
+            published = await run_in_threadpool(_publish, post_ids) if post_ids else []
+        finally:
+            if leases:
+                await self.redis.release_locks(leases)
+
+        self.metrics.batches += 1
+        self.metrics.published += len(published)
+        self.metrics.skipped += len(due) - len(published)
+        for _, scheduled_time, published_time in published:
+            self.metrics.observe((published_time - scheduled_time).total_seconds())
+
+    def _pop_due(self, now: datetime) -> List[Tuple[int, datetime]]:
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < self.batch_size:
+            scheduled_time, post_id = heapq.heappop(self.heap)
+            if self.due_at.get(post_id) == scheduled_time:
+                del self.due_at[post_id]
+                due.append((post_id, scheduled_time))
+        return due
+
+    def _next_due(self) -> Optional[datetime]:
+        # Drop entries of posts rescheduled or unscheduled since they were pushed
+        while self.heap and self.due_at.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+
+def _upcoming(until: datetime) -> List[Tuple[int, datetime]]:
+    db = SessionLocal()
+    try:
+        return PostService.get_upcoming_scheduled(db, until)
+    finally:
+        db.close()
+
+
+def _publish(post_ids: List[int]) -> List[Tuple[int, datetime, datetime]]:
+    db = SessionLocal()
+    try:
+        return PostService.publish_due_posts(db, post_ids)
+    finally:
+        db.close()
+
+
+dispatcher = ScheduledPostDispatcher(async_redis_client)
@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
+
+# Platforms the dashboard supports (SocialAccount.platform)
+Platform = Literal["twitter", "facebook", "instagram", "linkedin"]
 
 
 class SocialAccountBase(BaseModel):
@@ -22,6 +25,11 @@ class SocialAccount(SocialAccountBase):
         from_attributes = True
 
 
+class SocialAccountPage(BaseModel):
+    items: List[SocialAccount]
+    next_cursor: Optional[str] = None
+
+
 class PostBase(BaseModel):
     content: str
     media_url: Optional[str] = None
@@ -49,6 +57,30 @@ class EngagementData(BaseModel):
     engagement_rate: float = 0.0
 
 
+class EngagementRecord(BaseModel):
+    post_id: int
+    likes: int = 0
+    comments: int = 0
+    shares: int = 0
+    views: int = 0
+    clicks: int = 0
+
+
+class BulkEngagementStatus(BaseModel):
+    index: int
+    post_id: Optional[int] = None
+    status: str  # updated, created, not_found, duplicate, invalid
+    error: Optional[str] = None
+
+
+class BulkEngagementResult(BaseModel):
+    processed: int
+    updated: int
+    created: int
+    skipped: int
+    results: List[BulkEngagementStatus]
+
+
 class Post(PostBase):
     id: int
     account_id: int
@@ -62,6 +94,11 @@ class Post(PostBase):
         from_attributes = True
 
 
+class PostPage(BaseModel):
+    items: List[Post]
+    next_cursor: Optional[str] = None
+
+
 class AnalyticsBase(BaseModel):
     date: datetime
     followers: int = 0
@@ -85,6 +122,22 @@ class Analytics(AnalyticsBase):
         from_attributes = True
 
 
+class AnalyticsImportError(BaseModel):
+    row: int
+    error: str
+
+
+class AnalyticsImportResult(BaseModel):
+    rows: int
+    created: int
+    updated: int
+    duplicates: int
+    invalid: int
+    errors: List[AnalyticsImportError]  # first IMPORT_MAX_ERRORS only
+    seconds: float
+    rows_per_sec: float
+
+
 class CommentBase(BaseModel):
     author_name: str
     author_id: str
@@ -121,8 +174,30 @@ class EngagementTrend(BaseModel):
     views: int
 
 
+class SeriesMetrics(BaseModel):
+    values: List[Optional[float]]
+    delta: List[Optional[float]]
+    growth_pct: List[Optional[float]]
+    rolling_avg: List[Optional[float]]
+
+
+class AccountSeries(SeriesMetrics):
+    account_id: int
+
+
+class TimeSeries(BaseModel):
+    metric: str
+    interval: str
+    window: int
+    periods: List[str]
+    total: SeriesMetrics
+    percentiles: Dict[str, List[Optional[float]]]
+    accounts: List[AccountSeries]
+
+
 class PlatformStats(BaseModel):
     platform: str
     followers: int
+    growth_rate: float = 0.0
     posts: int
     engagement: int
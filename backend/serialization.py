@@ -0,0 +1,118 @@
+"""Binary encoding of cached values.
+
+Every value written to Redis is framed as::
+
+    [format version][codec id][compression id][payload]
+
+so readers can decode values written with any codec or compression, and a
+rollout that changes ``REDIS_CODEC``/``REDIS_COMPRESSION`` never breaks pods
+still reading the old format. Values that do not start with the format version
+byte are plain JSON, as written before framing existed or by INCR counters.
+
+``bytes`` values, such as rendered response bodies, are stored as they are
+under the raw codec whatever ``REDIS_CODEC`` is, and read back as ``bytes``.
+"""
+import json
+import os
+from typing import Any, Callable, Dict, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FORMAT_VERSION = 1
+
+REDIS_CODEC = os.getenv("REDIS_CODEC", "orjson")
+REDIS_COMPRESSION = os.getenv("REDIS_COMPRESSION", "none")
+REDIS_COMPRESS_MIN_BYTES = int(os.getenv("REDIS_COMPRESS_MIN_BYTES", 4096))
+
+
+def _json_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    return (lambda value: json.dumps(value).encode()), json.loads
+
+
+def _orjson_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    import orjson
+
+    return (lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)), orjson.loads
+
+
+def _msgpack_codec() -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    import msgpack
+
+    return (lambda value: msgpack.packb(value, use_bin_type=True)), (lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False))
+
+
+def _no_compression() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    return (lambda data: data), (lambda data: data)
+
+
+def _zstd_compression() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    import zstandard
+
+    return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+
+
+def _lz4_compression() -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    import lz4.frame
+
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+# Ids are part of the stored format: never renumber, only append
+CODECS = {"json": (1, _json_codec), "orjson": (2, _orjson_codec), "msgpack": (3, _msgpack_codec)}
+COMPRESSIONS = {"none": (0, _no_compression), "zstd": (1, _zstd_compression), "lz4": (2, _lz4_compression)}
+# Not selectable as REDIS_CODEC: used for bytes values only
+RAW_CODEC_ID = 4
+
+_CODECS_BY_ID = {codec_id: factory for codec_id, factory in CODECS.values()}
+_CODECS_BY_ID[RAW_CODEC_ID] = lambda: ((lambda value: value), (lambda data: data))
+_COMPRESSIONS_BY_ID = {compression_id: factory for compression_id, factory in COMPRESSIONS.values()}
+
+
+class Serializer:
+    """Encodes values with the configured codec, decodes any known framing"""
+
+    def __init__(
+        self,
+        codec: str = REDIS_CODEC,
+        compression: str = REDIS_COMPRESSION,
+        compress_min_bytes: int = REDIS_COMPRESS_MIN_BYTES
+    ):
+        self.codec_id, factory = CODECS[codec]
+        self.encode, _ = factory()
+        self.compression_id, factory = COMPRESSIONS[compression]
+        self.compress, _ = factory()
+        self.compress_min_bytes = compress_min_bytes
+        self._decoders: Dict[int, Callable[[bytes], Any]] = {}
+        self._decompressors: Dict[int, Callable[[bytes], bytes]] = {}
+
+    def dumps(self, value: Any) -> bytes:
+        if isinstance(value, bytes):
+            codec_id, payload = RAW_CODEC_ID, value
+        else:
+            codec_id, payload = self.codec_id, self.encode(value)
+        compression_id = 0
+        if self.compression_id and len(payload) >= self.compress_min_bytes:
+            payload = self.compress(payload)
+            compression_id = self.compression_id
+        return bytes((FORMAT_VERSION, codec_id, compression_id)) + payload
+
+    def loads(self, data: bytes) -> Any:
+        if not data or data[0] != FORMAT_VERSION:
+            return json.loads(data)
+
+        codec_id, compression_id = data[1], data[2]
+        payload = data[3:]
+        if compression_id:
+            payload = self._decompressor(compression_id)(payload)
+        return self._decoder(codec_id)(payload)
+
+    def _decoder(self, codec_id: int) -> Callable[[bytes], Any]:
+        if codec_id not in self._decoders:
+            self._decoders[codec_id] = _CODECS_BY_ID[codec_id]()[1]
+        return self._decoders[codec_id]
+
+    def _decompressor(self, compression_id: int) -> Callable[[bytes], bytes]:
+        if compression_id not in self._decompressors:
+            self._decompressors[compression_id] = _COMPRESSIONS_BY_ID[compression_id]()[1]
+        return self._decompressors[compression_id]
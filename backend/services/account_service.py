@@ -0,0 +1,296 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, update, tuple_
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+import time
+from models import SocialAccount, Analytics
+from schemas import SocialAccountCreate, AnalyticsCreate
+from database import run_in_session, DBSession
+from cache import cache
+from ingest import RowParser
+from services.latest_metrics_service import LatestMetricsService
+from pagination import after_cursor, next_cursor
+
+# Snapshots written per executemany (and per commit) by the analytics import
+IMPORT_CHUNK_SIZE = 5000
+# Per-row errors kept in the import report; the rest are only counted
+IMPORT_MAX_ERRORS = 100
+
+
+class AccountService:
+    @staticmethod
+    def create_account(db: Session, account_data: SocialAccountCreate) -> SocialAccount:
+        """Create a new social media account"""
+        account, tags = AccountService._create_account(db, account_data)
+        cache.invalidate(*tags)
+        return account
+
+    @staticmethod
+    def _create_account(db: Session, account_data: SocialAccountCreate) -> Tuple[SocialAccount, Tuple[str, ...]]:
+        # Check if account already exists
+        existing = db.query(SocialAccount).filter(
+            SocialAccount.account_id == account_data.account_id
+        ).first()
+
+        if existing:
+            raise ValueError("Account already exists")
+
+        account = SocialAccount(**account_data.model_dump())
+        db.add(account)
+        db.commit()
+        db.refresh(account)
+
+        # Cache tags to invalidate once the caller is off the session
+        return account, ("accounts", f"account:{account.id}")
+
+    @staticmethod
+    def get_accounts(db: Session, skip: int = 0, limit: int = 100) -> List[SocialAccount]:
+        """Get all active social media accounts"""
+        return db.query(SocialAccount).filter(
+            SocialAccount.is_active == True
+        ).order_by(SocialAccount.created_at, SocialAccount.id).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_accounts_page(
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[SocialAccount], Optional[str]]:
+        """Get one page of active accounts after a cursor, oldest first, and the next cursor"""
+        query = db.query(SocialAccount).filter(SocialAccount.is_active == True)
+
+        if cursor:
+            query = query.filter(after_cursor(SocialAccount.created_at, SocialAccount.id, cursor))
+
+        accounts = query.order_by(SocialAccount.created_at, SocialAccount.id).limit(limit + 1).all()
+        return accounts, next_cursor(accounts, limit)
+
+    @staticmethod
+    def get_account(db: Session, account_id: int) -> Optional[SocialAccount]:
+        """Get a specific account"""
+        return db.query(SocialAccount).filter(SocialAccount.id == account_id).first()
+
+    @staticmethod
+    def deactivate_account(db: Session, account_id: int) -> bool:
+        """Deactivate an account"""
+        deactivated, tags = AccountService._deactivate_account(db, account_id)
+        if tags:
+            cache.invalidate(*tags)
+        return deactivated
+
+    @staticmethod
+    def _deactivate_account(db: Session, account_id: int) -> Tuple[bool, Tuple[str, ...]]:
+        account = db.query(SocialAccount).filter(SocialAccount.id == account_id).first()
+
+        if not account:
+            return False, ()
+
+        account.is_active = False
+        db.commit()
+
+        return True, ("accounts", f"account:{account_id}")
+
+    @staticmethod
+    def add_analytics(db: Session, account_id: int, analytics_data: AnalyticsCreate) -> Optional[Analytics]:
+        """Add analytics data for an account"""
+        analytics, tags = AccountService._add_analytics(db, account_id, analytics_data)
+        if tags:
+            cache.invalidate(*tags)
+        return analytics
+
+    @staticmethod
+    def _add_analytics(
+        db: Session,
+        account_id: int,
+        analytics_data: AnalyticsCreate
+    ) -> Tuple[Optional[Analytics], Tuple[str, ...]]:
+        account = db.query(SocialAccount).filter(SocialAccount.id == account_id).first()
+
+        if not account:
+            return None, ()
+
+        values = _snapshot_values(analytics_data)
+        analytics = Analytics(**values)
+        db.add(analytics)
+        db.flush()
+        LatestMetricsService.record(db, [values])
+        db.commit()
+        db.refresh(analytics)
+
+        return analytics, ("analytics", f"account:{analytics.account_id}")
+
+    @staticmethod
+    def get_account_analytics(db: Session, account_id: int, days: int = 30) -> List[Analytics]:
+        """Get analytics history for an account"""
+        start_date = datetime.utcnow() - timedelta(days=days)
+
+        return db.query(Analytics).filter(
+            Analytics.account_id == account_id,
+            Analytics.date >= start_date
+        ).order_by(Analytics.date.desc()).all()
+
+    @staticmethod
+    def import_analytics_batch(db: Session, rows: List[Tuple[int, AnalyticsCreate]]) -> Dict:
+        """Write one chunk of imported snapshots, de-duplicated on (account_id, date)
+
+        Within the chunk the last row for a key wins. Keys that already exist,
+        including ones written by earlier chunks of the same import, are updated
+        in place, so re-running an import is idempotent. Commits the chunk.
+        """
+        latest = {}
+        for row_number, row in rows:
+            values = _snapshot_values(row)
+            latest[(values["account_id"], values["date"])] = (row_number, values)
+
+        account_ids = {account_id for account_id, _ in latest}
+        known = {
+            account_id for (account_id,) in db.query(SocialAccount.id).filter(SocialAccount.id.in_(account_ids))
+        }
+        errors = [
+            {"row": row_number, "error": "Account not found"}
+            for (account_id, _), (row_number, _) in latest.items()
+            if account_id not in known
+        ]
+        keys = [key for key in latest if key[0] in known]
+
+        existing = {}
+        if keys:
+            existing = {
+                (account_id, date): analytics_id
+                for account_id, date, analytics_id in db.query(
+                    Analytics.account_id, Analytics.date, Analytics.id
+                ).filter(
+                    # The plain IN lets SQLite probe ix_analytics_account_date; it scans for the row-value IN alone
+                    Analytics.account_id.in_({key[0] for key in keys}),
+                    tuple_(Analytics.account_id, Analytics.date).in_(keys)
+                )
+            }
+
+        inserts = [latest[key][1] for key in keys if key not in existing]
+        updates = [{"id": existing[key], **latest[key][1]} for key in keys if key in existing]
+        if inserts:
+            db.execute(insert(Analytics), inserts)
+        if updates:
+            db.execute(update(Analytics), updates)
+        LatestMetricsService.record(db, [latest[key][1] for key in keys])
+        db.commit()
+
+        return {
+            "created": len(inserts),
+            "updated": len(updates),
+            "duplicates": len(rows) - len(latest),
+            "errors": errors,
+            "accounts": {key[0] for key in keys}
+        }
+
+
+def _snapshot_values(snapshot: AnalyticsCreate) -> Dict:
+    """Column values of a snapshot, its date as naive UTC like every stored date
+
+    The import de-duplicates on the exact (account_id, date), so a snapshot sent
+    with an offset must be stored the same way whichever path wrote it.
+    """
+    values = snapshot.model_dump()
+    if values["date"].tzinfo is not None:
+        values["date"] = values["date"].astimezone(timezone.utc).replace(tzinfo=None)
+    return values
+
+
+class AsyncAccountService:
+    """Awaitable counterpart of AccountService for async route handlers
+
+    Accepts either an AsyncSession or a Session; see ``database.run_in_session``.
+    """
+
+    @staticmethod
+    async def create_account(db: DBSession, account_data: SocialAccountCreate) -> SocialAccount:
+        account, tags = await run_in_session(db, AccountService._create_account, account_data)
+        await cache.ainvalidate(*tags)
+        return account
+
+    @staticmethod
+    async def get_accounts(db: DBSession, skip: int = 0, limit: int = 100) -> List[SocialAccount]:
+        return await run_in_session(db, AccountService.get_accounts, skip, limit)
+
+    @staticmethod
+    async def get_accounts_page(
+        db: DBSession,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[SocialAccount], Optional[str]]:
+        return await run_in_session(db, AccountService.get_accounts_page, cursor, limit)
+
+    @staticmethod
+    async def get_account(db: DBSession, account_id: int) -> Optional[SocialAccount]:
+        return await run_in_session(db, AccountService.get_account, account_id)
+
+    @staticmethod
+    async def deactivate_account(db: DBSession, account_id: int) -> bool:
+        deactivated, tags = await run_in_session(db, AccountService._deactivate_account, account_id)
+        if tags:
+            await cache.ainvalidate(*tags)
+        return deactivated
+
+    @staticmethod
+    async def add_analytics(db: DBSession, account_id: int, analytics_data: AnalyticsCreate) -> Optional[Analytics]:
+        analytics, tags = await run_in_session(db, AccountService._add_analytics, account_id, analytics_data)
+        if tags:
+            await cache.ainvalidate(*tags)
+        return analytics
+
+    @staticmethod
+    async def get_account_analytics(db: DBSession, account_id: int, days: int = 30) -> List[Analytics]:
+        return await run_in_session(db, AccountService.get_account_analytics, account_id, days)
+
+    @staticmethod
+    async def import_analytics(
+        db: DBSession,
+        lines: AsyncIterator[Union[bytes, str]],
+        parser: RowParser,
+        chunk_size: int = IMPORT_CHUNK_SIZE
+    ) -> Dict:
+        """Validate and write a stream of analytics snapshots in bounded chunks
+
+        ``lines`` are NDJSON or CSV lines for ``parser``. Each chunk is committed
+        on its own; caches are invalidated once at the end.
+        """
+        start = time.perf_counter()
+        report = {"rows": 0, "created": 0, "updated": 0, "duplicates": 0, "invalid": 0, "errors": []}
+        accounts = set()
+        chunk = []
+
+        def add_error(row_number: int, error: str) -> None:
+            report["invalid"] += 1
+            if len(report["errors"]) < IMPORT_MAX_ERRORS:
+                report["errors"].append({"row": row_number, "error": error})
+
+        async def flush():
+            result = await run_in_session(db, AccountService.import_analytics_batch, chunk)
+            for key in ("created", "updated", "duplicates"):
+                report[key] += result[key]
+            for error in result["errors"]:
+                add_error(error["row"], error["error"])
+            accounts.update(result["accounts"])
+            chunk.clear()
+
+        async for line in lines:
+            row = parser.parse(line)
+            if row is None:
+                continue
+            report["rows"] += 1
+            if isinstance(row, str):
+                add_error(report["rows"], row)
+                continue
+            chunk.append((report["rows"], row))
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+
+        if accounts:
+            await cache.ainvalidate("analytics", *(f"account:{account_id}" for account_id in accounts))
+
+        report["errors"].sort(key=lambda error: error["row"])
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        report["rows_per_sec"] = round(report["rows"] / report["seconds"], 1) if report["seconds"] else 0.0
+        return report
@@ -1,24 +1,83 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, exists, and_, select
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional, Sequence
+import hashlib
 import random
-from models import Analytics, Post, Engagement, SocialAccount
-from redis_client import redis_client
+import numpy as np
+from pydantic import TypeAdapter
+from models import Analytics, Post, Engagement, SocialAccount, EngagementDaily, AccountLatestMetrics
+from cache import cache, Rendered
+from leaderboard import leaderboard
+from database import run_in_session, reads_replica, DBSession, DATABASE_REPLICA_CACHE_TTL
+from schemas import DashboardStats, EngagementTrend, PlatformStats, TimeSeries
+import timeseries
+
+
+# Entries are invalidated by tag on every relevant write, so the TTL only bounds
+# how long an unchanged result is trusted
+CACHE_TTL = 6 * 3600
+
+DASHBOARD_TAGS = ["posts", "engagement", "analytics"]
+TRENDS_TAGS = ["posts", "engagement"]
+PLATFORM_TAGS = ["accounts", "posts", "engagement", "analytics"]
+TOP_POSTS_TAGS = ["accounts", "posts", "engagement"]
+TIMESERIES_TAGS = ["analytics"]
+
+# Top posts hydrated for one leaderboard ranking; the ranking moves with every
+# engagement update, so these entries are short lived
+TOP_POSTS_RANKED_TTL = 600
+
+
+def _ttl(db: DBSession, ttl: int = CACHE_TTL) -> int:
+    """How long a result computed on db stays fresh; bounded on a replica, which may lag"""
+    return min(ttl, DATABASE_REPLICA_CACHE_TTL) if reads_replica(db) else ttl
+
+
+def _renderer(schema: Any) -> Callable[[Any], bytes]:
+    """JSON body of a result, validated against the route's response model"""
+    adapter = TypeAdapter(schema)
+    return lambda value: adapter.dump_json(adapter.validate_python(value))
+
+
+# The get_* methods cache and return rendered JSON response bodies with their
+# digest, which routes send as they are (or answer 304 to): a hit is never
+# decoded, validated or re-encoded. The underscored methods compute the plain results.
+DASHBOARD_JSON = _renderer(DashboardStats)
+TRENDS_JSON = _renderer(List[EngagementTrend])
+PLATFORM_JSON = _renderer(List[PlatformStats])
+TOP_POSTS_JSON = _renderer(List[Dict[str, Any]])
+TIMESERIES_JSON = _renderer(TimeSeries)
+DEMOGRAPHICS_JSON = _renderer(Dict[str, Any])
 
 
 class AnalyticsService:
     @staticmethod
-    def get_dashboard_stats(db: Session) -> Dict:
+    def get_dashboard_stats(db: Session) -> Rendered:
         """Get overall dashboard statistics"""
-        cache_key = "dashboard:stats"
-        cached = redis_client.get(cache_key)
-        
-        if cached:
-            return cached
+        return cache.cached(
+            "dashboard:stats",
+            DASHBOARD_TAGS,
+            lambda: AnalyticsService._dashboard_stats(db),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=DASHBOARD_JSON
+        )
 
-        # Get total followers across all accounts
-        total_followers = db.query(func.sum(Analytics.followers)).scalar() or 0
+    @staticmethod
+    def _dashboard_stats(db: Session) -> Dict:
+        """Compute dashboard statistics from the database"""
+        # Latest snapshot of every account, with its followers a week earlier
+        latest = db.query(
+            func.sum(AccountLatestMetrics.followers).label("followers"),
+            func.sum(AccountLatestMetrics.followers).filter(
+                AccountLatestMetrics.week_ago_followers > 0
+            ).label("comparable_followers"),
+            func.sum(AccountLatestMetrics.week_ago_followers).filter(
+                AccountLatestMetrics.week_ago_followers > 0
+            ).label("week_ago_followers")
+        ).one()
+        total_followers = latest.followers or 0
         
         # Get total posts
         total_posts = db.query(func.count(Post.id)).filter(
@@ -33,21 +92,9 @@ class AnalyticsService:
         # Calculate engagement rate
         engagement_rate = (total_engagement / total_posts * 100) if total_posts > 0 else 0
         
-        # Calculate growth rate (last 7 days vs previous 7 days)
-        today = datetime.utcnow()
-        week_ago = today - timedelta(days=7)
-        two_weeks_ago = today - timedelta(days=14)
-        
-        current_week_followers = db.query(func.avg(Analytics.followers)).filter(
-            Analytics.date >= week_ago
-        ).scalar() or 0
-        
-        previous_week_followers = db.query(func.avg(Analytics.followers)).filter(
-            Analytics.date >= two_weeks_ago,
-            Analytics.date < week_ago
-        ).scalar() or 1
-        
-        growth_rate = ((current_week_followers - previous_week_followers) / previous_week_followers * 100) if previous_week_followers > 0 else 0
+        # Follower growth over the last week, of the accounts that have a snapshot
+        # from a week before their latest one
+        growth_rate = _growth(latest.comparable_followers, latest.week_ago_followers)
         
         stats = {
             "total_followers": int(total_followers),
@@ -57,36 +104,41 @@ class AnalyticsService:
             "growth_rate": round(growth_rate, 2)
         }
         
-        redis_client.set(cache_key, stats, expire=300)  # Cache for 5 minutes
         return stats
 
     @staticmethod
-    def get_engagement_trends(db: Session, days: int = 30) -> List[Dict]:
+    def get_engagement_trends(db: Session, days: int = 30) -> Rendered:
         """Get engagement trends over time"""
-        cache_key = f"engagement:trends:{days}"
-        cached = redis_client.get(cache_key)
-        
-        if cached:
-            return cached
+        return cache.cached(
+            f"engagement:trends:{days}",
+            TRENDS_TAGS,
+            lambda: AnalyticsService._engagement_trends(db, days),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=TRENDS_JSON
+        )
 
-        start_date = datetime.utcnow() - timedelta(days=days)
+    @staticmethod
+    def _engagement_trends(db: Session, days: int = 30) -> List[Dict]:
+        """Compute daily engagement from the rollup"""
+        start_date = (datetime.utcnow() - timedelta(days=days)).date()
         
-        # Get daily engagement data
+        # Daily engagement comes pre-aggregated from the rollup, so this reads at
+        # most days x accounts rows regardless of how many posts exist
         results = db.query(
-            func.date(Post.published_time).label('date'),
-            func.sum(Engagement.likes).label('likes'),
-            func.sum(Engagement.comments).label('comments'),
-            func.sum(Engagement.shares).label('shares'),
-            func.sum(Engagement.views).label('views')
-        ).join(
-            Engagement, Post.id == Engagement.post_id
+            EngagementDaily.date.label('date'),
+            func.sum(EngagementDaily.likes).label('likes'),
+            func.sum(EngagementDaily.comments).label('comments'),
+            func.sum(EngagementDaily.shares).label('shares'),
+            func.sum(EngagementDaily.views).label('views')
         ).filter(
-            Post.published_time >= start_date,
-            Post.status == "published"
+            EngagementDaily.date >= start_date
         ).group_by(
-            func.date(Post.published_time)
+            EngagementDaily.date
+        ).having(
+            func.sum(EngagementDaily.post_count) > 0
         ).order_by(
-            func.date(Post.published_time)
+            EngagementDaily.date
         ).all()
         
         trends = [
@@ -100,63 +152,111 @@ class AnalyticsService:
             for result in results
         ]
         
-        redis_client.set(cache_key, trends, expire=600)  # Cache for 10 minutes
         return trends
 
     @staticmethod
-    def get_platform_stats(db: Session) -> List[Dict]:
+    def get_platform_stats(db: Session) -> Rendered:
         """Get statistics by platform"""
-        cache_key = "platform:stats"
-        cached = redis_client.get(cache_key)
-        
-        if cached:
-            return cached
-
-        accounts = db.query(SocialAccount).filter(SocialAccount.is_active == True).all()
-        
-        platform_stats = []
-        for account in accounts:
-            # Get latest analytics
-            latest_analytics = db.query(Analytics).filter(
-                Analytics.account_id == account.id
-            ).order_by(Analytics.date.desc()).first()
-            
-            # Get post count
-            post_count = db.query(func.count(Post.id)).filter(
-                Post.account_id == account.id,
-                Post.status == "published"
-            ).scalar() or 0
-            
-            # Get total engagement
-            total_engagement = db.query(
-                func.sum(Engagement.likes + Engagement.comments + Engagement.shares)
-            ).join(
-                Post, Engagement.post_id == Post.id
-            ).filter(
-                Post.account_id == account.id
-            ).scalar() or 0
-            
-            platform_stats.append({
-                "platform": account.platform,
-                "account_name": account.account_name,
-                "followers": latest_analytics.followers if latest_analytics else 0,
-                "posts": post_count,
-                "engagement": int(total_engagement)
-            })
-        
-        redis_client.set(cache_key, platform_stats, expire=600)
+        return cache.cached(
+            "platform:stats",
+            PLATFORM_TAGS,
+            lambda: AnalyticsService._platform_stats(db),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=PLATFORM_JSON
+        )
+
+    @staticmethod
+    def _platform_stats(db: Session) -> List[Dict]:
+        """Compute per account statistics from the database"""
+        # Published post count per account
+        post_counts = db.query(
+            Post.account_id.label("account_id"),
+            func.count(Post.id).label("posts")
+        ).filter(
+            Post.status == "published"
+        ).group_by(Post.account_id).subquery()
+
+        # Total engagement per account
+        engagement_totals = db.query(
+            Post.account_id.label("account_id"),
+            func.sum(Engagement.likes + Engagement.comments + Engagement.shares).label("engagement")
+        ).join(
+            Engagement, Engagement.post_id == Post.id
+        ).group_by(Post.account_id).subquery()
+
+        results = db.query(
+            SocialAccount.platform,
+            SocialAccount.account_name,
+            AccountLatestMetrics.followers,
+            AccountLatestMetrics.week_ago_followers,
+            post_counts.c.posts,
+            engagement_totals.c.engagement
+        ).outerjoin(
+            AccountLatestMetrics, AccountLatestMetrics.account_id == SocialAccount.id
+        ).outerjoin(
+            post_counts, post_counts.c.account_id == SocialAccount.id
+        ).outerjoin(
+            engagement_totals, engagement_totals.c.account_id == SocialAccount.id
+        ).filter(
+            SocialAccount.is_active == True
+        ).order_by(SocialAccount.id).all()
+
+        platform_stats = [
+            {
+                "platform": result.platform,
+                "account_name": result.account_name,
+                "followers": result.followers or 0,
+                "growth_rate": _growth(result.followers, result.week_ago_followers),
+                "posts": result.posts or 0,
+                "engagement": int(result.engagement or 0)
+            }
+            for result in results
+        ]
+        
         return platform_stats
 
     @staticmethod
-    def get_top_posts(db: Session, limit: int = 10) -> List[Dict]:
-        """Get top performing posts"""
-        cache_key = f"top:posts:{limit}"
-        cached = redis_client.get(cache_key)
+    def get_top_posts(
+        db: Session,
+        limit: int = 10,
+        account_id: Optional[int] = None,
+        platform: Optional[str] = None
+    ) -> Rendered:
+        """Get top performing posts, optionally of one account or platform"""
+        post_ids = leaderboard.top_ids(limit, account_id, platform)
+        if post_ids is not None:
+            return cache.cached(
+                _top_posts_ranked_key(post_ids, account_id, platform),
+                TOP_POSTS_TAGS,
+                lambda: AnalyticsService._hydrate_top_posts(db, post_ids, account_id, platform),
+                expire=_ttl(db, TOP_POSTS_RANKED_TTL),
+                replica=reads_replica(db),
+                render=TOP_POSTS_JSON
+            )
         
-        if cached:
-            return cached
+        # Leaderboard not built or Redis down
+        return cache.cached(
+            f"top:posts:{limit}:{account_id or 'all'}:{platform or 'all'}",
+            TOP_POSTS_TAGS,
+            lambda: AnalyticsService._top_posts(db, limit, account_id, platform),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=TOP_POSTS_JSON
+        )
 
-        results = db.query(
+    @staticmethod
+    def _hydrate_top_posts(
+        db: Session,
+        post_ids: List[int],
+        account_id: Optional[int] = None,
+        platform: Optional[str] = None
+    ) -> List[Dict]:
+        """Load the leaderboard's posts by primary key, in leaderboard order"""
+        if not post_ids:
+            return []
+        
+        query = db.query(
             Post,
             Engagement,
             SocialAccount
@@ -165,37 +265,181 @@ class AnalyticsService:
         ).join(
             SocialAccount, Post.account_id == SocialAccount.id
         ).filter(
+            Post.id.in_(post_ids),
             Post.status == "published"
+        )
+        
+        # The leaderboard set covers one filter; check the other one here
+        if account_id:
+            query = query.filter(Post.account_id == account_id)
+        if platform:
+            query = query.filter(SocialAccount.platform == platform)
+        
+        rank = {post_id: position for position, post_id in enumerate(post_ids)}
+        results = sorted(query.all(), key=lambda row: rank[row[0].id])
+        return [AnalyticsService._top_post(*row) for row in results]
+
+    @staticmethod
+    def _top_posts(
+        db: Session,
+        limit: int = 10,
+        account_id: Optional[int] = None,
+        platform: Optional[str] = None
+    ) -> List[Dict]:
+        """Compute the top posts from the database"""
+        total_engagement = Engagement.likes + Engagement.comments + Engagement.shares
+        
+        conditions = [Post.id == Engagement.post_id, Post.status == "published"]
+        if account_id:
+            conditions.append(Post.account_id == account_id)
+        if platform:
+            conditions.extend([SocialAccount.id == Post.account_id, SocialAccount.platform == platform])
+        
+        # Walk ix_engagement_total from the top and stop after `limit` published
+        # posts, instead of sorting every published post
+        top_engagement = db.query(Engagement.id).filter(
+            exists().where(and_(*conditions))
+        ).order_by(total_engagement.desc()).limit(limit).subquery()
+        
+        results = db.query(
+            Post,
+            Engagement,
+            SocialAccount
+        ).join(
+            Engagement, Post.id == Engagement.post_id
+        ).join(
+            SocialAccount, Post.account_id == SocialAccount.id
+        ).join(
+            top_engagement, top_engagement.c.id == Engagement.id
         ).order_by(
-            (Engagement.likes + Engagement.comments + Engagement.shares).desc()
-        ).limit(limit).all()
+            total_engagement.desc()
+        ).all()
         
-        top_posts = [
-            {
-                "id": post.id,
-                "content": post.content[:100] + "..." if len(post.content) > 100 else post.content,
-                "platform": account.platform,
-                "published_time": post.published_time.isoformat() if post.published_time else None,
-                "likes": engagement.likes,
-                "comments": engagement.comments,
-                "shares": engagement.shares,
-                "total_engagement": engagement.likes + engagement.comments + engagement.shares
-            }
-            for post, engagement, account in results
-        ]
+        return [AnalyticsService._top_post(*row) for row in results]
+
+    @staticmethod
+    def _top_post(post: Post, engagement: Engagement, account: SocialAccount) -> Dict:
+        return {
+            "id": post.id,
+            "content": post.content[:100] + "..." if len(post.content) > 100 else post.content,
+            "platform": account.platform,
+            "published_time": post.published_time.isoformat() if post.published_time else None,
+            "likes": engagement.likes,
+            "comments": engagement.comments,
+            "shares": engagement.shares,
+            "total_engagement": engagement.likes + engagement.comments + engagement.shares
+        }
+
+    @staticmethod
+    def get_timeseries(
+        db: Session,
+        metric: str = "followers",
+        days: int = 90,
+        interval: str = "day",
+        window: int = 7,
+        account_ids: Optional[List[int]] = None,
+        percentiles: Sequence[float] = (10, 50, 90),
+        per_account: bool = False
+    ) -> Rendered:
+        """Get a metric's series with derived metrics, per account and across accounts"""
+        return cache.cached(
+            _timeseries_key(metric, days, interval, window, account_ids, percentiles, per_account),
+            TIMESERIES_TAGS,
+            lambda: AnalyticsService._timeseries(
+                db, metric, days, interval, window, account_ids, percentiles, per_account
+            ),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=TIMESERIES_JSON
+        )
+
+    @staticmethod
+    def _timeseries(
+        db: Session,
+        metric: str = "followers",
+        days: int = 90,
+        interval: str = "day",
+        window: int = 7,
+        account_ids: Optional[List[int]] = None,
+        percentiles: Sequence[float] = (10, 50, 90),
+        per_account: bool = False
+    ) -> Dict:
+        """Compute the series from the analytics snapshots of the last days days"""
+        if metric not in timeseries.METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        if interval not in timeseries.INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
+        
+        end = datetime.utcnow().date() + timedelta(days=1)
+        start = end - timedelta(days=days)
+        column = getattr(Analytics, metric)
+        
+        # One query for every requested series, ordered for daily_matrix
+        query = select(
+            Analytics.account_id,
+            func.date(Analytics.date),
+            column
+        ).where(
+            Analytics.date >= start,
+            Analytics.date < end,
+            column.isnot(None)
+        ).order_by(Analytics.account_id, Analytics.date, Analytics.id)
+        if account_ids:
+            query = query.where(Analytics.account_id.in_(account_ids))
+        rows = db.execute(query).all()
+        
+        accounts = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        dates = np.array([str(row[1]) for row in rows], dtype="datetime64[D]")
+        values = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        
+        first_day = np.datetime64(start, "D")
+        ids, matrix = timeseries.daily_matrix(accounts, dates, values, first_day, days)
+        labels, boundaries = timeseries.periods(first_day, days, interval)
+        series = timeseries.resample(matrix, boundaries, timeseries.METRICS[metric])
+        
+        result = {
+            "metric": metric,
+            "interval": interval,
+            "window": window,
+            "periods": [str(label) for label in labels],
+            "total": {
+                name: timeseries.to_list(values)
+                for name, values in timeseries.derive(timeseries.total(series), window).items()
+            },
+            "percentiles": {
+                f"p{q:g}": timeseries.to_list(row)
+                for q, row in zip(percentiles, timeseries.percentiles(series, percentiles))
+            },
+            "accounts": []
+        }
+        
+        if per_account:
+            derived = timeseries.derive(series, window)
+            result["accounts"] = [
+                {
+                    "account_id": int(account_id),
+                    **{name: timeseries.to_list(values[i]) for name, values in derived.items()}
+                }
+                for i, account_id in enumerate(ids)
+            ]
         
-        redis_client.set(cache_key, top_posts, expire=600)
-        return top_posts
+        return result
 
     @staticmethod
-    def get_audience_demographics(db: Session, account_id: int = None) -> Dict:
+    def get_audience_demographics(db: Session, account_id: int = None) -> Rendered:
         """Get audience demographics (mock data for demo)"""
-        cache_key = f"demographics:{account_id or 'all'}"
-        cached = redis_client.get(cache_key)
-        
-        if cached:
-            return cached
+        return cache.cached(
+            f"demographics:{account_id or 'all'}",
+            [f"account:{account_id}" if account_id else "accounts"],
+            lambda: AnalyticsService._audience_demographics(db, account_id),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=DEMOGRAPHICS_JSON
+        )
 
+    @staticmethod
+    def _audience_demographics(db: Session, account_id: int = None) -> Dict:
+        """Build the demographics payload"""
         # In a real application, this would come from social media APIs
         demographics = {
             "age_groups": [
@@ -219,5 +463,136 @@ class AnalyticsService:
             ]
         }
         
-        redis_client.set(cache_key, demographics, expire=3600)
         return demographics
+
+
+def _growth(followers: Optional[int], week_ago_followers: Optional[int]) -> float:
+    """Percentage follower growth since the snapshot a week earlier, 0 without one"""
+    if not week_ago_followers:
+        return 0.0
+    return round(((followers or 0) - week_ago_followers) / week_ago_followers * 100, 2)
+
+
+def _timeseries_key(
+    metric: str,
+    days: int,
+    interval: str,
+    window: int,
+    account_ids: Optional[List[int]],
+    percentiles: Sequence[float],
+    per_account: bool
+) -> str:
+    # The range ends today, so entries roll over at midnight UTC
+    accounts = ",".join(str(account_id) for account_id in sorted(set(account_ids))) if account_ids else "all"
+    return (
+        f"timeseries:{metric}:{datetime.utcnow().date()}:{days}:{interval}:{window}:{accounts}:"
+        f"{','.join(f'{q:g}' for q in percentiles)}:{int(per_account)}"
+    )
+
+
+def _top_posts_ranked_key(post_ids: List[int], account_id: Optional[int], platform: Optional[str]) -> str:
+    # A new ranking reads a new entry; the tags cover changes to the ranked posts
+    ranking = hashlib.blake2b(",".join(str(post_id) for post_id in post_ids).encode(), digest_size=8).hexdigest()
+    return f"top:ranked:{account_id or 'all'}:{platform or 'all'}:{ranking}"
+
+
+class AsyncAnalyticsService:
+    """Awaitable counterpart of AnalyticsService for async route handlers, returning JSON bodies
+
+    Accepts either an AsyncSession or a Session; see ``database.run_in_session``.
+    Cache waits happen on the event loop, only the queries go through the session.
+    """
+
+    @staticmethod
+    async def get_dashboard_stats(db: DBSession) -> Rendered:
+        return await cache.acached(
+            "dashboard:stats",
+            DASHBOARD_TAGS,
+            lambda: run_in_session(db, AnalyticsService._dashboard_stats),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=DASHBOARD_JSON
+        )
+
+    @staticmethod
+    async def get_engagement_trends(db: DBSession, days: int = 30) -> Rendered:
+        return await cache.acached(
+            f"engagement:trends:{days}",
+            TRENDS_TAGS,
+            lambda: run_in_session(db, AnalyticsService._engagement_trends, days),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=TRENDS_JSON
+        )
+
+    @staticmethod
+    async def get_platform_stats(db: DBSession) -> Rendered:
+        return await cache.acached(
+            "platform:stats",
+            PLATFORM_TAGS,
+            lambda: run_in_session(db, AnalyticsService._platform_stats),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=PLATFORM_JSON
+        )
+
+    @staticmethod
+    async def get_top_posts(
+        db: DBSession,
+        limit: int = 10,
+        account_id: Optional[int] = None,
+        platform: Optional[str] = None
+    ) -> Rendered:
+        post_ids = await leaderboard.atop_ids(limit, account_id, platform)
+        if post_ids is not None:
+            return await cache.acached(
+                _top_posts_ranked_key(post_ids, account_id, platform),
+                TOP_POSTS_TAGS,
+                lambda: run_in_session(
+                    db, AnalyticsService._hydrate_top_posts, post_ids, account_id, platform
+                ),
+                expire=_ttl(db, TOP_POSTS_RANKED_TTL),
+                replica=reads_replica(db),
+                render=TOP_POSTS_JSON
+            )
+        return await cache.acached(
+            f"top:posts:{limit}:{account_id or 'all'}:{platform or 'all'}",
+            TOP_POSTS_TAGS,
+            lambda: run_in_session(db, AnalyticsService._top_posts, limit, account_id, platform),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=TOP_POSTS_JSON
+        )
+
+    @staticmethod
+    async def get_timeseries(
+        db: DBSession,
+        metric: str = "followers",
+        days: int = 90,
+        interval: str = "day",
+        window: int = 7,
+        account_ids: Optional[List[int]] = None,
+        percentiles: Sequence[float] = (10, 50, 90),
+        per_account: bool = False
+    ) -> Rendered:
+        return await cache.acached(
+            _timeseries_key(metric, days, interval, window, account_ids, percentiles, per_account),
+            TIMESERIES_TAGS,
+            lambda: run_in_session(
+                db, AnalyticsService._timeseries, metric, days, interval, window, account_ids, percentiles, per_account
+            ),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=TIMESERIES_JSON
+        )
+
+    @staticmethod
+    async def get_audience_demographics(db: DBSession, account_id: int = None) -> Rendered:
+        return await cache.acached(
+            f"demographics:{account_id or 'all'}",
+            [f"account:{account_id}" if account_id else "accounts"],
+            lambda: run_in_session(db, AnalyticsService._audience_demographics, account_id),
+            expire=_ttl(db),
+            replica=reads_replica(db),
+            render=DEMOGRAPHICS_JSON
+        )
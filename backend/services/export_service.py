@@ -0,0 +1,211 @@
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+import csv
+import io
+import orjson
+from sqlalchemy.orm import Session
+from models import Post, Engagement, Analytics
+from database import ReadSessionLocal
+
+# Rows fetched per server-side cursor batch, and per Parquet row group
+EXPORT_BATCH_ROWS = 5000
+
+# (output column, SQL expression, Arrow type) of each export
+ANALYTICS_COLUMNS = [
+    ("id", Analytics.id, "int64"),
+    ("account_id", Analytics.account_id, "int64"),
+    ("date", Analytics.date, "timestamp"),
+    ("followers", Analytics.followers, "int64"),
+    ("following", Analytics.following, "int64"),
+    ("total_posts", Analytics.total_posts, "int64"),
+    ("total_engagement", Analytics.total_engagement, "int64"),
+    ("reach", Analytics.reach, "int64"),
+    ("impressions", Analytics.impressions, "int64"),
+    ("profile_views", Analytics.profile_views, "int64"),
+]
+
+POST_COLUMNS = [
+    ("id", Post.id, "int64"),
+    ("account_id", Post.account_id, "int64"),
+    ("status", Post.status, "string"),
+    ("post_type", Post.post_type, "string"),
+    ("content", Post.content, "string"),
+    ("media_url", Post.media_url, "string"),
+    ("scheduled_time", Post.scheduled_time, "timestamp"),
+    ("published_time", Post.published_time, "timestamp"),
+    ("created_at", Post.created_at, "timestamp"),
+    ("updated_at", Post.updated_at, "timestamp"),
+    ("likes", Engagement.likes, "int64"),
+    ("comments", Engagement.comments, "int64"),
+    ("shares", Engagement.shares, "int64"),
+    ("views", Engagement.views, "int64"),
+    ("clicks", Engagement.clicks, "int64"),
+    ("engagement_rate", Engagement.engagement_rate, "float64"),
+]
+
+
+class CsvWriter:
+    media_type = "text/csv"
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = columns
+
+    def begin(self) -> bytes:
+        return self.write([self.columns])
+
+    def write(self, rows: Iterable[Sequence]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+        )
+        return buffer.getvalue().encode()
+
+    def end(self) -> bytes:
+        return b""
+
+
+class NdjsonWriter:
+    media_type = "application/x-ndjson"
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = columns
+
+    def begin(self) -> bytes:
+        return b""
+
+    def write(self, rows: Iterable[Sequence]) -> bytes:
+        return b"".join(orjson.dumps(dict(zip(self.columns, row))) + b"\n" for row in rows)
+
+    def end(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ParquetWriter:
+    """Writes every batch as one row group, so only one batch is held at a time"""
+
+    media_type = "application/vnd.apache.parquet"
+
+    def __init__(self, columns: Sequence[str], types: Sequence[str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        arrow_types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(), "timestamp": pa.timestamp("us")}
+        self.schema = pa.schema([(name, arrow_types[kind]) for name, kind in zip(columns, types)])
+        self.sink = _ChunkSink()
+        self.writer = pq.ParquetWriter(pa.PythonFile(self.sink, mode="w"), self.schema)
+
+    def begin(self) -> bytes:
+        return self.sink.drain()
+
+    def write(self, rows: Sequence[Sequence]) -> bytes:
+        columns = list(zip(*rows)) if rows else [[] for _ in self.schema]
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+            schema=self.schema
+        ))
+        return self.sink.drain()
+
+    def end(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+class ExportService:
+    @staticmethod
+    def analytics_query(
+        account_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Select:
+        """Analytics snapshots in date order, optionally of one account and a date range"""
+        conditions = []
+        if account_id:
+            conditions.append(Analytics.account_id == account_id)
+        if start:
+            conditions.append(Analytics.date >= start)
+        if end:
+            conditions.append(Analytics.date < end)
+        return select(*(column for _, column, _ in ANALYTICS_COLUMNS)).where(*conditions).order_by(Analytics.date, Analytics.id)
+
+    @staticmethod
+    def posts_query(
+        account_id: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Select:
+        """Posts with their engagement in creation order, optionally filtered"""
+        conditions = []
+        if account_id:
+            conditions.append(Post.account_id == account_id)
+        if status:
+            conditions.append(Post.status == status)
+        if start:
+            conditions.append(Post.created_at >= start)
+        if end:
+            conditions.append(Post.created_at < end)
+        return select(*(column for _, column, _ in POST_COLUMNS)).outerjoin(
+            Engagement, Engagement.post_id == Post.id
+        ).where(*conditions).order_by(Post.created_at, Post.id)
+
+    @staticmethod
+    def writer(format: str, columns: List[Tuple]):
+        """Encoder for format, raises ValueError if it is unknown or unavailable"""
+        names = [name for name, _, _ in columns]
+        if format == "csv":
+            return CsvWriter(names)
+        if format == "ndjson":
+            return NdjsonWriter(names)
+        if format == "parquet":
+            try:
+                return ParquetWriter(names, [kind for _, _, kind in columns])
+            except ImportError:
+                raise ValueError("Parquet export requires pyarrow")
+        raise ValueError(f"Unsupported format: {format}")
+
+    @staticmethod
+    def stream(query: Select, writer, session_factory: Callable[[], Session] = ReadSessionLocal) -> Iterator[bytes]:
+        """Encoded chunks of the query's rows, EXPORT_BATCH_ROWS at a time
+
+        Uses its own session from ``session_factory`` (routes pass
+        ``database.read_session_factory``, so a client that has just written reads
+        the primary) for the lifetime of the stream, which outlives the request's
+        session, and a server-side cursor where the driver has one (``yield_per``),
+        so memory stays flat however many rows match.
+        """
+        db = session_factory()
+        try:
+            yield writer.begin()
+            result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_ROWS))
+            for rows in result.partitions():
+                yield writer.write(rows)
+            yield writer.end()
+        finally:
+            db.close()
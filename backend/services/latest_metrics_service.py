@@ -0,0 +1,111 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, func, insert, select, update
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+from models import Analytics, AccountLatestMetrics
+from database import upsert
+
+# Growth compares the latest snapshot with the latest one at least this much older
+GROWTH_PERIOD = timedelta(days=7)
+
+SNAPSHOT_FIELDS = (
+    "followers", "following", "total_posts", "total_engagement", "reach", "impressions", "profile_views"
+)
+
+
+class LatestMetricsService:
+    """Keeps account_latest_metrics at the newest analytics snapshot of each account
+
+    Every method only issues statements on the given session; the caller owns the
+    commit, so the table changes in the same transaction as the snapshots.
+    """
+
+    @staticmethod
+    def record(db: Session, snapshots: List[Dict]) -> None:
+        """Fold newly written snapshots (AnalyticsCreate dicts) into their accounts' rows"""
+        newest = {}
+        for snapshot in snapshots:
+            current = newest.get(snapshot["account_id"])
+            if current is None or snapshot["date"] >= current["date"]:
+                newest[snapshot["account_id"]] = snapshot
+        if not newest:
+            return
+
+        stmt = upsert(db, AccountLatestMetrics)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AccountLatestMetrics.account_id],
+            set_={
+                "date": stmt.excluded.date,
+                **{field: getattr(stmt.excluded, field) for field in SNAPSHOT_FIELDS}
+            },
+            # An older snapshot arriving late leaves the row alone
+            where=stmt.excluded.date >= AccountLatestMetrics.date
+        )
+        db.execute(stmt, [
+            {
+                "account_id": account_id,
+                "date": snapshot["date"],
+                **{field: snapshot.get(field) or 0 for field in SNAPSHOT_FIELDS}
+            }
+            for account_id, snapshot in newest.items()
+        ])
+
+        # A new latest snapshot moves the comparison point, and a backfilled one
+        # can become it, so re-resolve it for every account touched
+        LatestMetricsService._resolve_week_ago(db, list(newest))
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recompute the table from the whole analytics history, returns the row count"""
+        ranked = select(
+            Analytics.account_id,
+            Analytics.date,
+            *(getattr(Analytics, field) for field in SNAPSHOT_FIELDS),
+            func.row_number().over(
+                partition_by=Analytics.account_id,
+                order_by=(Analytics.date.desc(), Analytics.id.desc())
+            ).label("row_number")
+        ).where(Analytics.date.isnot(None)).subquery()
+
+        db.query(AccountLatestMetrics).delete(synchronize_session=False)
+        db.execute(
+            insert(AccountLatestMetrics).from_select(
+                ["account_id", "date", *SNAPSHOT_FIELDS],
+                select(
+                    ranked.c.account_id,
+                    ranked.c.date,
+                    *(ranked.c[field] for field in SNAPSHOT_FIELDS)
+                ).where(ranked.c.row_number == 1)
+            )
+        )
+        LatestMetricsService._resolve_week_ago(db, None)
+        return db.query(func.count(AccountLatestMetrics.account_id)).scalar() or 0
+
+    @staticmethod
+    def _resolve_week_ago(db: Session, account_ids: Optional[Iterable[int]] = None) -> None:
+        """Point week_ago_* at the snapshot GROWTH_PERIOD before each row's date"""
+        query = db.query(AccountLatestMetrics.account_id, AccountLatestMetrics.date)
+        if account_ids is not None:
+            query = query.filter(AccountLatestMetrics.account_id.in_(list(account_ids)))
+        targets = [
+            {"account": account_id, "cutoff": date - GROWTH_PERIOD}
+            for account_id, date in query
+        ]
+        if not targets:
+            return
+
+        def week_ago(column):
+            # One (account_id, date) index probe per account
+            return select(column).where(
+                Analytics.account_id == bindparam("account"),
+                Analytics.date <= bindparam("cutoff")
+            ).order_by(Analytics.date.desc(), Analytics.id.desc()).limit(1).scalar_subquery()
+
+        table = AccountLatestMetrics.__table__
+        db.execute(
+            update(table).where(table.c.account_id == bindparam("account")).values(
+                week_ago_date=week_ago(Analytics.date),
+                week_ago_followers=week_ago(Analytics.followers)
+            ),
+            targets
+        )
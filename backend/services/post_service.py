@@ -1,15 +1,47 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy import case
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 from models import Post, Engagement, SocialAccount
-from schemas import PostCreate, PostUpdate
-from redis_client import redis_client
+from schemas import PostCreate, PostUpdate, EngagementRecord
+from cache import cache
+from services.rollup_service import RollupService
+from leaderboard import leaderboard, Entry
+from database import run_in_session, DBSession, upsert, lock_for_write
+from pagination import after_cursor, next_cursor
+
+# Records applied per set-based statement by the bulk engagement endpoint
+BULK_CHUNK_SIZE = 1000
+
+# Fields of schemas.Post that listings can be projected to with ``fields``
+POST_FIELDS = (
+    "id", "account_id", "content", "media_url", "scheduled_time", "published_time",
+    "status", "post_type", "created_at", "updated_at", "engagement"
+)
+
+
+class Writes(NamedTuple):
+    """Cache tags to invalidate and leaderboard changes of a committed write
+
+    PostService applies them with the sync Redis client; AsyncPostService gets
+    them back from the session work and applies them with the async one, so no
+    Redis call blocks the event loop.
+    """
+    tags: Tuple[str, ...] = ()
+    ranked: Tuple[Entry, ...] = ()
+    removed: Tuple[Tuple[int, int, str], ...] = ()
 
 
 class PostService:
     @staticmethod
     def create_post(db: Session, post_data: PostCreate) -> Post:
         """Create a new post"""
+        post, writes = PostService._create_post(db, post_data)
+        _apply(writes)
+        return post
+
+    @staticmethod
+    def _create_post(db: Session, post_data: PostCreate) -> Tuple[Post, Writes]:
         # Verify account exists
         account = db.query(SocialAccount).filter(
             SocialAccount.id == post_data.account_id
@@ -39,11 +71,7 @@ class PostService:
         db.add(engagement)
         db.commit()
         
-        # Invalidate cache
-        redis_client.delete("posts:all")
-        redis_client.delete(f"posts:account:{post_data.account_id}")
-        
-        return post
+        return post, Writes(("posts", f"account:{post_data.account_id}"))
 
     @staticmethod
     def get_posts(
@@ -51,10 +79,11 @@ class PostService:
         account_id: Optional[int] = None,
         status: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[List[str]] = None
     ) -> List[Post]:
         """Get posts with optional filters"""
-        query = db.query(Post)
+        query = db.query(Post).options(*_listing_options(fields))
         
         if account_id:
             query = query.filter(Post.account_id == account_id)
@@ -62,46 +91,101 @@ class PostService:
         if status:
             query = query.filter(Post.status == status)
         
-        posts = query.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+        posts = query.order_by(Post.created_at.desc(), Post.id.desc()).offset(skip).limit(limit).all()
         return posts
 
+    @staticmethod
+    def get_posts_page(
+        db: Session,
+        account_id: Optional[int] = None,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        """Get one page of posts after a cursor, newest first, and the next cursor"""
+        query = db.query(Post).options(*_listing_options(fields))
+        
+        if account_id:
+            query = query.filter(Post.account_id == account_id)
+        
+        if status:
+            query = query.filter(Post.status == status)
+        
+        if cursor:
+            query = query.filter(after_cursor(Post.created_at, Post.id, cursor, descending=True))
+        
+        posts = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1).all()
+        return posts, next_cursor(posts, limit)
+
     @staticmethod
     def get_post(db: Session, post_id: int) -> Optional[Post]:
         """Get a single post by ID"""
         return db.query(Post).filter(Post.id == post_id).first()
 
+    @staticmethod
+    def get_post_version(db: Session, post_id: int) -> Optional[str]:
+        """Version of a post and its engagement, without loading them; None if the post does not exist"""
+        row = db.query(Post.updated_at, Engagement.updated_at).outerjoin(
+            Engagement, Engagement.post_id == Post.id
+        ).filter(Post.id == post_id).first()
+        if row is None:
+            return None
+        return post_version(*row)
+
     @staticmethod
     def update_post(db: Session, post_id: int, post_data: PostUpdate) -> Optional[Post]:
         """Update a post"""
-        post = db.query(Post).filter(Post.id == post_id).first()
+        post, writes = PostService._update_post(db, post_id, post_data)
+        _apply(writes)
+        return post
+
+    @staticmethod
+    def _update_post(db: Session, post_id: int, post_data: PostUpdate) -> Tuple[Optional[Post], Writes]:
+        post = _locked_post(db, post_id)
         
         if not post:
-            return None
+            return None, Writes()
         
         update_data = post_data.model_dump(exclude_unset=True)
         
+        # A status change can move the post in or out of the daily rollup
+        if "status" in update_data:
+            RollupService.remove_post(db, post)
+        
         for key, value in update_data.items():
             setattr(post, key, value)
         
         post.updated_at = datetime.utcnow()
         
+        if "status" in update_data:
+            RollupService.add_post(db, post)
+        
         db.commit()
         db.refresh(post)
         
-        # Invalidate cache
-        redis_client.delete("posts:all")
-        redis_client.delete(f"posts:account:{post.account_id}")
-        redis_client.delete(f"post:{post_id}")
-        
-        return post
+        tags = ("posts", f"account:{post.account_id}", f"post:{post_id}")
+        if "status" in update_data:
+            return post, _ranked(post, tags)
+        return post, Writes(tags)
 
     @staticmethod
     def delete_post(db: Session, post_id: int) -> bool:
         """Delete a post"""
-        post = db.query(Post).filter(Post.id == post_id).first()
+        deleted, writes = PostService._delete_post(db, post_id)
+        _apply(writes)
+        return deleted
+
+    @staticmethod
+    def _delete_post(db: Session, post_id: int) -> Tuple[bool, Writes]:
+        post = _locked_post(db, post_id)
         
         if not post:
-            return False
+            return False, Writes()
+        
+        RollupService.remove_post(db, post)
+        
+        platform = post.account.platform
         
         # Delete associated engagement
         db.query(Engagement).filter(Engagement.post_id == post_id).delete()
@@ -109,39 +193,130 @@ class PostService:
         db.delete(post)
         db.commit()
         
-        # Invalidate cache
-        redis_client.delete("posts:all")
-        redis_client.delete(f"posts:account:{post.account_id}")
-        redis_client.delete(f"post:{post_id}")
-        
-        return True
+        return True, Writes(
+            ("posts", "engagement", f"account:{post.account_id}", f"post:{post_id}"),
+            removed=((post_id, post.account_id, platform),)
+        )
 
     @staticmethod
     def publish_post(db: Session, post_id: int) -> Optional[Post]:
         """Publish a post"""
-        post = db.query(Post).filter(Post.id == post_id).first()
+        post, writes = PostService._publish_post(db, post_id)
+        _apply(writes)
+        return post
+
+    @staticmethod
+    def _publish_post(db: Session, post_id: int) -> Tuple[Optional[Post], Writes]:
+        post = _locked_post(db, post_id)
         
         if not post:
-            return None
+            return None, Writes()
+        
+        # Republishing moves the post to today's rollup row
+        RollupService.remove_post(db, post)
         
         post.status = "published"
         post.published_time = datetime.utcnow()
         post.updated_at = datetime.utcnow()
         
+        RollupService.add_post(db, post)
+        
         db.commit()
         db.refresh(post)
         
-        # Invalidate cache
-        redis_client.delete("posts:all")
-        redis_client.delete(f"posts:account:{post.account_id}")
-        redis_client.delete("dashboard:stats")
+        return post, _ranked(post, ("posts", f"account:{post.account_id}", f"post:{post_id}"))
+
+    @staticmethod
+    def publish_due_posts(db: Session, post_ids: List[int]) -> List[Tuple[int, datetime, datetime]]:
+        """Publish those of the given posts that are still scheduled and due, in one transaction
+
+        Rows locked by another transaction are skipped (``FOR UPDATE SKIP LOCKED``
+        where the database supports it), so concurrent dispatchers never publish a
+        post twice. Returns (post id, scheduled time, published time) of each post
+        published.
+        """
+        published, writes = PostService._publish_due_posts(db, post_ids)
+        _apply(writes)
+        return published
+
+    @staticmethod
+    def _publish_due_posts(db: Session, post_ids: List[int]) -> Tuple[List[Tuple[int, datetime, datetime]], Writes]:
+        now = datetime.utcnow()
+        lock_for_write(db)
+        posts = db.query(Post).options(
+            selectinload(Post.engagement),
+            selectinload(Post.account)
+        ).filter(
+            Post.id.in_(post_ids),
+            Post.status == "scheduled",
+            Post.scheduled_time <= now
+        ).with_for_update(skip_locked=True, of=Post).all()
+        
+        if not posts:
+            db.rollback()
+            return [], Writes()
+        
+        rollup = {}
+        ranked = []
+        published = []
+        for post in posts:
+            post.status = "published"
+            post.published_time = now
+            post.updated_at = now
+            published.append((post.id, post.scheduled_time, now))
+            
+            engagement = post.engagement
+            totals = {
+                name: (getattr(engagement, name) or 0) if engagement else 0
+                for name in ("likes", "comments", "shares", "views", "clicks")
+            }
+            delta = rollup.setdefault(post.account_id, {
+                "account_id": post.account_id,
+                "date": now.date(),
+                "likes": 0,
+                "comments": 0,
+                "shares": 0,
+                "views": 0,
+                "clicks": 0,
+                "post_count": 0
+            })
+            for name, value in totals.items():
+                delta[name] += value
+            delta["post_count"] += 1
+            
+            if engagement is not None:
+                ranked.append((
+                    post.id,
+                    post.account_id,
+                    post.account.platform,
+                    totals["likes"] + totals["comments"] + totals["shares"]
+                ))
+        
+        RollupService.record_many(db, list(rollup.values()))
+        db.commit()
         
-        return post
+        tags = (
+            "posts",
+            *(f"account:{account_id}" for account_id in rollup),
+            *(f"post:{post_id}" for post_id, _, _ in published)
+        )
+        return published, Writes(tags, tuple(ranked))
+
+    @staticmethod
+    def get_upcoming_scheduled(db: Session, until: datetime) -> List[Tuple[int, datetime]]:
+        """(post id, scheduled time) of scheduled posts due before until, overdue ones included"""
+        return [
+            (row.id, row.scheduled_time)
+            for row in db.query(Post.id, Post.scheduled_time).filter(
+                Post.status == "scheduled",
+                Post.scheduled_time <= until
+            )
+        ]
 
     @staticmethod
-    def get_scheduled_posts(db: Session) -> List[Post]:
+    def get_scheduled_posts(db: Session, fields: Optional[List[str]] = None) -> List[Post]:
         """Get all scheduled posts"""
-        return db.query(Post).filter(
+        return db.query(Post).options(*_listing_options(fields)).filter(
             Post.status == "scheduled",
             Post.scheduled_time.isnot(None)
         ).order_by(Post.scheduled_time).all()
@@ -157,12 +332,44 @@ class PostService:
         clicks: int = 0
     ) -> Optional[Engagement]:
         """Update engagement metrics for a post"""
-        engagement = db.query(Engagement).filter(
+        engagement, writes = PostService._update_engagement(db, post_id, likes, comments, shares, views, clicks)
+        _apply(writes)
+        return engagement
+
+    @staticmethod
+    def _update_engagement(
+        db: Session,
+        post_id: int,
+        likes: int = 0,
+        comments: int = 0,
+        shares: int = 0,
+        views: int = 0,
+        clicks: int = 0
+    ) -> Tuple[Optional[Engagement], Writes]:
+        # The rollup delta is taken from the current counts: lock the post and its
+        # engagement so an overlapping update waits and then sees these counts
+        lock_for_write(db)
+        engagement = db.query(Engagement).join(
+            Post, Post.id == Engagement.post_id
+        ).filter(
             Engagement.post_id == post_id
-        ).first()
+        ).with_for_update().first()
         
         if not engagement:
-            return None
+            return None, Writes()
+        
+        post = engagement.post
+        if post.status == "published" and post.published_time:
+            RollupService.record(
+                db,
+                post.account_id,
+                post.published_time.date(),
+                likes=likes - (engagement.likes or 0),
+                comments=comments - (engagement.comments or 0),
+                shares=shares - (engagement.shares or 0),
+                views=views - (engagement.views or 0),
+                clicks=clicks - (engagement.clicks or 0)
+            )
         
         engagement.likes = likes
         engagement.comments = comments
@@ -180,9 +387,350 @@ class PostService:
         db.commit()
         db.refresh(engagement)
         
-        # Invalidate cache
-        redis_client.delete("dashboard:stats")
-        redis_client.delete(f"engagement:trends:30")
-        redis_client.delete(f"post:{post_id}")
-        
+        tags = ("engagement", f"account:{post.account_id}", f"post:{post_id}")
+        if post.status == "published":
+            return engagement, _ranked(post, tags)
+        return engagement, Writes(tags)
+
+
+    @staticmethod
+    def apply_engagement_batch(
+        db: Session,
+        records: List[Tuple[int, EngagementRecord]]
+    ) -> Tuple[List[Dict], Set[int], List[Entry]]:
+        """Upsert a chunk of engagement records without committing
+
+        Returns the per-record statuses, the ids of the accounts touched and the
+        leaderboard entries of the published posts among them.
+        """
+        # The last record wins when a post appears more than once
+        latest = {record.post_id: index for index, record in records}
+        
+        # Rollup deltas are taken from the current counts: lock the posts (in id
+        # order, so overlapping batches cannot deadlock) until the commit
+        lock_for_write(db)
+        current = {
+            row.id: row
+            for row in db.query(
+                Post.id,
+                Post.account_id,
+                Post.status,
+                Post.published_time,
+                SocialAccount.platform,
+                Engagement.id.label("engagement_id"),
+                Engagement.likes,
+                Engagement.comments,
+                Engagement.shares,
+                Engagement.views,
+                Engagement.clicks
+            ).join(
+                SocialAccount, SocialAccount.id == Post.account_id
+            ).outerjoin(
+                Engagement, Engagement.post_id == Post.id
+            ).filter(
+                Post.id.in_(list(latest))
+            ).order_by(Post.id).with_for_update(of=Post)
+        }
+        
+        statuses = []
+        accounts = set()
+        rows = []
+        rollup = {}
+        ranked = []
+        now = datetime.utcnow()
+        
+        for index, record in records:
+            existing = current.get(record.post_id)
+            if existing is None:
+                statuses.append({"index": index, "post_id": record.post_id, "status": "not_found"})
+                continue
+            if latest[record.post_id] != index:
+                statuses.append({"index": index, "post_id": record.post_id, "status": "duplicate"})
+                continue
+            
+            statuses.append({
+                "index": index,
+                "post_id": record.post_id,
+                "status": "updated" if existing.engagement_id else "created"
+            })
+            accounts.add(existing.account_id)
+            
+            total_engagement = record.likes + record.comments + record.shares + record.clicks
+            rows.append({
+                "post_id": record.post_id,
+                "likes": record.likes,
+                "comments": record.comments,
+                "shares": record.shares,
+                "views": record.views,
+                "clicks": record.clicks,
+                "engagement_rate": (total_engagement / record.views) * 100 if record.views > 0 else 0.0,
+                "updated_at": now
+            })
+            
+            if existing.status == "published":
+                ranked.append((
+                    record.post_id,
+                    existing.account_id,
+                    existing.platform,
+                    record.likes + record.comments + record.shares
+                ))
+            
+            # Published posts carry their engagement in the daily rollup
+            if existing.status == "published" and existing.published_time:
+                day = existing.published_time.date()
+                delta = rollup.setdefault((existing.account_id, day), {
+                    "account_id": existing.account_id,
+                    "date": day,
+                    "likes": 0,
+                    "comments": 0,
+                    "shares": 0,
+                    "views": 0,
+                    "clicks": 0,
+                    "post_count": 0
+                })
+                delta["likes"] += record.likes - (existing.likes or 0)
+                delta["comments"] += record.comments - (existing.comments or 0)
+                delta["shares"] += record.shares - (existing.shares or 0)
+                delta["views"] += record.views - (existing.views or 0)
+                delta["clicks"] += record.clicks - (existing.clicks or 0)
+        
+        if rows:
+            stmt = upsert(db, Engagement)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Engagement.post_id],
+                set_={
+                    "likes": stmt.excluded.likes,
+                    "comments": stmt.excluded.comments,
+                    "shares": stmt.excluded.shares,
+                    "views": stmt.excluded.views,
+                    "clicks": stmt.excluded.clicks,
+                    # Like update_engagement, keep the previous rate when there are no views
+                    "engagement_rate": case(
+                        (stmt.excluded.views > 0, stmt.excluded.engagement_rate),
+                        else_=Engagement.engagement_rate
+                    ),
+                    "updated_at": stmt.excluded.updated_at
+                }
+            )
+            db.execute(stmt, rows)
+            RollupService.record_many(db, list(rollup.values()))
+        
+        return statuses, accounts, ranked
+
+
+def _listing_options(fields: Optional[List[str]] = None) -> list:
+    """Loader options for post listings
+
+    Engagement comes in one batched SELECT ... WHERE post_id IN (...) per page
+    instead of a lazy load per post. With ``fields`` only those columns (plus the
+    keyset columns) are fetched, and engagement only if it is one of them.
+    """
+    if fields is None:
+        return [selectinload(Post.engagement)]
+    columns = {"created_at"} | {field for field in fields if field not in ("id", "engagement")}
+    options = [load_only(*(getattr(Post, column) for column in sorted(columns)))]
+    if "engagement" in fields:
+        options.append(selectinload(Post.engagement))
+    return options
+
+
+def _locked_post(db: Session, post_id: int) -> Optional[Post]:
+    """The post, locked until the commit
+
+    Every write that moves a post's engagement in or out of the daily rollup
+    locks the post row first, so the status and counts it reads cannot change
+    before its rollup delta is recorded.
+    """
+    lock_for_write(db)
+    return db.query(Post).filter(Post.id == post_id).with_for_update().first()
+
+
+def _ranked(post: Post, tags: Tuple[str, ...]) -> Writes:
+    """Writes that rank a published post by its engagement, or drop it from the leaderboard"""
+    engagement = post.engagement
+    if post.status == "published" and engagement is not None:
+        score = (engagement.likes or 0) + (engagement.comments or 0) + (engagement.shares or 0)
+        return Writes(tags, ranked=((post.id, post.account_id, post.account.platform, score),))
+    return Writes(tags, removed=((post.id, post.account_id, post.account.platform),))
+
+
+def _apply(writes: Writes) -> None:
+    if writes.tags:
+        cache.invalidate(*writes.tags)
+    if writes.ranked:
+        leaderboard.update(writes.ranked)
+    for post_id, account_id, platform in writes.removed:
+        leaderboard.remove(post_id, account_id, platform)
+
+
+async def _aapply(writes: Writes) -> None:
+    if writes.tags:
+        await cache.ainvalidate(*writes.tags)
+    if writes.ranked:
+        await leaderboard.aupdate(writes.ranked)
+    for post_id, account_id, platform in writes.removed:
+        await leaderboard.aremove(post_id, account_id, platform)
+
+
+def _commit(db: Session) -> None:
+    db.commit()
+
+
+def post_version(updated_at: Optional[datetime], engagement_updated_at: Optional[datetime]) -> str:
+    """Changes whenever a post or its engagement is written"""
+    return f"{updated_at.isoformat() if updated_at else ''}/{engagement_updated_at.isoformat() if engagement_updated_at else ''}"
+
+
+def _with_engagement(fn):
+    """Wrap a PostService call so the engagement of returned posts is loaded
+
+    Response models read ``Post.engagement``; under an AsyncSession that lazy load
+    has to happen inside ``run_sync`` rather than during serialization.
+    """
+    def wrapper(db: Session, *args, **kwargs):
+        result = fn(db, *args, **kwargs)
+        # Write methods return (post, writes)
+        value = result[0] if isinstance(result, tuple) else result
+        for post in value if isinstance(value, list) else [value]:
+            if isinstance(post, Post):
+                post.engagement
+        return result
+    return wrapper
+
+
+class AsyncPostService:
+    """Awaitable counterpart of PostService for async route handlers
+
+    Accepts either an AsyncSession or a Session; see ``database.run_in_session``.
+    """
+
+    @staticmethod
+    async def create_post(db: DBSession, post_data: PostCreate) -> Post:
+        post, writes = await run_in_session(db, _with_engagement(PostService._create_post), post_data)
+        await _aapply(writes)
+        return post
+
+    @staticmethod
+    async def get_posts(
+        db: DBSession,
+        account_id: Optional[int] = None,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> List[Post]:
+        return await run_in_session(db, PostService.get_posts, account_id, status, skip, limit, fields)
+
+    @staticmethod
+    async def get_posts_page(
+        db: DBSession,
+        account_id: Optional[int] = None,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Post], Optional[str]]:
+        return await run_in_session(db, PostService.get_posts_page, account_id, status, cursor, limit, fields)
+
+    @staticmethod
+    async def get_post(db: DBSession, post_id: int) -> Optional[Post]:
+        return await run_in_session(db, _with_engagement(PostService.get_post), post_id)
+
+    @staticmethod
+    async def get_post_version(db: DBSession, post_id: int) -> Optional[str]:
+        return await run_in_session(db, PostService.get_post_version, post_id)
+
+    @staticmethod
+    async def update_post(db: DBSession, post_id: int, post_data: PostUpdate) -> Optional[Post]:
+        post, writes = await run_in_session(db, _with_engagement(PostService._update_post), post_id, post_data)
+        await _aapply(writes)
+        return post
+
+    @staticmethod
+    async def delete_post(db: DBSession, post_id: int) -> bool:
+        deleted, writes = await run_in_session(db, PostService._delete_post, post_id)
+        await _aapply(writes)
+        return deleted
+
+    @staticmethod
+    async def publish_post(db: DBSession, post_id: int) -> Optional[Post]:
+        post, writes = await run_in_session(db, _with_engagement(PostService._publish_post), post_id)
+        await _aapply(writes)
+        return post
+
+    @staticmethod
+    async def get_scheduled_posts(db: DBSession, fields: Optional[List[str]] = None) -> List[Post]:
+        return await run_in_session(db, PostService.get_scheduled_posts, fields)
+
+    @staticmethod
+    async def update_engagement(
+        db: DBSession,
+        post_id: int,
+        likes: int = 0,
+        comments: int = 0,
+        shares: int = 0,
+        views: int = 0,
+        clicks: int = 0
+    ) -> Optional[Engagement]:
+        engagement, writes = await run_in_session(
+            db, PostService._update_engagement, post_id, likes, comments, shares, views, clicks
+        )
+        await _aapply(writes)
         return engagement
+
+    @staticmethod
+    async def bulk_update_engagement(
+        db: DBSession,
+        records: AsyncIterator[Tuple[int, Union[EngagementRecord, str]]]
+    ) -> Dict:
+        """Apply a stream of engagement records in chunks inside one transaction
+
+        ``records`` yields (index, record) pairs, with a validation message in place
+        of the record for input that could not be parsed. Caches are invalidated
+        once, after the commit.
+        """
+        results = []
+        accounts = set()
+        post_ids = set()
+        ranked = []
+        chunk = []
+        
+        async def flush():
+            statuses, touched, entries = await run_in_session(db, PostService.apply_engagement_batch, chunk)
+            results.extend(statuses)
+            accounts.update(touched)
+            ranked.extend(entries)
+            post_ids.update(status["post_id"] for status in statuses if status["status"] in ("updated", "created"))
+            chunk.clear()
+        
+        async for index, record in records:
+            if isinstance(record, str):
+                results.append({"index": index, "status": "invalid", "error": record})
+                continue
+            chunk.append((index, record))
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                await flush()
+        if chunk:
+            await flush()
+        
+        await run_in_session(db, _commit)
+        
+        if post_ids:
+            await cache.ainvalidate(
+                "engagement",
+                *(f"account:{account_id}" for account_id in accounts),
+                *(f"post:{post_id}" for post_id in post_ids)
+            )
+        if ranked:
+            await leaderboard.aupdate(ranked)
+        
+        results.sort(key=lambda status: status["index"])
+        updated = sum(1 for status in results if status["status"] == "updated")
+        created = sum(1 for status in results if status["status"] == "created")
+        return {
+            "processed": len(results),
+            "updated": updated,
+            "created": created,
+            "skipped": len(results) - updated - created,
+            "results": results
+        }
@@ -0,0 +1,112 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert
+from datetime import date
+from typing import Dict, List
+from models import Post, Engagement, EngagementDaily
+from database import upsert
+
+
+class RollupService:
+    """Keeps the engagement_daily rollup in step with published posts
+
+    Every method only issues statements on the given session; the caller owns the
+    commit, so the rollup changes land in the same transaction as the post write.
+    """
+
+    @staticmethod
+    def record(
+        db: Session,
+        account_id: int,
+        day: date,
+        likes: int = 0,
+        comments: int = 0,
+        shares: int = 0,
+        views: int = 0,
+        clicks: int = 0,
+        posts: int = 0
+    ) -> None:
+        """Add deltas to one (account, day) rollup row, creating it if needed"""
+        RollupService.record_many(db, [{
+            "account_id": account_id,
+            "date": day,
+            "likes": likes,
+            "comments": comments,
+            "shares": shares,
+            "views": views,
+            "clicks": clicks,
+            "post_count": posts
+        }])
+
+    @staticmethod
+    def record_many(db: Session, rows: List[Dict]) -> None:
+        """Add the deltas of several (account, day) rows in one executemany"""
+        if not rows:
+            return
+        stmt = upsert(db, EngagementDaily)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EngagementDaily.account_id, EngagementDaily.date],
+            set_={
+                "likes": EngagementDaily.likes + stmt.excluded.likes,
+                "comments": EngagementDaily.comments + stmt.excluded.comments,
+                "shares": EngagementDaily.shares + stmt.excluded.shares,
+                "views": EngagementDaily.views + stmt.excluded.views,
+                "clicks": EngagementDaily.clicks + stmt.excluded.clicks,
+                "post_count": EngagementDaily.post_count + stmt.excluded.post_count
+            }
+        )
+        db.execute(stmt, rows)
+
+    @staticmethod
+    def add_post(db: Session, post: Post, sign: int = 1) -> None:
+        """Count a published post and its engagement towards its day"""
+        if post.status != "published" or not post.published_time:
+            return
+
+        engagement = post.engagement
+        RollupService.record(
+            db,
+            post.account_id,
+            post.published_time.date(),
+            likes=sign * ((engagement.likes or 0) if engagement else 0),
+            comments=sign * ((engagement.comments or 0) if engagement else 0),
+            shares=sign * ((engagement.shares or 0) if engagement else 0),
+            views=sign * ((engagement.views or 0) if engagement else 0),
+            clicks=sign * ((engagement.clicks or 0) if engagement else 0),
+            posts=sign
+        )
+
+    @staticmethod
+    def remove_post(db: Session, post: Post) -> None:
+        """Undo add_post, e.g. before the post is deleted or unpublished"""
+        RollupService.add_post(db, post, sign=-1)
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recompute the whole rollup from posts and engagement, returns the row count"""
+        day = func.date(Post.published_time)
+        source = db.query(
+            Post.account_id,
+            day,
+            func.coalesce(func.sum(Engagement.likes), 0),
+            func.coalesce(func.sum(Engagement.comments), 0),
+            func.coalesce(func.sum(Engagement.shares), 0),
+            func.coalesce(func.sum(Engagement.views), 0),
+            func.coalesce(func.sum(Engagement.clicks), 0),
+            func.count(Post.id)
+        ).outerjoin(
+            Engagement, Post.id == Engagement.post_id
+        ).filter(
+            Post.status == "published",
+            Post.published_time.isnot(None)
+        ).group_by(
+            Post.account_id, day
+        )
+
+        db.query(EngagementDaily).delete(synchronize_session=False)
+        db.execute(
+            insert(EngagementDaily).from_select(
+                ["account_id", "date", "likes", "comments", "shares", "views", "clicks", "post_count"],
+                source.statement
+            )
+        )
+        return db.query(func.count(EngagementDaily.id)).scalar() or 0
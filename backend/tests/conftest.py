@@ -0,0 +1,101 @@
+"""Fixtures for the backend tests
+
+The app reads its settings at import time, so a scratch SQLite database and an
+in-memory Redis (fakeredis) are set up here before anything imports it.
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("fakeredis")
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'test.db')}"
+for name in ("ASYNC_DATABASE_URL", "DATABASE_REPLICA_URL", "ASYNC_DATABASE_REPLICA_URL"):
+    os.environ.pop(name, None)
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+from tests.fakes import use_fakeredis  # noqa: E402
+
+use_fakeredis()
+
+pytest_plugins = ["pytest_query_budget"]
+
+
+@pytest.fixture
+def redis():
+    """The app's Redis client, flushed"""
+    from redis_client import redis_client
+
+    redis_client.client.flushall()
+    if redis_client.local is not None:
+        redis_client.local.clear()
+    return redis_client
+
+
+@pytest.fixture
+def db(redis):
+    """A session on empty tables, with Redis flushed"""
+    from database import Base, SessionLocal, engine
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def seed(db):
+    """Factory adding accounts to the database
+
+    ``seed(accounts, posts)`` adds that many active accounts, each with a
+    follower snapshot and ``posts`` published and ``posts`` scheduled posts, and
+    returns their ids.
+    """
+    from schemas import AnalyticsCreate, PostCreate, SocialAccountCreate
+    from services.account_service import AccountService
+    from services.post_service import PostService
+
+    created = []
+
+    def add(accounts: int, posts: int = 0):
+        ids = []
+        for _ in range(accounts):
+            number = len(created)
+            account = AccountService.create_account(db, SocialAccountCreate(
+                platform=("twitter", "facebook", "instagram", "linkedin")[number % 4],
+                account_name=f"account {number}",
+                account_id=f"test-{number}"
+            ))
+            AccountService.add_analytics(db, account.id, AnalyticsCreate(
+                account_id=account.id, date=datetime.utcnow(), followers=100 + number
+            ))
+            for index in range(posts):
+                published = PostService.create_post(db, PostCreate(account_id=account.id, content=f"post {index}"))
+                PostService.publish_post(db, published.id)
+                PostService.update_engagement(db, published.id, likes=index, views=10 * index)
+                PostService.create_post(db, PostCreate(
+                    account_id=account.id,
+                    content=f"scheduled {index}",
+                    scheduled_time=datetime.utcnow() + timedelta(days=1, minutes=index)
+                ))
+            created.append(account.id)
+            ids.append(account.id)
+        return ids
+
+    return add
@@ -0,0 +1,27 @@
+"""In-memory stand-ins for the app's external services, shared by the tests, benchmarks and tools"""
+import asyncio
+
+
+def use_fakeredis() -> None:
+    """Point redis_client at one in-memory fakeredis server, before anything imports it
+
+    Raises ImportError if fakeredis is not installed.
+    """
+    import fakeredis
+    import fakeredis.aioredis
+    import redis
+
+    server = fakeredis.FakeServer()
+    redis.Redis = lambda **kwargs: fakeredis.FakeRedis(server=server, **kwargs)
+
+    import redis_client
+
+    clients = {}
+
+    def client(self):
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = fakeredis.aioredis.FakeRedis(server=server)
+        return clients[loop]
+
+    redis_client.AsyncRedisClient.client = property(client)
@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.parametrize("percentiles", ["nan", "10,NaN", "inf", "-inf", "-1", "101", "10,x"])
+def test_timeseries_rejects_invalid_percentiles(client, percentiles):
+    response = client.get("/api/analytics/timeseries", params={"percentiles": percentiles})
+    assert response.status_code == 422
+
+
+def test_timeseries_accepts_percentiles(client, seed):
+    seed(3)
+    response = client.get("/api/analytics/timeseries", params={"days": 7, "percentiles": "0,50,99.5,100"})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("platform", ["myspace", "Twitter", "x" * 200])
+def test_top_posts_rejects_unknown_platforms(client, platform):
+    response = client.get("/api/analytics/top-posts", params={"platform": platform})
+    assert response.status_code == 422
+
+
+def test_top_posts_of_a_platform(client, seed):
+    seed(4, posts=2)
+    response = client.get("/api/analytics/top-posts", params={"platform": "twitter"})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
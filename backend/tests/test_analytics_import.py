@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta, timezone
+
+from models import Analytics
+from schemas import AnalyticsCreate
+from services.account_service import AccountService
+
+
+def test_snapshot_posted_with_an_offset_is_not_imported_twice(client, db, seed):
+    account_id, = seed(1)
+    date = datetime(2026, 3, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+
+    response = client.post(f"/api/accounts/{account_id}/analytics", json={
+        "account_id": account_id, "date": date.isoformat(), "followers": 10
+    })
+    assert response.status_code == 200
+
+    result = AccountService.import_analytics_batch(db, [
+        (1, AnalyticsCreate(account_id=account_id, date=date.astimezone(timezone.utc), followers=20))
+    ])
+
+    assert (result["created"], result["updated"]) == (0, 1)
+    stored = db.query(Analytics).filter(Analytics.account_id == account_id, Analytics.date == datetime(2026, 3, 1, 10, 0))
+    assert [row.followers for row in stored] == [20]
@@ -0,0 +1,23 @@
+from typing import Tuple
+
+from services.analytics_service import AnalyticsService
+
+
+def _platform_stats_statements(db, query_budget) -> Tuple[int, int]:
+    """Statements run by one platform stats computation, and the rows it returned"""
+    with query_budget(1) as recorder:
+        stats = AnalyticsService._platform_stats(db)
+    db.expire_all()
+    return len(recorder.statements), len(stats)
+
+
+def test_platform_stats_statements_do_not_grow_with_accounts(db, seed, query_budget):
+    seed(10, posts=2)
+    small, rows = _platform_stats_statements(db, query_budget)
+    assert rows == 10
+
+    seed(10, posts=2)
+    large, rows = _platform_stats_statements(db, query_budget)
+    assert rows == 20
+
+    assert small == large
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cache import cache
+
+CONCURRENCY = 500
+
+
+def _counting(result, delay: float = 0.2, fail_first: bool = False):
+    """A computation that records its calls, optionally raising on the first one"""
+    calls = []
+    lock = threading.Lock()
+
+    def compute():
+        with lock:
+            calls.append(time.monotonic())
+            first = len(calls) == 1
+        time.sleep(delay)
+        if fail_first and first:
+            raise RuntimeError("compute failed")
+        return result
+
+    return compute, calls
+
+
+def test_concurrent_cold_misses_compute_once(redis):
+    compute, calls = _counting({"total": 1})
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        results = list(pool.map(lambda _: cache.cached("test:cold", ["posts"], compute), range(CONCURRENCY)))
+
+    assert len(calls) == 1
+    assert results == [{"total": 1}] * CONCURRENCY
+
+
+def test_concurrent_cold_misses_compute_once_async(redis):
+    compute, calls = _counting({"total": 1})
+
+    async def acompute():
+        return await asyncio.to_thread(compute)
+
+    async def run():
+        return await asyncio.gather(*(cache.acached("test:cold", ["posts"], acompute) for _ in range(CONCURRENCY)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert results == [{"total": 1}] * CONCURRENCY
+
+
+def test_waiters_take_over_when_the_lease_holder_fails(redis):
+    compute, calls = _counting({"total": 1}, fail_first=True)
+
+    def read(_):
+        try:
+            return cache.cached("test:failing", ["posts"], compute)
+        except RuntimeError:
+            return None
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(50) as pool:
+        results = list(pool.map(read, range(50)))
+    elapsed = time.monotonic() - start
+
+    # The failed computation and exactly one retry, without waiting out the lease
+    assert len(calls) == 2
+    assert results.count(None) == 1
+    assert results.count({"total": 1}) == 49
+    assert elapsed < cache.LOCK_LEASE_MS / 1000 / 2
+
+
+def test_value_stored_while_waiting_for_the_lease_is_not_recomputed(redis):
+    compute, calls = _counting({"total": 1})
+    cache.cached("test:filled", ["posts"], compute)
+
+    # An entry stored by another worker between this worker's lookup and its lease
+    lookup = cache._lookup
+    cache_lookups = []
+
+    def stale_first_lookup(key, tags, body=False, replica=False):
+        cache_lookups.append(key)
+        if len(cache_lookups) == 1:
+            return lookup(key, tags, body, replica)[0], None
+        return lookup(key, tags, body, replica)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(cache, "_lookup", stale_first_lookup)
+        assert cache.cached("test:filled", ["posts"], compute) == {"total": 1}
+
+    assert len(calls) == 1
@@ -0,0 +1,46 @@
+import pytest
+
+
+def _statements(client, query_budget, url: str, budget: int = 2):
+    with query_budget(budget) as recorder:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(recorder.statements), response.json()
+
+
+@pytest.mark.parametrize("query", ["", "&cursor=", "&fields=id,content,engagement", "&status=published"])
+def test_posts_listing_statements_do_not_grow_with_page_size(client, seed, query_budget, query):
+    seed(10, posts=10)
+
+    small, posts = _statements(client, query_budget, f"/api/posts/?limit=5{query}")
+    large, more = _statements(client, query_budget, f"/api/posts/?limit=100{query}")
+
+    items = (lambda page: page["items"]) if "cursor" in query else (lambda page: page)
+    assert len(items(posts)) == 5
+    assert len(items(more)) == 100
+    assert small == large
+
+
+def test_scheduled_posts_statements_do_not_grow_with_page_size(client, seed, query_budget):
+    seed(1, posts=5)
+    small, posts = _statements(client, query_budget, "/api/posts/scheduled")
+
+    seed(10, posts=10)
+    large, more = _statements(client, query_budget, "/api/posts/scheduled")
+
+    assert len(posts) == 5
+    assert len(more) == 105
+    assert all(post["engagement"] is not None for post in more)
+    assert small == large
+
+
+@pytest.mark.parametrize("query", ["", "&cursor="])
+def test_projected_listing_matches_the_full_listing(client, seed, query):
+    seed(2, posts=3)
+    fields = ["id", "content", "created_at", "scheduled_time", "engagement"]
+
+    full = client.get(f"/api/posts/?limit=10{query}").json()
+    projected = client.get(f"/api/posts/?limit=10{query}&fields={','.join(fields)}").json()
+
+    items = (lambda page: page["items"]) if query else (lambda page: page)
+    assert items(projected) == [{field: post[field] for field in fields} for post in items(full)]
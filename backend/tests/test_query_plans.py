@@ -0,0 +1,38 @@
+"""tools.query_plans as tests: one per service query, against a seeded database"""
+import random
+
+import pytest
+
+from tools import query_plans
+
+# Enough posts that posts and engagement count as large tables
+POSTS = 20000
+ACCOUNTS = 50
+DAYS = 365
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    from database import Base, SessionLocal, engine
+    import models  # noqa: F401  (registers tables on Base)
+
+    random.seed(42)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        query_plans.seed(db, ACCOUNTS, POSTS, DAYS)
+    finally:
+        db.close()
+    return engine, SessionLocal, query_plans.large_tables(engine)
+
+
+def test_seed_has_large_tables(seeded):
+    assert {"posts", "engagement", "analytics"} <= seeded[2]
+
+
+@pytest.mark.parametrize("name, fn", [pytest.param(name, fn, id=name) for name, fn in query_plans.queries(POSTS)])
+def test_query_plan(seeded, name, fn):
+    engine, session_factory, large = seeded
+    failures = query_plans.check_query(engine, session_factory, name, fn, large)
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+
+
+@pytest.fixture
+def replica(db, tmp_path, monkeypatch):
+    """An empty replica, as if it had not applied any of the primary's writes yet"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    database.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=engine, info={"replica": True}))
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(
+        database, "AsyncReadSessionLocal",
+        async_sessionmaker(bind=async_engine, expire_on_commit=False, info={"replica": True})
+    )
+    yield
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+def _rows(response) -> int:
+    assert response.status_code == 200
+    return len(response.text.splitlines()) - 1
+
+
+def test_export_reads_the_replica(client, seed, replica):
+    seed(2)
+    assert _rows(client.get("/api/export/analytics")) == 0
+
+
+def test_export_reads_the_primary_right_after_a_write(client, seed, replica):
+    seed(2)
+    client.cookies.set(database.READ_YOUR_WRITES_COOKIE, "1")
+    assert _rows(client.get("/api/export/analytics")) == 2
+
+
+def _posts(response) -> int:
+    assert response.status_code == 200
+    return response.json()["total_posts"]
+
+
+def test_dashboard_reads_the_replica(client, seed, redis, replica):
+    seed(2, posts=1)
+    assert _posts(client.get("/api/analytics/dashboard")) == 0
+
+
+def test_replica_result_is_not_served_right_after_a_write(client, seed, redis, replica):
+    seed(2, posts=1)
+    # Cached from the replica under the tag generations of the writes above
+    assert _posts(client.get("/api/analytics/dashboard")) == 0
+
+    client.cookies.set(database.READ_YOUR_WRITES_COOKIE, "1")
+    assert _posts(client.get("/api/analytics/dashboard")) == 2
+
+
+def test_primary_result_is_served_to_replica_readers(client, seed, redis, replica):
+    seed(2, posts=1)
+    client.cookies.set(database.READ_YOUR_WRITES_COOKIE, "1")
+    assert _posts(client.get("/api/analytics/dashboard")) == 2
+
+    client.cookies.clear()
+    assert _posts(client.get("/api/analytics/dashboard")) == 2
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+import redis_client
+from metrics import REDIS_ERRORS
+
+
+class _Unreachable:
+    """A Redis client whose every command fails as if the server were down"""
+
+    def __getattr__(self, name):
+        raise ConnectionError("Connection refused")
+
+
+@pytest.fixture
+def unreachable(redis, monkeypatch):
+    monkeypatch.setattr(redis_client.redis_client, "client", _Unreachable())
+    monkeypatch.setattr(redis_client.AsyncRedisClient, "client", _Unreachable())
+    monkeypatch.setattr(redis_client, "_error_log", {})
+
+
+def _errors(command: str) -> float:
+    return REDIS_ERRORS.labels(command)._value.get()
+
+
+def test_sync_and_async_failures_share_one_label(unreachable):
+    before = _errors("INCRBY")
+
+    assert redis_client.redis_client.increment("test:counter") == 0
+    assert asyncio.run(redis_client.async_redis_client.increment("test:counter")) == 0
+
+    assert _errors("INCRBY") == before + 2
+
+
+def test_repeated_failures_are_counted_but_printed_once(unreachable, capsys):
+    before = _errors("EXISTS")
+
+    for _ in range(50):
+        redis_client.redis_client.exists("test:key")
+
+    assert _errors("EXISTS") == before + 50
+    assert capsys.readouterr().out.count("Redis EXISTS error") == 1
+
+
+def test_suppressed_failures_are_reported_once_the_interval_passes(unreachable, monkeypatch, capsys):
+    for _ in range(3):
+        redis_client.redis_client.exists("test:key")
+    monkeypatch.setattr(redis_client, "REDIS_ERROR_LOG_SECONDS", 0)
+    redis_client.redis_client.exists("test:key")
+
+    out = capsys.readouterr().out
+    assert out.count("Redis EXISTS error") == 2
+    assert "(2 more since the last report)" in out
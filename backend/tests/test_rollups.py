@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+from sqlalchemy import func
+
+from database import SessionLocal
+from models import Engagement, EngagementDaily, Post
+from schemas import EngagementRecord, PostUpdate
+from services.post_service import PostService
+from services.rollup_service import RollupService
+
+
+def _rollup(db):
+    rows = db.query(
+        EngagementDaily.account_id, EngagementDaily.date, EngagementDaily.likes, EngagementDaily.post_count
+    ).filter(EngagementDaily.post_count != 0)
+    return sorted((row.account_id, str(row.date), row.likes, row.post_count) for row in rows)
+
+
+def _aggregated(db):
+    """The rollup as a fresh aggregation of posts and engagement"""
+    day = func.date(Post.published_time)
+    rows = db.query(
+        Post.account_id, day, func.coalesce(func.sum(Engagement.likes), 0), func.count(Post.id)
+    ).outerjoin(
+        Engagement, Engagement.post_id == Post.id
+    ).filter(
+        Post.status == "published"
+    ).group_by(Post.account_id, day)
+    return sorted((account_id, str(date), likes, posts) for account_id, date, likes, posts in rows)
+
+
+def _update_likes(post_id: int, likes: int):
+    db = SessionLocal()
+    try:
+        PostService.update_engagement(db, post_id, likes=likes)
+    finally:
+        db.close()
+
+
+def _bulk_likes(post_id: int, likes: int):
+    db = SessionLocal()
+    try:
+        PostService.apply_engagement_batch(db, [(0, EngagementRecord(post_id=post_id, likes=likes))])
+        db.commit()
+    finally:
+        db.close()
+
+
+def _unpublish(post_id: int, likes: int):
+    db = SessionLocal()
+    try:
+        PostService.update_post(db, post_id, PostUpdate(status="draft"))
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("second", [_update_likes, _bulk_likes, _unpublish])
+def test_overlapping_writes_keep_the_rollup_exact(db, seed, monkeypatch, second):
+    seed(1, posts=1)
+    post_id = db.query(Post.id).filter(Post.status == "published").scalar()
+    assert _rollup(db) == _aggregated(db)
+
+    # Pause the first writer between reading the counts and recording its delta,
+    # and start the second one meanwhile
+    record_many = RollupService.record_many
+    recording = threading.Event()
+
+    def slow_record_many(session, rows):
+        if threading.current_thread().name == "first":
+            recording.set()
+            threading.Event().wait(0.3)
+        return record_many(session, rows)
+
+    monkeypatch.setattr(RollupService, "record_many", staticmethod(slow_record_many))
+    writer = threading.Thread(target=_update_likes, args=(post_id, 10), name="first")
+    writer.start()
+    assert recording.wait(5)
+    second(post_id, 25)
+    writer.join()
+
+    db.expire_all()
+    assert _rollup(db) == _aggregated(db)
@@ -0,0 +1,18 @@
+from prometheus_client import REGISTRY
+
+from scheduler import DispatchMetrics
+
+
+def _lag_count() -> float:
+    return REGISTRY.get_sample_value("scheduler_dispatch_lag_seconds_count") or 0.0
+
+
+def test_dispatch_lag_is_exported_to_prometheus(client):
+    before = _lag_count()
+    metrics = DispatchMetrics()
+    metrics.observe(0.3)
+    metrics.observe(42)
+
+    assert _lag_count() == before + 2
+    assert metrics.snapshot()["lag_seconds"]["count"] == 2
+    assert "scheduler_dispatch_lag_seconds_bucket" in client.get("/metrics").text
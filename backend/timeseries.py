@@ -0,0 +1,152 @@
+"""Vectorized time-series math over daily analytics snapshots.
+
+A series set is a matrix with one row per account and one column per day (or
+resampled period), NaN where there is no snapshot. Every function works on the
+whole matrix in a few NumPy passes, so 1,000 accounts cost about as much Python
+as one.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# How a metric combines over a period: levels keep their last value, daily flows add up
+METRICS = {
+    "followers": "last",
+    "following": "last",
+    "total_posts": "last",
+    "total_engagement": "sum",
+    "reach": "sum",
+    "impressions": "sum",
+    "profile_views": "sum",
+}
+
+INTERVALS = ("day", "week", "month")
+
+
+def daily_matrix(
+    accounts: np.ndarray,
+    days: np.ndarray,
+    values: np.ndarray,
+    start: np.datetime64,
+    length: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Scatter (account, day, value) rows into an accounts x days matrix
+
+    Rows must be ordered by account and time; the last snapshot of a day wins.
+    Returns the account id of each row of the matrix and the matrix.
+    """
+    if len(accounts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, length))
+    # Rows arrive grouped by account, so each new account starts a new matrix row
+    starts = np.r_[True, accounts[1:] != accounts[:-1]]
+    ids = accounts[starts]
+    rows = np.cumsum(starts) - 1
+    columns = (days - start).astype(np.int64)
+    keys = rows * length + columns
+    last = np.append(keys[1:] != keys[:-1], True)
+    matrix = np.full((len(ids), length), np.nan)
+    matrix[rows[last], columns[last]] = values[last]
+    return ids, matrix
+
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Carry each row's last known value over the following gaps"""
+    index = np.where(~np.isnan(matrix), np.arange(matrix.shape[-1]), 0)
+    np.maximum.accumulate(index, axis=-1, out=index)
+    return np.take_along_axis(matrix, index, axis=-1)
+
+
+def periods(start: np.datetime64, length: int, interval: str) -> Tuple[np.ndarray, np.ndarray]:
+    """First day of every period overlapping the range, and the column where each begins"""
+    days = start + np.arange(length)
+    if interval == "week":
+        # 1970-01-01 was a Thursday; shift every day back to its Monday
+        keys = days - (days.astype(np.int64) + 3) % 7
+    elif interval == "month":
+        keys = days.astype("datetime64[M]").astype("datetime64[D]")
+    else:
+        keys = days
+    boundaries = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[boundaries], boundaries
+
+
+def resample(matrix: np.ndarray, boundaries: np.ndarray, how: str) -> np.ndarray:
+    """Combine the day columns of each period into one; NaN for periods without data"""
+    if how == "last":
+        ends = np.r_[boundaries[1:], matrix.shape[-1]] - 1
+        return forward_fill(matrix)[..., ends]
+    valid = ~np.isnan(matrix)
+    totals = np.add.reduceat(np.where(valid, matrix, 0.0), boundaries, axis=-1)
+    counts = np.add.reduceat(valid.astype(np.int64), boundaries, axis=-1)
+    totals[counts == 0] = np.nan
+    return totals
+
+
+def total(matrix: np.ndarray) -> np.ndarray:
+    """Sum over accounts of each column, NaN where no account has a value"""
+    valid = ~np.isnan(matrix)
+    return np.where(valid.any(axis=0), np.where(valid, matrix, 0.0).sum(axis=0), np.nan)
+
+
+def _previous(series: np.ndarray) -> np.ndarray:
+    return np.concatenate([np.full(series.shape[:-1] + (1,), np.nan), series[..., :-1]], axis=-1)
+
+
+def deltas(series: np.ndarray) -> np.ndarray:
+    """Change from the previous period, NaN for the first"""
+    return series - _previous(series)
+
+
+def growth(series: np.ndarray) -> np.ndarray:
+    """Percentage change from the previous period, NaN where that was not positive"""
+    previous = _previous(series)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (series - previous) / previous * 100
+    growth[~(previous > 0)] = np.nan
+    return growth
+
+
+def rolling_mean(series: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over the last window periods, ignoring gaps"""
+    valid = ~np.isnan(series)
+    zero = np.zeros(series.shape[:-1] + (1,))
+    sums = np.concatenate([zero, np.cumsum(np.where(valid, series, 0.0), axis=-1)], axis=-1)
+    counts = np.concatenate([zero, np.cumsum(valid, axis=-1)], axis=-1)
+    lower = np.maximum(np.arange(1, series.shape[-1] + 1) - window, 0)
+    count = counts[..., 1:] - counts[..., lower]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (sums[..., 1:] - sums[..., lower]) / count
+    mean[count == 0] = np.nan
+    return mean
+
+
+def derive(series: np.ndarray, window: int) -> Dict[str, np.ndarray]:
+    """The series with its delta, growth and rolling average, row by row"""
+    return {
+        "values": series,
+        "delta": deltas(series),
+        "growth_pct": growth(series),
+        "rolling_avg": rolling_mean(series, window)
+    }
+
+
+def percentiles(matrix: np.ndarray, q: Sequence[float]) -> np.ndarray:
+    """Percentiles across accounts of each column, one row per percentile"""
+    if matrix.shape[0] == 0:
+        return np.full((len(q), matrix.shape[-1]), np.nan)
+    # Same linear interpolation as np.nanpercentile, without its per-column loop
+    # over columns containing NaN: sorting moves the NaNs to the end of each column
+    ordered = np.sort(matrix, axis=0)
+    count = (~np.isnan(matrix)).sum(axis=0)
+    position = np.maximum(count - 1, 0) * (np.asarray(q, dtype=np.float64)[:, None] / 100)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(count - 1, 0))
+    columns = np.arange(matrix.shape[-1])
+    low, high = ordered[lower, columns], ordered[upper, columns]
+    result = low + (high - low) * (position - lower)
+    result[:, count == 0] = np.nan
+    return result
+
+
+def to_list(series: np.ndarray, decimals: int = 2) -> List[Optional[float]]:
+    """JSON-ready values of a 1-d series, None for NaN"""
+    return [None if value != value else value for value in np.round(series, decimals).tolist()]
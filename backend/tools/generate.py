@@ -0,0 +1,388 @@
+"""Synthetic data generator for load tests and benchmarks.
+
+    python -m tools.generate --accounts 5000 --posts 10M --days 730 --seed 42
+    python -m tools.generate --posts 500k --database-url sqlite:///./load.db
+
+Writes social accounts, posts with their engagement, daily analytics snapshots
+and comments. The data is skewed the way production data is: a few large
+accounts post most often and get most of the engagement, posting picks up
+towards the present, and engagement and comments are heavy-tailed. The same
+arguments always produce the same rows.
+
+Rows are generated with NumPy one chunk at a time and written with Core
+executemany inserts, or COPY on Postgres (psycopg2). On SQLite the connection
+skips fsync while loading. Into an empty database, secondary indexes are
+dropped for the load and rebuilt afterwards. The engagement_daily and
+account_latest_metrics rollups are rebuilt at the end; run
+``python -m tools.leaderboard rebuild`` afterwards if Redis is in use.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Rows generated and written per chunk
+CHUNK_ROWS = 50000
+
+PLATFORMS = ["twitter", "instagram", "facebook", "linkedin"]
+PLATFORM_WEIGHTS = [0.35, 0.3, 0.2, 0.15]
+STATUSES = ["published", "draft", "scheduled", "failed"]
+STATUS_WEIGHTS = [0.8, 0.14, 0.05, 0.01]
+POST_TYPES = ["text", "image", "video", "link"]
+POST_TYPE_WEIGHTS = [0.4, 0.35, 0.2, 0.05]
+SENTIMENTS = ["positive", "neutral", "negative"]
+SENTIMENT_WEIGHTS = [0.6, 0.3, 0.1]
+
+POST_CONTENT = [
+    "Excited to announce our new product launch! 🚀",
+    "Check out our latest blog post on industry trends",
+    "Join us for our upcoming webinar next week!",
+    "Customer success story: How we helped increase ROI by 300%",
+    "Behind the scenes at our office today 📸",
+    "New feature alert! Now you can do even more with our platform",
+    "Thank you for 10K followers! Here's to many more milestones 🎉",
+    "Quick tip: Here's how to maximize your productivity",
+    "We're hiring! Check out our open positions",
+    "Happy Friday! What are your weekend plans?",
+]
+COMMENT_CONTENT = [
+    "Love this!", "Great post", "Congrats to the team 🎉", "Where can I learn more?",
+    "Not convinced, to be honest", "This is so helpful, thanks", "When is this available?",
+    "Interesting take", "👏👏👏", "Can you share the slides?",
+]
+
+
+def parse_count(value: str) -> int:
+    """Counts like 5000, 500k or 10M"""
+    multipliers = {"k": 1000, "m": 1000000}
+    value = value.strip().lower().replace("_", "")
+    if value and value[-1] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+
+class Generator:
+    def __init__(self, connection, accounts: int, posts: int, days: int, seed: int, comments_per_post: float,
+                 chunk_rows: int = CHUNK_ROWS):
+        import numpy as np
+
+        self.np = np
+        self.connection = connection
+        self.accounts = accounts
+        self.posts = posts
+        self.days = days
+        self.seed = seed
+        self.comments_per_post = comments_per_post
+        self.chunk_rows = chunk_rows
+        # Anchored to the day so the same arguments give the same rows all day
+        self.now = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.epoch_start = np.datetime64(self.now - timedelta(days=days), "us")
+        self.written = {}
+
+    def rng(self, *stream: int):
+        """Independent random stream per table and chunk, so chunks do not depend on each other"""
+        return self.np.random.default_rng([self.seed, *stream])
+
+    def run(self) -> None:
+        from sqlalchemy import func, select
+        from models import SocialAccount, Post, Comment
+
+        def next_id(model):
+            return (self.connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+        self.first_account = next_id(SocialAccount)
+        self.first_post = next_id(Post)
+        self.first_comment = next_id(Comment)
+        self.generate_accounts()
+        self.generate_posts()
+        self.generate_analytics()
+
+    # Accounts
+
+    def generate_accounts(self) -> None:
+        from models import SocialAccount
+
+        np = self.np
+        rng = self.rng(1)
+        ids = np.arange(self.first_account, self.first_account + self.accounts)
+        platforms = rng.choice(len(PLATFORMS), size=self.accounts, p=PLATFORM_WEIGHTS)
+        # Audience size is heavy-tailed: most accounts are small, a few are huge
+        self.followers = np.minimum(100 * (rng.pareto(1.2, self.accounts) + 1), 5e7)
+        # Larger accounts post more often, less than proportionally
+        activity = np.sqrt(self.followers)
+        self.activity = activity / activity.sum()
+        active = rng.random(self.accounts) < 0.97
+        created = self.epoch_start - (rng.random(self.accounts) * 365 * 86400e6).astype("timedelta64[us]")
+
+        columns = ["id", "platform", "account_name", "account_id", "is_active", "created_at"]
+        rows = zip(
+            ids.tolist(),
+            [PLATFORMS[p] for p in platforms.tolist()],
+            [f"{PLATFORMS[p]}_account_{i}" for p, i in zip(platforms.tolist(), ids.tolist())],
+            [f"generated_{i}" for i in ids.tolist()],
+            active.tolist(),
+            self.timestamps(created)
+        )
+        self.write(SocialAccount.__table__, columns, list(rows), self.accounts)
+
+    # Posts, engagement and comments
+
+    def generate_posts(self) -> None:
+        from models import Post, Engagement, Comment
+
+        comment_id = self.first_comment
+        for index, start in enumerate(range(0, self.posts, self.chunk_rows)):
+            n = min(self.chunk_rows, self.posts - start)
+            posts, engagement, comments = self.post_chunk(self.rng(2, index), self.first_post + start, n, comment_id)
+            comment_id += len(comments[1])
+            self.write(Post.__table__, *posts, self.posts)
+            self.write(Engagement.__table__, *engagement, self.posts)
+            self.write(Comment.__table__, *comments, None)
+
+    def post_chunk(self, rng, first_id: int, n: int, first_comment: int):
+        np = self.np
+        ids = np.arange(first_id, first_id + n)
+        account_index = rng.choice(self.accounts, size=n, p=self.activity)
+        account_ids = account_index + self.first_account
+        span = self.days * 86400e6
+        # Posting volume grows towards the present
+        created = self.epoch_start + (rng.random(n) ** 0.7 * span).astype("timedelta64[us]")
+        status = rng.choice(len(STATUSES), size=n, p=STATUS_WEIGHTS)
+        published = status == 0
+        scheduled = status == 2
+        post_type = rng.choice(len(POST_TYPES), size=n, p=POST_TYPE_WEIGHTS)
+        published_time = created + (rng.random(n) * 7200e6).astype("timedelta64[us]")
+        scheduled_time = np.datetime64(self.now, "us") + (
+            (1 + rng.random(n) * 30 * 24) * 3600e6
+        ).astype("timedelta64[us]")
+        updated = np.where(published, published_time, created)
+        updated_list = self.timestamps(updated)
+        content = rng.integers(0, len(POST_CONTENT), n)
+
+        post_columns = [
+            "id", "account_id", "content", "media_url", "scheduled_time", "published_time",
+            "status", "post_type", "created_at", "updated_at"
+        ]
+        ids_list = ids.tolist()
+        post_types = post_type.tolist()
+        published_list = published.tolist()
+        scheduled_list = scheduled.tolist()
+        posts = list(zip(
+            ids_list,
+            account_ids.tolist(),
+            [POST_CONTENT[c] for c in content.tolist()],
+            [f"https://cdn.example.com/media/{i}.jpg" if t in (1, 2) else None for i, t in zip(ids_list, post_types)],
+            [t if s else None for t, s in zip(self.timestamps(scheduled_time), scheduled_list)],
+            [t if p else None for t, p in zip(self.timestamps(published_time), published_list)],
+            [STATUSES[s] for s in status.tolist()],
+            [POST_TYPES[t] for t in post_types],
+            self.timestamps(created),
+            updated_list
+        ))
+
+        # Reach scales with the account's audience; rates are skewed per post
+        views = np.where(published, rng.lognormal(np.log(self.followers[account_index] * 0.1 + 50), 1.0), 0)
+        views = np.minimum(views, 1e9).astype(np.int64)
+        likes = (views * rng.beta(2, 60, n)).astype(np.int64)
+        comments = (likes * rng.beta(2, 30, n)).astype(np.int64)
+        shares = (likes * rng.beta(2, 20, n)).astype(np.int64)
+        clicks = (views * rng.beta(1.5, 80, n)).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(views > 0, (likes + comments + shares + clicks) / views * 100, 0.0)
+        engagement_columns = [
+            "id", "post_id", "likes", "comments", "shares", "views", "clicks", "engagement_rate", "updated_at"
+        ]
+        engagement = list(zip(
+            ids_list, ids_list, likes.tolist(), comments.tolist(), shares.tolist(), views.tolist(),
+            clicks.tolist(), np.round(rate, 4).tolist(), updated_list
+        ))
+
+        # Comment rows follow each post's comment count, scaled to comments_per_post overall
+        weight = comments / comments.mean() if comments.sum() else np.zeros(n)
+        per_post = rng.poisson(self.comments_per_post * weight)
+        post_of_comment = np.repeat(np.arange(n), per_post)
+        m = len(post_of_comment)
+        comment_created = published_time[post_of_comment] + (rng.exponential(6, m) * 3600e6).astype("timedelta64[us]")
+        # A long tail of commenters, with a few regulars
+        authors = np.minimum(rng.zipf(1.6, m), 10 ** 7)
+        comment_columns = ["id", "post_id", "author_name", "author_id", "content", "sentiment", "created_at"]
+        comment_rows = list(zip(
+            range(first_comment, first_comment + m),
+            ids[post_of_comment].tolist(),
+            [f"user{a}" for a in authors.tolist()],
+            [f"u{a}" for a in authors.tolist()],
+            [COMMENT_CONTENT[c] for c in rng.integers(0, len(COMMENT_CONTENT), m).tolist()],
+            [SENTIMENTS[s] for s in rng.choice(len(SENTIMENTS), size=m, p=SENTIMENT_WEIGHTS).tolist()],
+            self.timestamps(comment_created)
+        ))
+        return (post_columns, posts), (engagement_columns, engagement), (comment_columns, comment_rows)
+
+    # Analytics
+
+    def generate_analytics(self) -> None:
+        from models import Analytics
+
+        np = self.np
+        per_chunk = max(1, self.chunk_rows // self.days)
+        total = self.accounts * self.days
+        for index, start in enumerate(range(0, self.accounts, per_chunk)):
+            rng = self.rng(3, index)
+            count = min(per_chunk, self.accounts - start)
+            base = self.followers[start:start + count, None]
+            # Followers drift upwards with daily noise, a compounding random walk
+            walk = np.cumprod(1 + rng.normal(0.002, 0.01, (count, self.days)), axis=1)
+            followers = (base * walk).astype(np.int64)
+            reach = (followers * rng.lognormal(np.log(0.3), 0.5, (count, self.days))).astype(np.int64)
+            impressions = (reach * rng.uniform(1.2, 3, (count, self.days))).astype(np.int64)
+            profile_views = (reach * rng.beta(2, 100, (count, self.days))).astype(np.int64)
+            engagement = (reach * rng.beta(2, 40, (count, self.days))).astype(np.int64)
+            following = np.repeat(rng.integers(50, 2000, (count, 1)), self.days, axis=1)
+            # Snapshots are taken at a fixed time of day per account
+            hour = rng.integers(0, 24, (count, 1)).astype("timedelta64[h]")
+            dates = (self.epoch_start + np.arange(1, self.days + 1).astype("timedelta64[D]")) + hour
+
+            account_ids = np.repeat(np.arange(start, start + count) + self.first_account, self.days)
+            columns = [
+                "account_id", "date", "followers", "following", "total_posts", "total_engagement",
+                "reach", "impressions", "profile_views"
+            ]
+            rows = list(zip(
+                account_ids.tolist(),
+                self.timestamps(dates.astype("datetime64[us]").ravel()),
+                followers.ravel().tolist(),
+                following.ravel().tolist(),
+                np.zeros(count * self.days, dtype=np.int64).tolist(),
+                engagement.ravel().tolist(),
+                reach.ravel().tolist(),
+                impressions.ravel().tolist(),
+                profile_views.ravel().tolist()
+            ))
+            self.write(Analytics.__table__, columns, rows, total)
+
+    # Writing
+
+    def timestamps(self, values) -> list:
+        """Column values for a datetime64[us] array"""
+        if self.connection.dialect.name != "sqlite":
+            return values.tolist()
+        # The text SQLAlchemy's SQLite DateTime stores, formatted in one NumPy pass
+        # instead of a Python call per value
+        text = self.np.datetime_as_string(values, unit="us")
+        text.view("U1").reshape(len(text), -1)[:, 10] = " "
+        return text.tolist()
+
+    def write(self, table, columns, rows, total) -> None:
+        if not rows:
+            return
+        if self.connection.dialect.name == "sqlite":
+            # Rows are already in storage form; skip per-value bind processing
+            placeholders = ", ".join("?" * len(columns))
+            self.connection.exec_driver_sql(
+                f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})", rows
+            )
+        elif self.connection.dialect.name == "postgresql" and self.connection.dialect.driver == "psycopg2":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor = self.connection.connection.cursor()
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            from sqlalchemy import insert
+
+            self.connection.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+        self.connection.commit()
+
+        self.written[table.name] = self.written.get(table.name, 0) + len(rows)
+        elapsed = time.perf_counter() - self.started
+        rows_written = sum(self.written.values())
+        progress = f"{self.written[table.name]}/{total}" if total else f"{self.written[table.name]}"
+        print(f"\r{table.name:<12} {progress:<24} {rows_written / elapsed:>10,.0f} rows/s", end="", file=sys.stderr)
+
+
+def _secondary_indexes(tables):
+    return [index for table in tables for index in table.indexes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset")
+    parser.add_argument("--accounts", type=parse_count, default=100)
+    parser.add_argument("--posts", type=parse_count, default=100000, help="e.g. 500k or 10M")
+    parser.add_argument("--days", type=int, default=365, help="days of history")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--comments-per-post", type=float, default=0.2)
+    parser.add_argument("--chunk-size", type=parse_count, default=CHUNK_ROWS, help="rows per insert and commit")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DATABASE_ASYNC"] = "false"
+
+    from sqlalchemy import func, select, text
+    from database import SessionLocal, Base, engine
+    from models import SocialAccount, Post, Engagement, Analytics, Comment
+    from services.rollup_service import RollupService
+    from services.latest_metrics_service import LatestMetricsService
+
+    Base.metadata.create_all(bind=engine)
+    tables = [model.__table__ for model in (SocialAccount, Post, Engagement, Analytics, Comment)]
+
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # Scratch data: a crash mid-load can lose it, but no fsync per chunk
+            connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        empty = not connection.execute(select(func.count()).select_from(SocialAccount)).scalar()
+        # Building indexes once at the end is much cheaper than maintaining them row by row
+        indexes = _secondary_indexes(tables) if empty else []
+        for index in indexes:
+            index.drop(connection)
+        connection.commit()
+
+        generator = Generator(connection, args.accounts, args.posts, args.days, args.seed,
+                              args.comments_per_post, args.chunk_size)
+        generator.started = start
+        try:
+            generator.run()
+        finally:
+            print(file=sys.stderr)
+            # Also after a failed load, so the tables are never left without their indexes
+            if indexes:
+                connection.rollback()
+                index_start = time.perf_counter()
+                for index in indexes:
+                    index.create(connection)
+                connection.commit()
+                print(f"Rebuilt {len(indexes)} indexes in {time.perf_counter() - index_start:.1f}s")
+
+        if connection.dialect.name == "postgresql":
+            # Ids were assigned explicitly; move the sequences past them
+            for table in tables:
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                ))
+            connection.commit()
+
+    elapsed = time.perf_counter() - start
+    rows = sum(generator.written.values())
+    print(f"Wrote {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s): "
+          + ", ".join(f"{table} {count:,}" for table, count in generator.written.items()))
+
+    db = SessionLocal()
+    try:
+        rollup_start = time.perf_counter()
+        RollupService.rebuild(db)
+        LatestMetricsService.rebuild(db)
+        db.commit()
+        print(f"Rebuilt rollups in {time.perf_counter() - rollup_start:.1f}s")
+    finally:
+        db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Bulk import of analytics snapshots from an NDJSON or CSV file.
+
+    python -m tools.import_analytics history.ndjson
+    python -m tools.import_analytics history.csv --chunk-size 10000
+    cat history.csv | python -m tools.import_analytics - --format csv
+
+Uses the same validation, de-duplication and batching as
+``POST /api/accounts/analytics/import``.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from database import SessionLocal, Base, engine
+import models  # noqa: F401  (registers tables on Base)
+from ingest import RowParser
+from schemas import AnalyticsCreate
+from services.account_service import AsyncAccountService, IMPORT_CHUNK_SIZE
+
+
+async def _lines(stream):
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def import_file(path: str, format: str, chunk_size: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    parser = RowParser(AnalyticsCreate, format)
+    db = SessionLocal()
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+    try:
+        return asyncio.run(AsyncAccountService.import_analytics(db, _lines(stream), parser, chunk_size))
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import analytics snapshots")
+    parser.add_argument("path", help="NDJSON or CSV file, - for stdin")
+    parser.add_argument("--format", choices=RowParser.FORMATS, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    report = import_file(args.path, format, args.chunk_size)
+    for error in report["errors"]:
+        print(f"row {error['row']}: {error['error']}", file=sys.stderr)
+    print(json.dumps({key: value for key, value in report.items() if key != "errors"}))
+    print(f"Imported {report['rows']} rows in {report['seconds']}s ({report['rows_per_sec']} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Maintenance commands for the top posts leaderboard in Redis.
+
+    python -m tools.leaderboard rebuild
+
+Run ``rebuild`` once after deploying the leaderboard, and whenever Redis lost
+data or engagement was written without going through PostService. Until the
+first rebuild, /api/analytics/top-posts keeps querying the database.
+"""
+import argparse
+import time
+
+from database import SessionLocal, Base, engine
+import models  # noqa: F401  (registers tables on Base)
+from leaderboard import leaderboard
+
+
+def rebuild() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        posts = leaderboard.rebuild(db)
+        print(f"Rebuilt the top posts leaderboard: {posts} posts in {time.perf_counter() - start:.2f}s")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top posts leaderboard maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Query-plan regression check for the service layer.
+
+Seeds a large synthetic dataset, runs every AnalyticsService, PostService and
+AccountService query while capturing the SQL it emits, and EXPLAINs each
+statement. Exits non-zero when a listing issues more statements than its
+QUERY_BUDGETS entry (a lazy load per row), or a statement scans a large table
+end to end:
+
+* SQLite: ``SCAN <table>`` without an index, or an index scan without a LIMIT
+  to stop it early
+* Postgres: ``Seq Scan on <table>``
+
+Whole-table aggregates that are meant to read everything are listed in
+ALLOWED_SCANS with the reason, so a new scan has to be justified there.
+
+    python -m tools.query_plans
+    python -m tools.query_plans --posts 500000 --verbose
+    python -m tools.query_plans --database-url postgresql://localhost/scratch
+
+The same checks run per query in the test suite (tests/test_query_plans.py).
+
+``--database-url`` must point at a scratch database: it is seeded with
+synthetic rows. Write methods run inside a transaction that is rolled back, and
+against an in-memory Redis (fakeredis), so their cache invalidations and
+leaderboard updates never reach the configured one.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, List, Set, Tuple
+
+from tests.fakes import use_fakeredis
+
+# Tables with at least this many seeded rows count as large
+LARGE_TABLE_ROWS = 10000
+
+# (query, table) pairs allowed to read the whole table, with the reason
+ALLOWED_SCANS = {
+    ("AnalyticsService._dashboard_stats", "engagement"): "total engagement sums every post",
+    ("AnalyticsService._platform_stats", "engagement"): "engagement totals per account sum every post",
+    ("AnalyticsService._platform_stats", "posts"): "engagement totals join every post to its account",
+}
+
+
+# Statements a listing may issue per SELECTIN_BATCH rows; more means N+1 loads
+SELECTIN_BATCH = 500
+QUERY_BUDGETS = {
+    "PostService.get_posts": 2,
+    "PostService.get_posts_page": 2,
+    "PostService.get_scheduled_posts": 2,
+}
+
+
+def seed(db, accounts: int, posts: int, days: int) -> None:
+    from sqlalchemy import insert
+    from models import SocialAccount, Post, Engagement, Analytics, Comment
+    from services.rollup_service import RollupService
+    from services.latest_metrics_service import LatestMetricsService
+
+    now = datetime.utcnow()
+    db.execute(insert(SocialAccount), [
+        {"platform": random.choice(["twitter", "facebook", "instagram", "linkedin"]),
+         "account_name": f"plan{i}", "account_id": f"plan{i}", "created_at": now}
+        for i in range(accounts)
+    ])
+
+    rows, engagement = [], []
+    for i in range(1, posts + 1):
+        status = random.choice(["draft", "scheduled", "published", "published", "published"])
+        created_at = now - timedelta(seconds=random.randint(0, days * 86400))
+        rows.append({
+            "id": i,
+            "account_id": random.randint(1, accounts),
+            "content": "query plan post",
+            "status": status,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "scheduled_time": now + timedelta(hours=random.randint(1, 500)) if status == "scheduled" else None,
+            "published_time": created_at if status == "published" else None,
+        })
+        if status == "published":
+            engagement.append({
+                "post_id": i, "likes": random.randint(0, 1000), "comments": random.randint(0, 100),
+                "shares": random.randint(0, 50), "views": random.randint(1000, 50000),
+                "clicks": random.randint(0, 500), "engagement_rate": 1.0,
+            })
+        if len(rows) == 10000:
+            db.execute(insert(Post), rows)
+            db.execute(insert(Engagement), engagement)
+            rows, engagement = [], []
+    if rows:
+        db.execute(insert(Post), rows)
+    if engagement:
+        db.execute(insert(Engagement), engagement)
+
+    db.execute(insert(Analytics), [
+        {"account_id": account_id, "date": now - timedelta(days=day), "followers": random.randint(100, 100000)}
+        for account_id in range(1, accounts + 1) for day in range(days)
+    ])
+    db.execute(insert(Comment), [
+        {"post_id": random.randint(1, posts), "author_name": "a", "author_id": "a", "content": "c"}
+        for _ in range(posts // 10)
+    ])
+    RollupService.rebuild(db)
+    LatestMetricsService.rebuild(db)
+    db.commit()
+
+
+def queries(posts: int) -> List[Tuple[str, Callable]]:
+    """Every service query as (name, fn(db)); ids are chosen to exist in the seed"""
+    from pagination import encode_cursor
+    from schemas import Post, PostUpdate, EngagementRecord, AnalyticsCreate
+    from services.analytics_service import AnalyticsService
+    from services.post_service import PostService
+    from services.account_service import AccountService
+
+    post_id = posts // 2
+    cursor = encode_cursor(datetime.utcnow() - timedelta(days=30), post_id)
+
+    def serialized(result):
+        # Serializing like the response model does exposes lazy loads
+        rows = result[0] if isinstance(result, tuple) else result
+        return [Post.model_validate(row, from_attributes=True) for row in rows]
+
+    return [
+        ("AnalyticsService._dashboard_stats", lambda db: AnalyticsService._dashboard_stats(db)),
+        ("AnalyticsService._engagement_trends", lambda db: AnalyticsService._engagement_trends(db, 30)),
+        ("AnalyticsService._platform_stats", lambda db: AnalyticsService._platform_stats(db)),
+        ("AnalyticsService._top_posts", lambda db: AnalyticsService._top_posts(db, 10)),
+        ("AnalyticsService._top_posts[account]", lambda db: AnalyticsService._top_posts(db, 10, 1)),
+        ("AnalyticsService._top_posts[platform]", lambda db: AnalyticsService._top_posts(db, 10, None, "twitter")),
+        ("AnalyticsService._timeseries", lambda db: AnalyticsService._timeseries(db, "followers", 30, "week")),
+        ("AnalyticsService._timeseries[account]",
+         lambda db: AnalyticsService._timeseries(db, "reach", 365, "month", 3, [1, 2], per_account=True)),
+        ("AnalyticsService._hydrate_top_posts",
+         lambda db: AnalyticsService._hydrate_top_posts(db, list(range(post_id, post_id + 10)), None, "twitter")),
+        ("PostService.get_posts", lambda db: serialized(PostService.get_posts(db, None, None, 0, 100))),
+        ("PostService.get_posts[account]", lambda db: serialized(PostService.get_posts(db, 1, None, 0, 100))),
+        ("PostService.get_posts[status]", lambda db: serialized(PostService.get_posts(db, None, "published", 0, 100))),
+        ("PostService.get_posts[account,status]", lambda db: serialized(PostService.get_posts(db, 1, "published", 0, 100))),
+        ("PostService.get_posts_page", lambda db: serialized(PostService.get_posts_page(db, None, None, cursor, 100))),
+        ("PostService.get_posts_page[status]", lambda db: serialized(PostService.get_posts_page(db, None, "draft", cursor, 100))),
+        ("PostService.get_posts_page[account,status]",
+         lambda db: serialized(PostService.get_posts_page(db, 1, "published", cursor, 100))),
+        ("PostService.get_posts[fields]",
+         lambda db: PostService.get_posts(db, None, None, 0, 100, ["id", "content", "status"])),
+        ("PostService.get_post", lambda db: PostService.get_post(db, post_id)),
+        ("PostService.get_post_version", lambda db: PostService.get_post_version(db, post_id)),
+        ("PostService.get_scheduled_posts", lambda db: serialized(PostService.get_scheduled_posts(db))),
+        ("PostService.get_upcoming_scheduled",
+         lambda db: PostService.get_upcoming_scheduled(db, datetime.utcnow() + timedelta(hours=1))),
+        ("PostService.publish_due_posts", lambda db: PostService.publish_due_posts(db, list(range(post_id, post_id + 100)))),
+        ("PostService.update_post", lambda db: PostService.update_post(db, post_id, PostUpdate(content="x"))),
+        ("PostService.publish_post", lambda db: PostService.publish_post(db, post_id + 1)),
+        ("PostService.update_engagement", lambda db: PostService.update_engagement(db, post_id + 2, likes=1)),
+        ("PostService.apply_engagement_batch", lambda db: PostService.apply_engagement_batch(
+            db, [(0, EngagementRecord(post_id=post_id + 3, likes=1)), (1, EngagementRecord(post_id=post_id + 4))]
+        )),
+        ("PostService.delete_post", lambda db: PostService.delete_post(db, post_id + 5)),
+        ("AccountService.get_accounts", lambda db: AccountService.get_accounts(db, 0, 100)),
+        ("AccountService.get_accounts_page", lambda db: AccountService.get_accounts_page(db, "", 100)),
+        ("AccountService.get_account", lambda db: AccountService.get_account(db, 1)),
+        ("AccountService.get_account_analytics", lambda db: AccountService.get_account_analytics(db, 1, 30)),
+        ("AccountService.add_analytics", lambda db: AccountService.add_analytics(
+            db, 1, AnalyticsCreate(account_id=1, date=datetime.utcnow(), followers=100)
+        )),
+        ("AccountService.import_analytics_batch", lambda db: AccountService.import_analytics_batch(db, [
+            (1, AnalyticsCreate(account_id=1, date=datetime.utcnow() - timedelta(days=3), followers=100)),
+            (2, AnalyticsCreate(account_id=2, date=datetime.utcnow(), followers=100)),
+        ])),
+    ]
+
+
+@contextmanager
+def _capture(engine):
+    """Collect (statement, parameters) of everything executed on the engine"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _explain(connection, statement: str, parameters) -> List[str]:
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    rows = connection.exec_driver_sql(prefix + statement, parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def _full_scans(plan: List[str], dialect: str, statement: str, large_tables: set) -> List[str]:
+    """Large tables the plan reads end to end"""
+    scanned = []
+    for line in plan:
+        if dialect == "sqlite":
+            match = re.match(r"SCAN (\w+)(?: AS \w+)?( USING (?:COVERING )?INDEX)?", line.strip())
+            # An index walk in ORDER BY order under a LIMIT stops after LIMIT rows
+            if match and (not match.group(2) or "LIMIT" not in statement.upper()):
+                scanned.append(match.group(1))
+        else:
+            match = re.search(r"Seq Scan on (\w+)", line)
+            if match:
+                scanned.append(match.group(1))
+    return [table for table in scanned if table in large_tables]
+
+
+def large_tables(engine) -> Set[str]:
+    """Tables holding at least LARGE_TABLE_ROWS rows"""
+    from sqlalchemy import func, inspect, select, table
+
+    with engine.connect() as connection:
+        return {
+            name for name in inspect(connection).get_table_names()
+            if connection.execute(select(func.count()).select_from(table(name))).scalar() >= LARGE_TABLE_ROWS
+        }
+
+
+def check_query(engine, session_factory, name: str, fn: Callable, large: Set[str], verbose: bool = False) -> List[str]:
+    """Run one query in a rolled back transaction and return its unexpected full scans and budget overrun"""
+    failures = []
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = session_factory(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            with _capture(engine) as statements:
+                result = fn(db)
+            budget = QUERY_BUDGETS.get(name.split("[")[0])
+            if budget is not None and isinstance(result, list):
+                # selectinload batches its IN lists, one extra statement per batch
+                budget += max(0, len(result) - 1) // SELECTIN_BATCH
+            if budget is not None and len(statements) > budget:
+                failures.append(f"{name}: {len(statements)} statements, budget {budget}")
+            for statement, parameters in statements:
+                plan = _explain(connection, statement, parameters)
+                for scanned in _full_scans(plan, connection.dialect.name, statement, large):
+                    reason = ALLOWED_SCANS.get((name.split("[")[0], scanned))
+                    if reason is None:
+                        failures.append(f"{name}: full scan of {scanned}\n    {' '.join(statement.split())}")
+                    elif verbose:
+                        print(f"  allowed scan of {scanned} in {name}: {reason}")
+                if verbose:
+                    print(f"{name}\n    {' '.join(statement.split())}")
+                    for line in plan:
+                        print(f"      {line}")
+        finally:
+            db.close()
+            transaction.rollback()
+    return failures
+
+
+def check(engine, session_factory, posts: int, verbose: bool = False) -> List[str]:
+    """Run every query and return the unexpected full scans and query budget overruns"""
+    large = large_tables(engine)
+    failures = []
+    for name, fn in queries(posts):
+        failures.extend(check_query(engine, session_factory, name, fn, large, verbose))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail on full table scans in service queries")
+    parser.add_argument("--database-url", help="scratch database to seed; defaults to a temporary SQLite file")
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--verbose", action="store_true", help="print every statement and its plan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'plans.db')}"
+        os.environ["DATABASE_ASYNC"] = "false"
+        try:
+            use_fakeredis()
+        except ImportError:
+            raise SystemExit("fakeredis is not installed: pip install fakeredis")
+
+        from database import SessionLocal, Base, engine
+        import models  # noqa: F401  (registers tables on Base)
+
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            seed(db, args.accounts, args.posts, args.days)
+        finally:
+            db.close()
+
+        failures = check(engine, SessionLocal, args.posts, args.verbose)
+        engine.dispose()
+
+    for failure in failures:
+        print(failure)
+    print(f"{len(failures)} query plan failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Stand-in replication for trying replica reads locally with two SQLite files.
+
+    DATABASE_URL=sqlite:///./primary.db DATABASE_REPLICA_URL=sqlite:///./replica.db \\
+        python -m tools.replica sync --interval 2
+
+copies the primary file onto the replica every ``--interval`` seconds (once
+without it) through SQLite's online backup, so the API started with the same
+variables sees a replica that lags by up to that long. For two local Postgres
+instances, make the second a streaming replica of the first instead
+(``pg_basebackup -R``) and point DATABASE_REPLICA_URL at it.
+"""
+import argparse
+import sqlite3
+import time
+
+from sqlalchemy.engine import make_url
+
+from database import DATABASE_URL, DATABASE_REPLICA_URL
+
+
+def _sqlite_path(url: str) -> str:
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("sqlite") or parsed.database in (None, "", ":memory:"):
+        raise SystemExit(
+            f"{url or 'DATABASE_REPLICA_URL (unset)'} is not an SQLite file; "
+            "set up streaming replication between Postgres instances instead"
+        )
+    return parsed.database
+
+
+def sync(interval: float) -> None:
+    primary, replica = _sqlite_path(DATABASE_URL), _sqlite_path(DATABASE_REPLICA_URL)
+    if primary == replica:
+        raise SystemExit("DATABASE_URL and DATABASE_REPLICA_URL point at the same file")
+    while True:
+        start = time.perf_counter()
+        source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        print(f"Copied {primary} to {replica} in {time.perf_counter() - start:.2f}s")
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy the primary SQLite database onto the replica")
+    parser.add_argument("command", choices=["sync"])
+    parser.add_argument("--interval", type=float, default=0, help="keep copying every this many seconds")
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        sync(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Maintenance commands for the engagement_daily and account_latest_metrics rollups.
+
+    python -m tools.rollups rebuild
+
+Run ``rebuild`` once after upgrading an existing database, or whenever posts,
+engagement or analytics snapshots were written without going through the services.
+"""
+import argparse
+import time
+
+from database import SessionLocal, Base, engine
+import models  # noqa: F401  (registers tables on Base)
+from services.rollup_service import RollupService
+from services.latest_metrics_service import LatestMetricsService
+
+
+def rebuild() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = RollupService.rebuild(db)
+        accounts = LatestMetricsService.rebuild(db)
+        db.commit()
+        print(f"Rebuilt engagement_daily: {rows} rows, account_latest_metrics: {accounts} rows "
+              f"in {time.perf_counter() - start:.2f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollup table maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild()
+
+
+if __name__ == "__main__":
+    main()
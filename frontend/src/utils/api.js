@@ -2,8 +2,11 @@ import axios from 'axios'
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 
+// The API is on another origin; send its cookies, including the one that keeps
+// reads on the primary right after a write (see ReadYourWritesMiddleware)
 const api = axios.create({
   baseURL: API_URL,
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json'
   }